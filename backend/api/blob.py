@@ -0,0 +1,107 @@
+"""
+快照文件内容响应
+blob按内容寻址、不可变：ETag直接使用blob OID；
+按完整提交ID请求时URL对应的内容永远不变，可以长期缓存；支持单个字节范围（Range）
+"""
+
+import mimetypes
+import re
+from typing import Optional, Tuple
+
+# 完整的提交ID（SHA-1或SHA-256）
+FULL_OID_RE = re.compile(r"[0-9a-f]{40}|[0-9a-f]{64}")
+
+# 按完整提交ID请求的响应（URL与内容一一对应）
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# 按分支名称等可变引用请求的响应，每次使用前重新验证ETag
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+# 判断二进制内容时检查的前缀长度
+BINARY_SNIFF_BYTES = 8000
+
+# 文本类型（添加charset）
+_TEXT_MEDIA_TYPES = {
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+}
+
+
+class RangeNotSatisfiable(Exception):
+    """请求的字节范围超出文件大小（416）"""
+
+    pass
+
+
+def blob_etag(oid: str) -> str:
+    """blob的强ETag"""
+    return f'"{oid}"'
+
+
+def cache_control(commit: str) -> str:
+    """按请求的提交选择Cache-Control"""
+    if FULL_OID_RE.fullmatch(commit.strip()):
+        return IMMUTABLE_CACHE_CONTROL
+    return REVALIDATE_CACHE_CONTROL
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    解析Range请求头
+
+    只支持单个字节范围；多个范围或无法解析的请求头按规范忽略，返回完整内容
+
+    Args:
+        header: Range请求头，如 bytes=0-1023、bytes=1024-、bytes=-500
+        size: 文件大小
+
+    Returns:
+        [start, end) 字节范围；返回完整内容时为None
+
+    Raises:
+        RangeNotSatisfiable: 范围起点超出文件大小
+    """
+    if not header:
+        return None
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, sep, last = spec.strip().partition("-")
+    if not sep:
+        return None
+    try:
+        if not first:
+            # 后缀范围：最后N个字节
+            length = int(last)
+            if length <= 0 or size == 0:
+                raise RangeNotSatisfiable()
+            return max(size - length, 0), size
+        start = int(first)
+        end = int(last) + 1 if last else None
+    except ValueError:
+        return None
+    if end is not None and end <= start:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable()
+    return start, size if end is None else min(end, size)
+
+
+def media_type(file_path: str, head: bytes = b"") -> str:
+    """
+    按扩展名和内容推断Content-Type
+
+    Args:
+        file_path: 文件路径
+        head: 内容开头（用于无法按扩展名判断时区分文本和二进制）
+    """
+    guessed, _ = mimetypes.guess_type(file_path)
+    if guessed:
+        if guessed.startswith("text/") or guessed in _TEXT_MEDIA_TYPES:
+            return f"{guessed}; charset=utf-8"
+        return guessed
+    if not head or b"\0" in head[:BINARY_SNIFF_BYTES]:
+        return "application/octet-stream"
+    return "text/plain; charset=utf-8"
@@ -0,0 +1,361 @@
+"""
+响应压缩中间件
+按Accept-Encoding协商gzip、brotli、zstd（后两者在安装了对应模块时可用）；
+小响应不压缩，流式响应（NDJSON）逐块压缩，SSE事件流不压缩
+"""
+
+import asyncio
+import threading
+import time
+import zlib
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - 可选依赖
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - 可选依赖
+    zstandard = None
+
+# 小于该字节数的完整响应不压缩
+DEFAULT_MINIMUM_SIZE = 1024
+
+# 超过该字节数的完整响应在线程池中压缩，避免阻塞事件循环
+THREAD_COMPRESS_SIZE = 1024 * 1024
+
+# 不压缩的内容类型（事件流需要立即送达，压缩包含自描述格式的数据没有收益）
+SKIP_CONTENT_TYPES = (
+    "text/event-stream",
+    "image/",
+    "video/",
+    "audio/",
+    "application/zip",
+)
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4
+ZSTD_LEVEL = 3
+
+
+class _GzipEncoder:
+    """gzip流式编码器"""
+
+    def __init__(self):
+        self._obj = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data)
+
+    def flush(self) -> bytes:
+        # 同步刷新：已写入的数据可以被客户端立即解压
+        return self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._obj.flush(zlib.Z_FINISH)
+
+
+class _BrotliEncoder:
+    """brotli流式编码器"""
+
+    def __init__(self):
+        self._obj = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.process(data)
+
+    def flush(self) -> bytes:
+        return self._obj.flush()
+
+    def finish(self) -> bytes:
+        return self._obj.finish()
+
+
+class _ZstdEncoder:
+    """zstd流式编码器"""
+
+    def __init__(self):
+        self._obj = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data)
+
+    def flush(self) -> bytes:
+        return self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+
+
+def available_encoders() -> Dict[str, Callable[[], Any]]:
+    """当前可用的编码器（按服务端偏好排序）"""
+    encoders: Dict[str, Callable[[], Any]] = {}
+    if brotli is not None:
+        encoders["br"] = _BrotliEncoder
+    if zstandard is not None:
+        encoders["zstd"] = _ZstdEncoder
+    encoders["gzip"] = _GzipEncoder
+    return encoders
+
+
+def negotiate(accept_encoding: str, encoders: Dict[str, Any]) -> Optional[str]:
+    """
+    根据Accept-Encoding选择编码
+
+    Args:
+        accept_encoding: 请求头的值，如 "gzip, br;q=0.9, zstd;q=0"
+        encoders: 可用的编码器（按服务端偏好排序）
+
+    Returns:
+        选中的编码名称；客户端不接受任何可用编码时返回None
+    """
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name] = q
+
+    best = None
+    best_q = 0.0
+    for name in encoders:
+        q = weights.get(name, weights.get("*", 0.0))
+        # 客户端权重相同时按服务端偏好顺序选择
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+class CompressionStats:
+    """压缩统计：按编码记录压缩前后的字节数和CPU耗时"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._encodings: Dict[str, Dict[str, float]] = {}
+        self.skipped_small = 0
+
+    def _entry(self, encoding: str) -> Dict[str, float]:
+        """获取编码的统计条目（调用方持有锁）"""
+        return self._encodings.setdefault(
+            encoding,
+            {"responses": 0, "bytes_in": 0, "bytes_out": 0, "cpu_seconds": 0.0},
+        )
+
+    def record(self, encoding: str, bytes_in: int, bytes_out: int, cpu: float):
+        """记录一个响应（或流式响应的一个数据块）的压缩结果"""
+        with self._lock:
+            entry = self._entry(encoding)
+            entry["bytes_in"] += bytes_in
+            entry["bytes_out"] += bytes_out
+            entry["cpu_seconds"] += cpu
+
+    def record_response(self, encoding: str):
+        """记录一个被压缩的响应"""
+        with self._lock:
+            self._entry(encoding)["responses"] += 1
+
+    def record_skipped(self):
+        """记录一个因为太小而未压缩的响应"""
+        with self._lock:
+            self.skipped_small += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """获取统计信息：每种编码节省的字节数、CPU耗时和每毫秒CPU节省的字节数"""
+        with self._lock:
+            encodings = {}
+            for name, entry in self._encodings.items():
+                saved = entry["bytes_in"] - entry["bytes_out"]
+                cpu_ms = entry["cpu_seconds"] * 1000
+                encodings[name] = {
+                    "responses": int(entry["responses"]),
+                    "bytes_in": int(entry["bytes_in"]),
+                    "bytes_out": int(entry["bytes_out"]),
+                    "bytes_saved": int(saved),
+                    "ratio": (
+                        entry["bytes_out"] / entry["bytes_in"]
+                        if entry["bytes_in"]
+                        else 1.0
+                    ),
+                    "cpu_ms": round(cpu_ms, 2),
+                    "bytes_saved_per_cpu_ms": round(saved / cpu_ms) if cpu_ms else 0,
+                }
+            return {"encodings": encodings, "skipped_small": self.skipped_small}
+
+
+# 进程级共享的压缩统计
+compression_stats = CompressionStats()
+
+
+def _timed(func: Callable[[], bytes]) -> Tuple[bytes, float]:
+    """执行压缩并返回 (结果, 当前线程CPU耗时)"""
+    start = time.thread_time()
+    result = func()
+    return result, time.thread_time() - start
+
+
+class CompressionMiddleware:
+    """
+    响应压缩中间件（纯ASGI实现，支持流式响应）
+
+    - 完整响应：小于minimum_size不压缩，否则一次压缩并更新Content-Length
+    - 流式响应：去掉Content-Length，每个数据块压缩后立即刷新发送
+    - 已经带有Content-Encoding或内容类型在SKIP_CONTENT_TYPES中的响应原样发送
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = DEFAULT_MINIMUM_SIZE,
+        stats: CompressionStats = compression_stats,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.stats = stats
+        self.encoders = available_encoders()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept = Headers(scope=scope).get("accept-encoding", "")
+        encoding = negotiate(accept, self.encoders) if accept else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(
+            send, encoding, self.encoders[encoding], self.minimum_size, self.stats
+        )
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    """单个响应的压缩状态"""
+
+    def __init__(
+        self,
+        send: Send,
+        encoding: str,
+        encoder_factory: Callable[[], Any],
+        minimum_size: int,
+        stats: CompressionStats,
+    ):
+        self._send = send
+        self.encoding = encoding
+        self.encoder_factory = encoder_factory
+        self.minimum_size = minimum_size
+        self.stats = stats
+        self.start_message: Optional[Message] = None
+        # None: 尚未决定；True: 压缩；False: 原样发送
+        self.compress: Optional[bool] = None
+        self.encoder = None
+
+    async def send(self, message: Message):
+        message_type = message["type"]
+
+        if message_type == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            content_type = headers.get("content-type", "")
+            # 范围响应（206）的字节偏移基于未压缩内容，不能压缩
+            if (
+                "content-encoding" in headers
+                or "content-range" in headers
+                or message["status"] == 206
+                or content_type.startswith(SKIP_CONTENT_TYPES)
+            ):
+                self.compress = False
+                await self._send(message)
+            else:
+                # 等到第一个响应体消息再决定是否压缩
+                self.start_message = message
+            return
+
+        if message_type != "http.response.body" or self.compress is False:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compress is None:
+            if not more_body:
+                await self._send_complete(body)
+                return
+            self._begin_stream()
+            await self._send(self.start_message)
+
+        # 流式响应：逐块压缩并刷新
+        encoder = self.encoder
+        if more_body:
+            chunk, cpu = _timed(lambda: encoder.compress(body) + encoder.flush())
+        else:
+            chunk, cpu = _timed(lambda: encoder.compress(body) + encoder.finish())
+        self.stats.record(self.encoding, len(body), len(chunk), cpu)
+        if chunk or not more_body:
+            await self._send(
+                {"type": "http.response.body", "body": chunk, "more_body": more_body}
+            )
+
+    async def _send_complete(self, body: bytes):
+        """发送一次性返回的完整响应"""
+        start = self.start_message
+        if len(body) < self.minimum_size:
+            self.compress = False
+            self.stats.record_skipped()
+            MutableHeaders(raw=start["headers"]).add_vary_header("Accept-Encoding")
+            await self._send(start)
+            await self._send({"type": "http.response.body", "body": body})
+            return
+
+        def compress_body() -> bytes:
+            encoder = self.encoder_factory()
+            return encoder.compress(body) + encoder.finish()
+
+        if len(body) >= THREAD_COMPRESS_SIZE:
+            compressed, cpu = await asyncio.to_thread(_timed, compress_body)
+        else:
+            compressed, cpu = _timed(compress_body)
+
+        self.compress = True
+        self.stats.record(self.encoding, len(body), len(compressed), cpu)
+        self.stats.record_response(self.encoding)
+
+        headers = MutableHeaders(raw=start["headers"])
+        headers["Content-Length"] = str(len(compressed))
+        _mark_encoded(headers, self.encoding)
+        await self._send(start)
+        await self._send({"type": "http.response.body", "body": compressed})
+
+    def _begin_stream(self):
+        """开始流式压缩：修改响应头"""
+        self.compress = True
+        self.encoder = self.encoder_factory()
+        self.stats.record_response(self.encoding)
+
+        headers = MutableHeaders(raw=self.start_message["headers"])
+        if "content-length" in headers:
+            del headers["content-length"]
+        _mark_encoded(headers, self.encoding)
+
+
+def _mark_encoded(headers: MutableHeaders, encoding: str):
+    """设置压缩后的响应头；强ETag只对应未压缩的字节，改为弱ETag"""
+    headers["Content-Encoding"] = encoding
+    headers.add_vary_header("Accept-Encoding")
+    etag = headers.get("etag")
+    if etag and not etag.startswith("W/"):
+        headers["ETag"] = f"W/{etag}"
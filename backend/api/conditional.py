@@ -0,0 +1,82 @@
+"""
+条件请求（ETag / If-None-Match）
+ETag由.git中的引用和索引文件签名计算，不启动git进程；
+客户端发送的ETag仍然有效时直接返回304
+"""
+
+import hashlib
+from typing import Any, Optional
+
+from fastapi import Request, Response
+
+from services.git_wrapper import GitWrapper
+from services.repo_state import index_stamp, refs_state
+
+# 带ETag的响应要求客户端每次使用前重新验证
+CACHE_CONTROL = "no-cache"
+
+
+def compute_etag(wrapper: GitWrapper, *parts: Any) -> Optional[str]:
+    """
+    计算仓库当前状态的强ETag
+
+    Args:
+        wrapper: 仓库对应的GitWrapper
+        parts: 区分不同接口和查询参数的附加内容
+
+    Returns:
+        带引号的ETag；路径不是Git仓库时返回None
+    """
+    git_dir = wrapper.metadata.git_dir
+    if git_dir is None:
+        return None
+    state = (refs_state(git_dir), index_stamp(git_dir), parts)
+    digest = hashlib.blake2b(repr(state).encode("utf-8"), digest_size=16)
+    return f'"{digest.hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    If-None-Match是否匹配ETag（弱比较：压缩中间件会把ETag改为弱ETag）
+
+    Args:
+        if_none_match: 请求头的值，可以包含多个ETag或"*"
+        etag: 当前ETag
+
+    Returns:
+        True表示客户端缓存仍然有效
+    """
+    if not if_none_match:
+        return False
+    etag = etag.removeprefix("W/")
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def not_modified(request: Request, etag: Optional[str]) -> Optional[Response]:
+    """
+    客户端缓存仍然有效时返回304响应
+
+    Args:
+        request: 当前请求
+        etag: compute_etag的返回值
+
+    Returns:
+        304响应；需要正常处理请求时返回None
+    """
+    if etag is None or not etag_matches(request.headers.get("if-none-match"), etag):
+        return None
+    return Response(
+        status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    )
+
+
+def with_etag(response: Response, etag: Optional[str]) -> Response:
+    """为响应设置ETag和Cache-Control"""
+    if etag is not None:
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = CACHE_CONTROL
+    return response
@@ -0,0 +1,141 @@
+"""
+指标端点和HTTP指标中间件
+/metrics 以Prometheus文本格式输出git命令、HTTP请求和各缓存的统计
+"""
+
+import time
+from typing import Any, Dict, Iterable, Tuple
+
+from fastapi import APIRouter, Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from api.compression import compression_stats
+from services.blob_cache import blob_cache
+from services.commit_stats import commit_stats_cache
+from services.log_cache import log_cache
+from services.metrics import (
+    CONTENT_TYPE,
+    http_request_duration,
+    http_response_size,
+    metrics,
+)
+from services.status_cache import status_cache
+from services.tree_index import tree_index_cache
+
+router = APIRouter(tags=["metrics"])
+
+# 未匹配到路由的请求使用的route标签（避免按原始路径产生大量序列）
+UNMATCHED_ROUTE = "unmatched"
+
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Prometheus文本格式的运行指标"""
+    return Response(metrics.render(), media_type=CONTENT_TYPE)
+
+
+def route_label(scope: Scope) -> str:
+    """
+    请求匹配到的路由模板，如 /api/repository/log
+
+    路由匹配后Starlette会把endpoint写入scope，按endpoint查找路由的路径模板
+    """
+    endpoint = scope.get("endpoint")
+    app = scope.get("app")
+    if endpoint is None or app is None:
+        return UNMATCHED_ROUTE
+    for route in getattr(app, "routes", ()):
+        if getattr(route, "endpoint", None) is endpoint:
+            return route.path
+    return UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """
+    HTTP指标中间件（纯ASGI实现）
+
+    记录每个请求到响应体发送完毕的耗时和发送的响应体字节数；
+    作为最外层中间件时字节数是压缩后的实际传输大小
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+        size = 0
+
+        async def send_wrapper(message: Message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = route_label(scope)
+            method = scope["method"]
+            http_request_duration.observe(
+                method, route, status, value=time.perf_counter() - start
+            )
+            http_response_size.observe(method, route, value=size)
+
+
+def _stats_samples(
+    name: str, documentation: str, labels: Dict[str, str], stats: Dict[str, Any]
+) -> Iterable[Tuple[str, str, Dict[str, str], Any]]:
+    """把stats()字典转换为 chronos_<name>{stat="..."} 样本"""
+    for stat, value in stats.items():
+        yield name, documentation, {**labels, "stat": stat}, value
+
+
+def _collect_caches() -> Iterable[Tuple[str, str, Dict[str, str], Any]]:
+    """各缓存的统计信息"""
+    documentation = "缓存统计（stats()快照）"
+    yield from _stats_samples(
+        "chronos_cache", documentation, {"cache": "log"}, log_cache.stats()
+    )
+    yield from _stats_samples(
+        "chronos_cache", documentation, {"cache": "status"}, status_cache.stats()
+    )
+    yield from _stats_samples(
+        "chronos_cache",
+        documentation,
+        {"cache": "tree_index"},
+        tree_index_cache.stats(),
+    )
+    yield from _stats_samples(
+        "chronos_cache", documentation, {"cache": "blob"}, blob_cache.stats()
+    )
+    yield from _stats_samples(
+        "chronos_cache",
+        documentation,
+        {"cache": "commit_stats"},
+        commit_stats_cache.stats(),
+    )
+
+    stats = compression_stats.stats()
+    for encoding, entry in stats["encodings"].items():
+        yield from _stats_samples(
+            "chronos_compression",
+            "响应压缩统计（按编码）",
+            {"encoding": encoding},
+            entry,
+        )
+    yield (
+        "chronos_compression_skipped_small",
+        "因为太小而未压缩的响应数",
+        {},
+        stats["skipped_small"],
+    )
+
+
+metrics.add_collector(_collect_caches)
@@ -2,11 +2,25 @@
 仓库操作API端点
 """
 
-from fastapi import APIRouter, HTTPException
-
+import asyncio
+import json
+import time
+from typing import Any, AsyncIterator, Awaitable, Dict, List, Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+
+from api.blob import (
+    RangeNotSatisfiable,
+    blob_etag,
+    cache_control,
+    media_type,
+    parse_range,
+)
+from api.conditional import compute_etag, etag_matches, not_modified, with_etag
+from api.serialization import api_response, dumps, project, project_list
 from models.schemas import (
     ApiResponse,
-    BranchesResponse,
     BranchInfo,
     CheckoutCommitRequest,
     CommitInfo,
@@ -14,20 +28,64 @@ from models.schemas import (
     CreateCommitRequest,
     FileChange,
     InitRepositoryRequest,
+    MaintenanceRequest,
     MergeBranchRequest,
     RepositoryStatus,
     SwitchBranchRequest,
 )
+from services.blob_cache import blob_cache
 from services.git_wrapper import (
+    CONFLICT_FILE_MAX_BYTES,
     GitError,
-    GitWrapper,
     InvalidPathError,
     MergeConflictError,
     RepositoryNotFoundError,
 )
+from services.maintenance import maintenance_scheduler
+from services.repo_registry import get_git_wrapper
+from services.watcher import repo_watchers
 
 router = APIRouter(prefix="/repository", tags=["repository"])
 
+# 流式输出时每个数据块的大致字节数
+NDJSON_CHUNK_SIZE = 64 * 1024
+
+# SSE连接没有事件时发送心跳的间隔（秒）
+SSE_KEEPALIVE_SECONDS = 15.0
+
+
+# 以下函数把GitWrapper的返回值转换为接口数据，
+# 按模型字段直接编码，不逐条构建Pydantic模型
+def _status_data(status: Dict[str, Any]) -> Dict[str, Any]:
+    """/status 的响应数据"""
+    data = project(status, RepositoryStatus)
+    data["changes"] = project_list(status["changes"], FileChange)
+    return data
+
+
+def _files_data(files: List[str]) -> Dict[str, Any]:
+    """/files 的响应数据"""
+    return {"files": files, "count": len(files)}
+
+
+def _log_data(
+    commits: List[Dict[str, Any]], total: int, limit: Optional[int]
+) -> Dict[str, Any]:
+    """/log 的响应数据，返回满一页时提供下一页游标"""
+    logs = project_list(commits, CommitInfo)
+    next_cursor = None
+    if limit and len(logs) == limit:
+        next_cursor = logs[-1]["id"]
+    return {"logs": logs, "total": total, "next_cursor": next_cursor}
+
+
+def _branches_data(result: Dict[str, Any]) -> Dict[str, Any]:
+    """/branches 的响应数据"""
+    return {
+        "branches": project_list(result["branches"], BranchInfo),
+        "current": result["current"],
+    }
+
 
 @router.post("/init", response_model=ApiResponse)
 async def init_repository(request: InitRepositoryRequest):
@@ -47,8 +105,8 @@ async def init_repository(request: InitRepositoryRequest):
     - cleaned_files: 清理的系统文件列表
     """
     try:
-        wrapper = GitWrapper(request.path)
-        result = wrapper.init_repository()
+        wrapper = get_git_wrapper(request.path)
+        result = await wrapper.init_repository_async()
 
         return ApiResponse(
             success=result["success"],
@@ -75,17 +133,80 @@ async def get_status(path: str):
     返回当前分支和文件变更列表
     """
     try:
-        wrapper = GitWrapper(path)
-        status = wrapper.get_status()
+        wrapper = get_git_wrapper(path)
+        status = await wrapper.get_status_async()
 
-        # 转换为Pydantic模型
-        changes = [FileChange(**change) for change in status["changes"]]
-        status_data = RepositoryStatus(
-            branch=status["branch"], changes=changes, is_clean=status["is_clean"]
+        return api_response(_status_data(status), "获取状态成功")
+    except RepositoryNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except GitError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"未知错误: {str(e)}")
+
+
+@router.get("/overview", response_model=ApiResponse)
+async def get_overview(path: str, log_limit: int = Query(50, ge=1)):
+    """
+    获取打开仓库所需的全部数据
+
+    只验证一次仓库，然后并发获取status、branches、files和第一页log，
+    总耗时取决于最慢的一项
+
+    返回数据包含：
+    - status / branches / files / log: 与对应接口的data相同
+    - timings: 每一项的耗时（毫秒）和总耗时
+    - errors: 失败项的错误信息（其余项照常返回）
+    """
+    try:
+        start = time.perf_counter()
+        wrapper = get_git_wrapper(path)
+        await asyncio.to_thread(wrapper._verify_repository)
+
+        async def log_head():
+            commits, total = await asyncio.gather(
+                wrapper.get_log_async(limit=log_limit),
+                wrapper.count_commits_async(),
+            )
+            return _log_data(commits, total, log_limit)
+
+        async def status():
+            return _status_data(await wrapper.get_status_async())
+
+        async def branches():
+            return _branches_data(await wrapper.get_branches_async())
+
+        async def files():
+            return _files_data(await wrapper.get_tracked_files_async())
+
+        sections = {
+            "status": status(),
+            "branches": branches(),
+            "files": files(),
+            "log": log_head(),
+        }
+        results = await asyncio.gather(
+            *(_timed_section(coro) for coro in sections.values())
         )
 
-        return ApiResponse(
-            success=True, message="获取状态成功", data=status_data.model_dump()
+        data: Dict[str, Any] = {}
+        timings: Dict[str, float] = {}
+        errors: Dict[str, str] = {}
+        for name, (result, elapsed) in zip(sections, results, strict=True):
+            timings[name] = elapsed
+            if isinstance(result, Exception):
+                data[name] = None
+                errors[name] = str(result)
+            else:
+                data[name] = result
+        timings["total"] = round((time.perf_counter() - start) * 1000, 2)
+        data["timings"] = timings
+        data["errors"] = errors
+
+        return api_response(
+            data,
+            "获取仓库概览成功" if not errors else "部分数据获取失败",
+            success=not errors,
         )
     except RepositoryNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
@@ -95,21 +216,39 @@ async def get_status(path: str):
         raise HTTPException(status_code=500, detail=f"未知错误: {str(e)}")
 
 
+async def _timed_section(coro: Awaitable[Any]):
+    """
+    执行概览中的一项并计时
+
+    Returns:
+        (结果或异常, 耗时毫秒)
+    """
+    start = time.perf_counter()
+    try:
+        result = await coro
+    except Exception as e:
+        result = e
+    return result, round((time.perf_counter() - start) * 1000, 2)
+
+
 @router.get("/files", response_model=ApiResponse)
-async def get_tracked_files(path: str):
+async def get_tracked_files(request: Request, path: str):
     """
     获取所有已追踪的文件列表
 
-    返回仓库中所有被Git追踪的文件
+    返回仓库中所有被Git追踪的文件；支持If-None-Match条件请求
     """
     try:
-        wrapper = GitWrapper(path)
-        files = wrapper.get_tracked_files()
+        wrapper = get_git_wrapper(path)
+        etag = compute_etag(wrapper, "files")
+        cached = not_modified(request, etag)
+        if cached is not None:
+            return cached
 
-        return ApiResponse(
-            success=True,
-            message=f"获取到{len(files)}个已追踪文件",
-            data={"files": files, "count": len(files)},
+        files = await wrapper.get_tracked_files_async()
+
+        return with_etag(
+            api_response(_files_data(files), f"获取到{len(files)}个已追踪文件"), etag
         )
     except RepositoryNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
@@ -119,6 +258,109 @@ async def get_tracked_files(path: str):
         raise HTTPException(status_code=500, detail=f"未知错误: {str(e)}")
 
 
+@router.get("/tree", response_model=ApiResponse)
+async def get_tree(path: str, dir: str = "", depth: int = Query(1, ge=1)):
+    """
+    获取已追踪文件目录树中一个目录的内容
+
+    - dir: 目录相对路径，默认仓库根目录
+    - depth: 展开的层数，默认只返回直接子项
+
+    返回数据包含目录的file_count、size和children；
+    子项中文件夹带有file_count、size（递归统计），文件带有size
+    """
+    try:
+        wrapper = get_git_wrapper(path)
+        tree = await wrapper.get_tree_async(dir, depth)
+
+        return api_response(tree, f"获取到{len(tree['children'])}个子项")
+    except RepositoryNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except GitError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"未知错误: {str(e)}")
+
+
+@router.get("/blob")
+async def get_blob(
+    request: Request,
+    path: str,
+    commit: str = Query(..., min_length=1),
+    file: str = Query(..., min_length=1),
+):
+    """
+    获取快照中一个文件的原始内容
+
+    - commit: 提交ID或分支名称
+    - file: 文件相对路径
+
+    ETag为blob OID；commit为完整提交ID时响应可长期缓存（immutable）。
+    支持单个字节范围（Range / If-Range），大文件流式返回
+    """
+    try:
+        wrapper = get_git_wrapper(path)
+        oid, size = await asyncio.to_thread(wrapper.resolve_blob, commit, file)
+    except RepositoryNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except GitError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"未知错误: {str(e)}")
+
+    etag = blob_etag(oid)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": cache_control(commit),
+        "Accept-Ranges": "bytes",
+        "X-Content-Type-Options": "nosniff",
+    }
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    # If-Range不匹配（文件已变化）时忽略Range，返回完整内容
+    if_range = request.headers.get("if-range")
+    try:
+        byte_range = None
+        if if_range is None or if_range.strip() == etag:
+            byte_range = parse_range(request.headers.get("range"), size)
+    except RangeNotSatisfiable:
+        headers["Content-Range"] = f"bytes */{size}"
+        return Response(status_code=416, headers=headers)
+
+    status_code = 200
+    start, end = 0, size
+    if byte_range is not None:
+        start, end = byte_range
+        status_code = 206
+        headers["Content-Range"] = f"bytes {start}-{end - 1}/{size}"
+
+    try:
+        if blob_cache.cacheable(size):
+            content = await asyncio.to_thread(wrapper.read_blob, oid)
+            return Response(
+                content=content[start:end],
+                status_code=status_code,
+                media_type=media_type(file, content),
+                headers=headers,
+            )
+        headers["Content-Length"] = str(end - start)
+        return StreamingResponse(
+            wrapper.iter_blob_async(oid, start, end),
+            status_code=status_code,
+            media_type=media_type(file),
+            headers=headers,
+        )
+    except GitError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"未知错误: {str(e)}")
+
+
 @router.post("/commit", response_model=ApiResponse)
 async def create_commit(request: CreateCommitRequest):
     """
@@ -131,8 +373,8 @@ async def create_commit(request: CreateCommitRequest):
             f"DEBUG: Received commit request - path: {request.path}, "
             f"message: {request.message}, files: {request.files}"
         )
-        wrapper = GitWrapper(request.path)
-        result = wrapper.create_commit(request.message, request.files)
+        wrapper = get_git_wrapper(request.path)
+        result = await wrapper.create_commit_async(request.message, request.files)
         print(f"DEBUG: Git wrapper result: {result}")
 
         if not result["success"]:
@@ -164,32 +406,108 @@ async def create_commit(request: CreateCommitRequest):
 
 
 @router.get("/log", response_model=ApiResponse)
-async def get_log(path: str, limit: int = None, branch: str = None):
+async def get_log(
+    request: Request,
+    path: str,
+    limit: int = None,
+    branch: str = None,
+    after: str = None,
+    page_size: int = Query(None, ge=1),
+    stream: bool = False,
+    stats: bool = False,
+):
     """
     获取提交历史
 
     返回提交历史记录列表
+
+    - after: 分页游标（上一页最后一条提交的ID），返回该提交之后的记录
+    - page_size: 分页大小，与limit含义相同
+    - stream: 为true时以NDJSON格式流式返回，每行一条提交记录
+    - stats: 为true时每条记录附带变更统计（文件数、新增和删除行数），
+      按提交缓存，只计算新出现的提交；流式返回时不附带
+
+    支持If-None-Match条件请求
     """
+    limit = page_size or limit
     try:
-        wrapper = GitWrapper(path)
-        commits = wrapper.get_log(limit=limit, branch=branch)
+        wrapper = get_git_wrapper(path)
+        etag = compute_etag(wrapper, "log", limit, branch, after, stream, stats)
+        cached = not_modified(request, etag)
+        if cached is not None:
+            return cached
+
+        if stream:
+            commits = wrapper.iter_log_async(branch=branch, after=after, limit=limit)
+            # 先取出第一条记录，让仓库不存在、游标无效等错误以正常状态码返回
+            try:
+                first = await commits.__anext__()
+            except StopAsyncIteration:
+                first = None
+            return with_etag(
+                StreamingResponse(
+                    _stream_ndjson(first, commits), media_type="application/x-ndjson"
+                ),
+                etag,
+            )
+
+        commits, total = await asyncio.gather(
+            wrapper.get_log_async(
+                limit=limit, branch=branch, after=after, with_stats=stats
+            ),
+            wrapper.count_commits_async(branch=branch),
+        )
 
-        # 转换为Pydantic模型
-        commits_data = [CommitInfo(**commit).model_dump() for commit in commits]
+        log_data = _log_data(commits, total, limit)
 
-        return ApiResponse(
-            success=True,
-            message=f"获取到{len(commits_data)}条提交记录",
-            data={"logs": commits_data},
+        return with_etag(
+            api_response(log_data, f"获取到{len(log_data['logs'])}条提交记录"), etag
         )
     except RepositoryNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except GitError as e:
         raise HTTPException(status_code=500, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"未知错误: {str(e)}")
 
 
+async def _stream_ndjson(
+    first: Optional[Dict[str, Any]], commits: AsyncIterator[Dict[str, Any]]
+) -> AsyncIterator[bytes]:
+    """
+    将提交记录编码为NDJSON并按块输出
+
+    Args:
+        first: 已经取出的第一条记录
+        commits: 剩余记录的异步迭代器
+
+    Yields:
+        NDJSON字节块
+    """
+    if first is None:
+        return
+
+    lines = [dumps(first)]
+    size = len(lines[0])
+    try:
+        async for commit in commits:
+            line = dumps(commit)
+            lines.append(line)
+            size += len(line)
+            if size >= NDJSON_CHUNK_SIZE:
+                yield b"\n".join(lines) + b"\n"
+                lines = []
+                size = 0
+    finally:
+        # 客户端断开时也要关闭迭代器，终止git进程
+        await commits.aclose()
+
+    if lines:
+        yield b"\n".join(lines) + b"\n"
+
+
 @router.post("/checkout", response_model=ApiResponse)
 async def checkout_commit(request: CheckoutCommitRequest):
     """
@@ -198,8 +516,8 @@ async def checkout_commit(request: CheckoutCommitRequest):
     将工作区恢复到指定提交的状态
     """
     try:
-        wrapper = GitWrapper(request.path)
-        result = wrapper.checkout_commit(request.commit_id)
+        wrapper = get_git_wrapper(request.path)
+        result = await wrapper.checkout_commit_async(request.commit_id)
 
         return ApiResponse(
             success=result["success"],
@@ -220,23 +538,22 @@ async def checkout_commit(request: CheckoutCommitRequest):
 
 
 @router.get("/branches", response_model=ApiResponse)
-async def get_branches(path: str):
+async def get_branches(request: Request, path: str):
     """
     获取分支列表
 
-    返回所有分支和当前分支
+    返回所有分支和当前分支；支持If-None-Match条件请求
     """
     try:
-        wrapper = GitWrapper(path)
-        result = wrapper.get_branches()
+        wrapper = get_git_wrapper(path)
+        etag = compute_etag(wrapper, "branches")
+        cached = not_modified(request, etag)
+        if cached is not None:
+            return cached
 
-        # 转换为Pydantic模型
-        branches = [BranchInfo(**branch) for branch in result["branches"]]
-        branches_data = BranchesResponse(branches=branches, current=result["current"])
+        result = await wrapper.get_branches_async()
 
-        return ApiResponse(
-            success=True, message="获取分支列表成功", data=branches_data.model_dump()
-        )
+        return with_etag(api_response(_branches_data(result), "获取分支列表成功"), etag)
     except RepositoryNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except GitError as e:
@@ -253,8 +570,8 @@ async def create_branch(request: CreateBranchRequest):
     在当前提交创建新分支
     """
     try:
-        wrapper = GitWrapper(request.path)
-        result = wrapper.create_branch(request.branch_name)
+        wrapper = get_git_wrapper(request.path)
+        result = await wrapper.create_branch_async(request.branch_name)
 
         return ApiResponse(
             success=result["success"],
@@ -279,8 +596,8 @@ async def switch_branch(request: SwitchBranchRequest):
     切换到指定分支
     """
     try:
-        wrapper = GitWrapper(request.path)
-        result = wrapper.switch_branch(request.branch_name)
+        wrapper = get_git_wrapper(request.path)
+        result = await wrapper.switch_branch_async(request.branch_name)
 
         return ApiResponse(
             success=result["success"],
@@ -308,8 +625,10 @@ async def merge_branch(request: MergeBranchRequest):
     将源分支合并到目标分支
     """
     try:
-        wrapper = GitWrapper(request.path)
-        result = wrapper.merge_branch(request.source_branch, request.target_branch)
+        wrapper = get_git_wrapper(request.path)
+        result = await wrapper.merge_branch_async(
+            request.source_branch, request.target_branch
+        )
 
         return ApiResponse(
             success=result["success"],
@@ -328,3 +647,228 @@ async def merge_branch(request: MergeBranchRequest):
         raise HTTPException(status_code=500, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"未知错误: {str(e)}")
+
+
+@router.get("/merge/preview", response_model=ApiResponse)
+async def preview_merge(
+    request: Request,
+    path: str,
+    source_branch: str = Query(..., min_length=1, description="源分支（要合并的分支）"),
+    target_branch: Optional[str] = Query(
+        None, description="目标分支（合并到的分支），不指定表示当前分支"
+    ),
+):
+    """
+    预演合并
+
+    在对象库中计算合并结果（git merge-tree --write-tree），不切换分支、不修改工作区，
+    返回是否可以无冲突合并和冲突文件列表；支持If-None-Match条件请求
+    """
+    try:
+        wrapper = get_git_wrapper(path)
+        etag = compute_etag(wrapper, "merge-preview", source_branch, target_branch)
+        cached = not_modified(request, etag)
+        if cached is not None:
+            return cached
+
+        result = await wrapper.preview_merge_async(source_branch, target_branch)
+
+        if result["clean"]:
+            message = "可以无冲突合并"
+        else:
+            message = f"合并会产生冲突: {len(result['conflicts'])}个文件"
+        return with_etag(api_response(result, message), etag)
+    except RepositoryNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except GitError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"未知错误: {str(e)}")
+
+
+@router.get("/merge/conflicts", response_model=ApiResponse)
+async def get_conflict_details(
+    request: Request,
+    path: str,
+    source_branch: Optional[str] = Query(
+        None, description="源分支；指定时预演合并得到冲突，不指定时读取索引中的冲突"
+    ),
+    target_branch: Optional[str] = Query(
+        None, description="目标分支，不指定表示当前分支"
+    ),
+    max_bytes: int = Query(
+        CONFLICT_FILE_MAX_BYTES,
+        ge=0,
+        le=16 * 1024 * 1024,
+        description="单个版本内容的大小上限（字节）",
+    ),
+):
+    """
+    获取冲突详情
+
+    一次返回所有冲突文件的base/ours/theirs三个版本（大小、是否二进制、文本内容），
+    内容通过cat-file常驻进程批量读取；支持If-None-Match条件请求
+    """
+    try:
+        wrapper = get_git_wrapper(path)
+        etag = compute_etag(
+            wrapper, "merge-conflicts", source_branch, target_branch, max_bytes
+        )
+        cached = not_modified(request, etag)
+        if cached is not None:
+            return cached
+
+        result = await wrapper.get_conflict_details_async(
+            source_branch, target_branch, max_bytes
+        )
+
+        return with_etag(
+            api_response(result, f"获取冲突详情成功: {len(result['files'])}个文件"),
+            etag,
+        )
+    except RepositoryNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except GitError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"未知错误: {str(e)}")
+
+
+@router.get("/maintenance", response_model=ApiResponse)
+async def get_maintenance_status(path: str):
+    """
+    获取仓库维护状态
+
+    返回数据包含：
+    - stats: 松散对象数量、pack数量、commit-graph是否存在等统计
+    - planned_tasks: 按当前统计需要执行的维护任务
+    - running: 是否正在执行维护
+    - idle_seconds: 仓库空闲时间
+    - last_run: 最近一轮维护的结果
+    """
+    try:
+        wrapper = get_git_wrapper(path)
+        status = await asyncio.to_thread(maintenance_scheduler.get_status, wrapper)
+
+        return ApiResponse(success=True, message="获取维护状态成功", data=status)
+    except RepositoryNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except GitError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"未知错误: {str(e)}")
+
+
+@router.post("/maintenance", response_model=ApiResponse)
+async def run_maintenance(request: MaintenanceRequest):
+    """
+    手动触发仓库维护
+
+    等待正在进行的写操作完成后依次执行commit-graph写入、增量repack和prune，
+    返回每个任务的执行结果和耗时
+    """
+    try:
+        wrapper = get_git_wrapper(request.path)
+        await asyncio.to_thread(wrapper._verify_repository)
+        result = await asyncio.to_thread(
+            maintenance_scheduler.run, wrapper, request.tasks
+        )
+
+        if result is None:
+            return ApiResponse(success=False, message="该仓库正在执行维护")
+
+        success = all(task["success"] for task in result["tasks"])
+        return ApiResponse(
+            success=success,
+            message="仓库维护完成" if success else "部分维护任务失败",
+            data=result,
+        )
+    except RepositoryNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except GitError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"未知错误: {str(e)}")
+
+
+@router.get("/events")
+async def repository_events(request: Request, path: str):
+    """
+    订阅仓库变化事件（Server-Sent Events）
+
+    连接建立后先推送ready事件，之后在仓库发生变化时推送：
+    - worktree_changed: 工作区文件或暂存区变化，data.paths为变化的文件（已过滤忽略文件）
+    - head_moved: HEAD指向的提交变化
+    - branches_changed: 分支列表或分支指向变化
+
+    客户端收到事件后再重新请求对应的接口
+    """
+    try:
+        wrapper = get_git_wrapper(path)
+        await asyncio.to_thread(wrapper._verify_repository)
+        watcher, subscriber = await asyncio.to_thread(
+            repo_watchers.subscribe, wrapper, asyncio.get_running_loop()
+        )
+    except RepositoryNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except GitError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"未知错误: {str(e)}")
+
+    async def unsubscribe():
+        await asyncio.to_thread(
+            repo_watchers.unsubscribe, wrapper.repo_path, subscriber
+        )
+
+    ready = {"backend": watcher.backend_name, "generation": watcher.generation}
+    return StreamingResponse(
+        _stream_events(request, ready, subscriber.queue, unsubscribe),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _format_sse(event: str, data: Dict[str, Any]) -> bytes:
+    """编码为一条SSE消息"""
+    payload = json.dumps(data, ensure_ascii=False)
+    return f"event: {event}\ndata: {payload}\n\n".encode("utf-8")
+
+
+async def _stream_events(
+    request: Request,
+    ready: Dict[str, Any],
+    queue: "asyncio.Queue[Dict[str, Any]]",
+    unsubscribe,
+) -> AsyncIterator[bytes]:
+    """
+    输出SSE事件流，客户端断开后取消订阅
+
+    Args:
+        request: 当前请求（用于检测客户端断开）
+        ready: ready事件的数据
+        queue: 订阅者的事件队列
+        unsubscribe: 取消订阅的协程函数
+
+    Yields:
+        SSE消息字节
+    """
+    try:
+        yield b"retry: 3000\n\n" + _format_sse("ready", ready)
+        while not await request.is_disconnected():
+            try:
+                event = await asyncio.wait_for(
+                    queue.get(), timeout=SSE_KEEPALIVE_SECONDS
+                )
+            except asyncio.TimeoutError:
+                yield b": keepalive\n\n"
+                continue
+            yield _format_sse(event["type"], event)
+    finally:
+        await unsubscribe()
@@ -0,0 +1,111 @@
+"""
+大响应的快速序列化
+GitWrapper返回的字典直接编码为JSON字节，不再为每条记录构建Pydantic模型，
+也不再经过response_model的二次校验；接口的OpenAPI定义保持不变
+"""
+
+import json
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type
+
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 未安装orjson时使用标准库
+    orjson = None
+
+# 当前使用的JSON编码器
+JSON_ENCODER = "orjson" if orjson is not None else "json"
+
+
+def dumps(content: Any) -> bytes:
+    """
+    编码为UTF-8 JSON字节（非ASCII字符不转义）
+
+    Args:
+        content: 只包含dict/list/str/int/float/bool/None的数据
+
+    Returns:
+        JSON字节
+    """
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode(
+        "utf-8"
+    )
+
+
+class FastJSONResponse(Response):
+    """使用dumps编码的JSON响应"""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+# 模型字段缓存：模型 -> ((字段名, 默认值, 默认值工厂), ...)
+_MODEL_FIELDS: Dict[Type[BaseModel], Tuple[Tuple[str, Any, Any], ...]] = {}
+
+
+def _model_fields(model: Type[BaseModel]) -> Tuple[Tuple[str, Any, Any], ...]:
+    fields = _MODEL_FIELDS.get(model)
+    if fields is None:
+        fields = tuple(
+            (name, None if info.is_required() else info.default, info.default_factory)
+            for name, info in model.model_fields.items()
+        )
+        _MODEL_FIELDS[model] = fields
+    return fields
+
+
+def _project(item: Dict[str, Any], fields) -> Dict[str, Any]:
+    result = {}
+    for name, default, factory in fields:
+        if name in item:
+            result[name] = item[name]
+        else:
+            result[name] = factory() if factory is not None else default
+    return result
+
+
+def project(item: Dict[str, Any], model: Type[BaseModel]) -> Dict[str, Any]:
+    """
+    按模型字段挑选字典中的键（与model(**item).model_dump()的键和顺序一致）
+
+    Args:
+        item: GitWrapper返回的字典
+        model: 接口文档中声明的模型
+
+    Returns:
+        只包含模型字段的新字典，缺少的字段使用模型默认值
+    """
+    return _project(item, _model_fields(model))
+
+
+def project_list(
+    items: Iterable[Dict[str, Any]], model: Type[BaseModel]
+) -> List[Dict[str, Any]]:
+    """对列表中的每个字典执行project"""
+    fields = _model_fields(model)
+    return [_project(item, fields) for item in items]
+
+
+def api_response(
+    data: Any, message: Optional[str] = None, success: bool = True
+) -> FastJSONResponse:
+    """
+    构建与ApiResponse结构一致的快速响应
+
+    Args:
+        data: 响应数据
+        message: 响应消息
+        success: 操作是否成功
+
+    Returns:
+        FastJSONResponse
+    """
+    return FastJSONResponse(
+        {"success": success, "message": message, "data": data, "error": None}
+    )
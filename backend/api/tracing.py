@@ -0,0 +1,271 @@
+"""
+请求耗时明细
+为每个请求开启追踪（services.tracing），在Server-Timing响应头中返回各步骤耗时；
+超过阈值的请求连同仓库规模写入按大小轮转的JSON Lines慢请求日志
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qs
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from api.metrics import route_label
+from services.log_cache import log_cache
+from services.repo_registry import git_wrappers
+from services.repo_state import index_entry_count, read_head
+from services.tracing import RequestTrace, end_trace, start_trace
+
+# 慢请求阈值（毫秒），可通过环境变量 CHRONOS_SLOW_REQUEST_MS 调整，0表示不记录
+DEFAULT_SLOW_REQUEST_MS = 1000.0
+
+# 慢请求日志路径，可通过环境变量 CHRONOS_SLOW_LOG 调整
+DEFAULT_SLOW_LOG_PATH = Path.home() / ".chronos" / "logs" / "slow_requests.jsonl"
+
+# 单个日志文件的最大字节数和保留的历史文件数
+SLOW_LOG_MAX_BYTES = 5 * 1024 * 1024
+SLOW_LOG_BACKUP_COUNT = 3
+
+# 为了从POST请求体中取出仓库路径而保留的最大请求体字节数
+MAX_CAPTURED_BODY = 64 * 1024
+
+
+def format_server_timing(trace: RequestTrace) -> str:
+    """
+    生成Server-Timing响应头
+
+    同名步骤合并为一项，多次执行时在desc中注明次数，最后一项为请求总耗时，如
+    git-status;dur=12.3, parse-status;dur=0.4, git-log;dur=8.1;desc="2x", total;dur=25
+    """
+    items = []
+    for name, entry in trace.summary().items():
+        item = f"{name};dur={entry['ms']}"
+        if entry["count"] > 1:
+            item += f';desc="{entry["count"]}x"'
+        items.append(item)
+    items.append(f"total;dur={round(trace.elapsed() * 1000, 2)}")
+    return ", ".join(items)
+
+
+def repo_characteristics(repo_path: str) -> Dict[str, Any]:
+    """
+    仓库规模（用于慢请求日志）
+
+    文件数读取自索引文件头；提交数优先使用提交历史缓存，否则执行git rev-list --count。
+    只查询注册表中已有的仓库，不为请求路径创建GitWrapper（避免淘汰打开中的仓库）
+
+    Args:
+        repo_path: 请求中的仓库路径
+
+    Returns:
+        {"path", "tracked_files", "commits", "index_bytes"}；
+        不是已注册的Git仓库时返回空字典
+    """
+    wrapper = git_wrappers.peek(repo_path)
+    if wrapper is None:
+        return {}
+    git_dir = wrapper.metadata.git_dir
+    if git_dir is None:
+        return {}
+
+    # 在读锁内读取，HEAD、索引和提交数来自同一个仓库状态
+    with wrapper.lock.read():
+        _, head = read_head(git_dir)
+        entry = log_cache.get(wrapper.repo_path, "HEAD")
+        if head is None:
+            commits = 0
+        elif entry is not None and entry.tip == head:
+            commits = len(entry.commits)
+        else:
+            commits = wrapper.count_commits()
+
+        try:
+            index_bytes = (git_dir / "index").stat().st_size
+        except OSError:
+            index_bytes = 0
+        tracked_files = index_entry_count(git_dir)
+
+    return {
+        "path": str(wrapper.repo_path),
+        "tracked_files": tracked_files,
+        "commits": commits,
+        "index_bytes": index_bytes,
+    }
+
+
+class SlowRequestLog:
+    """慢请求日志（JSON Lines，按大小轮转）"""
+
+    def __init__(
+        self,
+        threshold_ms: Optional[float] = None,
+        path: Optional[Path] = None,
+        max_bytes: int = SLOW_LOG_MAX_BYTES,
+        backup_count: int = SLOW_LOG_BACKUP_COUNT,
+    ):
+        """
+        初始化慢请求日志
+
+        Args:
+            threshold_ms: 阈值（毫秒），None表示读取环境变量或使用默认值
+            path: 日志文件路径，None表示读取环境变量或使用默认值
+            max_bytes: 单个文件的最大字节数
+            backup_count: 保留的历史文件数
+        """
+        if threshold_ms is None:
+            threshold_ms = float(
+                os.environ.get("CHRONOS_SLOW_REQUEST_MS", DEFAULT_SLOW_REQUEST_MS)
+            )
+        if path is None:
+            path = Path(os.environ.get("CHRONOS_SLOW_LOG", DEFAULT_SLOW_LOG_PATH))
+        self.threshold_ms = threshold_ms
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self._handler: Optional[logging.Handler] = None
+        self._lock = threading.Lock()
+
+    def is_slow(self, duration_ms: float) -> bool:
+        """请求是否需要记录"""
+        return self.threshold_ms > 0 and duration_ms >= self.threshold_ms
+
+    def _get_handler(self) -> logging.Handler:
+        """第一次写入时创建日志目录和文件"""
+        if self._handler is None:
+            # 大多数运行不会出现慢请求，第一次写入时才加载
+            import logging.handlers
+
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._handler = logging.handlers.RotatingFileHandler(
+                self.path,
+                maxBytes=self.max_bytes,
+                backupCount=self.backup_count,
+                encoding="utf-8",
+            )
+        return self._handler
+
+    def write(self, entry: Dict[str, Any]):
+        """写入一条记录"""
+        line = json.dumps(entry, ensure_ascii=False, default=str)
+        record = logging.makeLogRecord({"msg": line, "levelno": logging.WARNING})
+        with self._lock:
+            try:
+                self._get_handler().emit(record)
+            except OSError as e:
+                print(f"WARNING: 写入慢请求日志失败: {e}")
+
+    def close(self):
+        """关闭日志文件"""
+        with self._lock:
+            if self._handler is not None:
+                self._handler.close()
+                self._handler = None
+
+
+# 进程级共享的慢请求日志
+slow_request_log = SlowRequestLog()
+
+
+def _request_repo_path(scope: Scope, body: bytes) -> Optional[str]:
+    """从查询参数或JSON请求体中取出仓库路径"""
+    query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+    if query.get("path"):
+        return query["path"][0]
+    if body:
+        try:
+            data = json.loads(body)
+        except ValueError:
+            return None
+        if isinstance(data, dict) and isinstance(data.get("path"), str):
+            return data["path"]
+    return None
+
+
+def _build_slow_entry(
+    scope: Scope, status: int, trace: RequestTrace, duration_ms: float, body: bytes
+) -> Dict[str, Any]:
+    """生成慢请求日志记录（在线程池中执行，可能运行git命令统计提交数）"""
+    repo = {}
+    repo_path = _request_repo_path(scope, body)
+    if repo_path:
+        try:
+            repo = repo_characteristics(repo_path)
+        except Exception as e:
+            repo = {"path": repo_path, "error": str(e)}
+    return {
+        "timestamp": time.time(),
+        "method": scope["method"],
+        "path": scope["path"],
+        "route": route_label(scope),
+        "status": status,
+        "duration_ms": round(duration_ms, 2),
+        "spans": trace.summary(),
+        "repo": repo,
+    }
+
+
+class TracingMiddleware:
+    """
+    请求追踪中间件（纯ASGI实现）
+
+    - 请求期间的git命令和解析步骤记录在同一个RequestTrace中
+    - 响应开始时写入Server-Timing头（流式响应只包含开始前的步骤）
+    - 响应结束后耗时超过阈值的请求写入慢请求日志（SSE事件流除外）
+    """
+
+    def __init__(self, app: ASGIApp, slow_log: SlowRequestLog = slow_request_log):
+        self.app = app
+        self.slow_log = slow_log
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace, token = start_trace()
+        status = 500
+        streaming_events = False
+        body_chunks = []
+        body_size = 0
+
+        async def receive_wrapper() -> Message:
+            nonlocal body_size
+            message = await receive()
+            if message["type"] == "http.request" and body_size < MAX_CAPTURED_BODY:
+                chunk = message.get("body", b"")
+                body_chunks.append(chunk)
+                body_size += len(chunk)
+            return message
+
+        async def send_wrapper(message: Message):
+            nonlocal status, streaming_events
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = MutableHeaders(raw=message["headers"])
+                streaming_events = headers.get("content-type", "").startswith(
+                    "text/event-stream"
+                )
+                headers["Server-Timing"] = format_server_timing(trace)
+                # 跨源（Tauri/开发服务器）页面也能读取Server-Timing
+                headers["Timing-Allow-Origin"] = "*"
+            await send(message)
+
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        finally:
+            end_trace(token)
+            duration_ms = trace.elapsed() * 1000
+            # 事件流的耗时是连接时长，不是慢请求
+            if not streaming_events and self.slow_log.is_slow(duration_ms):
+                body = b"".join(body_chunks)
+                entry = await asyncio.to_thread(
+                    _build_slow_entry, scope, status, trace, duration_ms, body
+                )
+                await asyncio.to_thread(self.slow_log.write, entry)
@@ -1,34 +1,58 @@
 # -*- mode: python ; coding: utf-8 -*-
-
+# PyInstaller构建配置（由 build_binary.sh 调用）
+#
+# 生成one-dir布局（dist/backend/backend + dist/backend/_internal/），
+# 整个目录作为Tauri资源打包（tauri.conf.json 的 bundle.resources）。
+# 不使用one-file：每次启动都要先把整个Python运行时解压到临时目录，冷启动要多花数秒
 
 a = Analysis(
     ['main.py'],
     pathex=[],
     binaries=[],
     datas=[],
-    hiddenimports=[],
+    # uvicorn按配置动态导入协议实现，PyInstaller无法自动发现
+    hiddenimports=[
+        'uvicorn.logging',
+        'uvicorn.loops',
+        'uvicorn.loops.auto',
+        'uvicorn.protocols',
+        'uvicorn.protocols.http',
+        'uvicorn.protocols.http.auto',
+        'uvicorn.lifespan',
+        'uvicorn.lifespan.on',
+    ],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    # 运行时用不到的模块（后端不使用WebSocket，见main.serve）
+    excludes=[
+        'tkinter',
+        'unittest',
+        'pydoc',
+        'pytest',
+        'tests',
+        'benchmarks',
+        'websockets',
+        'wsproto',
+        'uvicorn.protocols.websockets',
+    ],
     noarchive=False,
-    optimize=0,
+    # 预编译为 -O 字节码（去掉assert）；不用2，FastAPI用docstring生成接口文档
+    optimize=1,
 )
 pyz = PYZ(a.pure)
 
 exe = EXE(
     pyz,
     a.scripts,
-    a.binaries,
-    a.datas,
     [],
+    exclude_binaries=True,
     name='backend',
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
-    upx=True,
-    upx_exclude=[],
-    runtime_tmpdir=None,
+    # UPX压缩的动态库每次加载都要解压，one-dir模式不压缩
+    upx=False,
     console=True,
     disable_windowed_traceback=False,
     argv_emulation=False,
@@ -36,3 +60,12 @@ exe = EXE(
     codesign_identity=None,
     entitlements_file=None,
 )
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.datas,
+    strip=False,
+    upx=False,
+    upx_exclude=[],
+    name='backend',
+)
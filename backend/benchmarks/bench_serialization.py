@@ -0,0 +1,97 @@
+"""
+响应序列化基准测试
+
+对比原来的逐条Pydantic模型 + ApiResponse + response_model校验路径
+和直接编码字典的快速路径
+
+用法（在backend目录下执行）:
+    python -m benchmarks.bench_serialization --commits 50000
+"""
+
+import argparse
+import json
+import time
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from api.serialization import JSON_ENCODER, api_response, project_list
+from models.schemas import ApiResponse, CommitInfo
+
+
+def generate_commits(count: int):
+    """生成与GitWrapper.get_log返回值结构相同的提交记录"""
+    commits = []
+    for i in range(count):
+        oid = f"{i:040x}"
+        commits.append(
+            {
+                "id": oid,
+                "short_id": oid[:7],
+                "message": f"快照 {i}: 更新文档和图片",
+                "author": "Chronos 用户",
+                "email": "user@example.com",
+                "timestamp": "1700000000",
+                "date": "2023-11-14T22:13:20+00:00",
+                "parents": [f"{i + 1:040x}"],
+                "is_merge": False,
+            }
+        )
+    return commits
+
+
+def legacy_path(commits) -> bytes:
+    """原来的路径：逐条构建模型，包装ApiResponse，再按response_model校验并编码"""
+    data = [CommitInfo(**commit).model_dump() for commit in commits]
+    response = ApiResponse(
+        success=True,
+        message=f"获取到{len(data)}条提交记录",
+        data={"logs": data, "total": len(data), "next_cursor": None},
+    )
+    # FastAPI对返回值按response_model再次校验，然后jsonable_encoder + JSONResponse
+    validated = ApiResponse.model_validate(response.model_dump())
+    return JSONResponse(jsonable_encoder(validated)).body
+
+
+def fast_path(commits) -> bytes:
+    """快速路径：按字段挑选后直接编码"""
+    data = project_list(commits, CommitInfo)
+    return api_response(
+        {"logs": data, "total": len(data), "next_cursor": None},
+        f"获取到{len(data)}条提交记录",
+    ).body
+
+
+def measure(func, repeat: int) -> float:
+    """返回多次执行中的最短耗时（秒）"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="响应序列化基准测试")
+    parser.add_argument("--commits", type=int, default=50000, help="提交记录数量")
+    parser.add_argument("--repeat", type=int, default=3, help="重复次数")
+    args = parser.parse_args()
+
+    commits = generate_commits(args.commits)
+
+    legacy = json.loads(legacy_path(commits))
+    fast = json.loads(fast_path(commits))
+    assert legacy == fast, "两种路径的输出不一致"
+
+    legacy_time = measure(lambda: legacy_path(commits), args.repeat)
+    fast_time = measure(lambda: fast_path(commits), args.repeat)
+
+    print(f"提交记录数量: {args.commits}  编码器: {JSON_ENCODER}")
+    print(f"原路径（Pydantic模型）: {legacy_time * 1000:.1f} ms")
+    print(f"快速路径:               {fast_time * 1000:.1f} ms")
+    print(f"加速比: {legacy_time / fast_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+系统文件匹配基准测试
+
+对比原来的逐条正则匹配和SystemFileMatcher的耗时
+
+用法（在backend目录下执行）:
+    python -m benchmarks.bench_system_files --files 300000
+"""
+
+import argparse
+import random
+import re
+import time
+
+from services.git_wrapper import (
+    SYSTEM_FILE_MATCHER,
+    SYSTEM_FILE_PATTERNS,
+    filter_system_files,
+)
+
+
+def legacy_is_system_file(filename: str) -> bool:
+    """原来的_is_system_file实现"""
+    if not filename:
+        return False
+    filename = filename.replace("\\", "/")
+    for pattern in SYSTEM_FILE_PATTERNS:
+        if re.match(pattern, filename):
+            return True
+        basename = filename.split("/")[-1]
+        if basename and re.match(pattern, basename):
+            return True
+    return False
+
+
+def generate_paths(count: int, seed: int = 0):
+    """生成接近真实项目的路径列表（约3%为系统文件）"""
+    rng = random.Random(seed)
+    dirs = ["src", "docs", "assets/images", "lib/core", "tests/unit", "资料/2024"]
+    exts = [".py", ".ts", ".md", ".png", ".json", ".txt", ".docx"]
+    system = [".DS_Store", "Thumbs.db", "._cover.png", "notes.txt~", "a.lnk"]
+    paths = []
+    for i in range(count):
+        directory = rng.choice(dirs)
+        if rng.random() < 0.03:
+            paths.append(f"{directory}/{rng.choice(system)}")
+        else:
+            paths.append(f"{directory}/file_{i}{rng.choice(exts)}")
+    return paths
+
+
+def measure(func, repeat: int) -> float:
+    """返回多次执行中的最短耗时（秒）"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="系统文件匹配基准测试")
+    parser.add_argument("--files", type=int, default=300_000, help="路径数量")
+    parser.add_argument("--repeat", type=int, default=3, help="重复次数")
+    args = parser.parse_args()
+
+    paths = generate_paths(args.files)
+
+    legacy = measure(lambda: [p for p in paths if not legacy_is_system_file(p)], 1)
+    matcher = measure(
+        lambda: [p for p in paths if not SYSTEM_FILE_MATCHER.matches(p)], args.repeat
+    )
+    bulk = measure(lambda: filter_system_files(paths), args.repeat)
+
+    # 结果必须一致
+    expected = [p for p in paths if not legacy_is_system_file(p)]
+    assert filter_system_files(paths) == expected
+
+    print(f"路径数量: {len(paths)}")
+    print(f"逐条正则:           {legacy * 1000:9.1f} ms")
+    print(f"SystemFileMatcher:  {matcher * 1000:9.1f} ms  ({legacy / matcher:.1f}x)")
+    print(f"filter_system_files:{bulk * 1000:9.1f} ms  ({legacy / bulk:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""
+合成仓库生成器
+
+通过一次 git fast-import 写入全部提交（不逐个执行git commit），
+可以在几秒内生成包含数万文件、数千提交、多层目录、大量未追踪文件和分支的仓库
+
+用法（在backend目录下执行）:
+    python -m benchmarks.repo_generator /tmp/bench-repo --files 20000 --commits 2000
+"""
+
+import argparse
+import random
+import subprocess
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# 合成仓库的主分支
+MAIN_BRANCH = "main"
+
+# 用于合并基准测试的分支：从历史中间分叉，只修改主分支没有的文件，可以无冲突合并
+MERGE_SOURCE_BRANCH = "merge-source"
+
+# 每层目录的子目录数量
+DIRECTORY_FANOUT = 8
+
+_EXTENSIONS = (".md", ".txt", ".py", ".json", ".csv")
+
+
+@dataclass
+class RepoSpec:
+    """合成仓库的规模"""
+
+    # 已追踪文件数
+    files: int = 1000
+    # 提交数（第一个提交添加全部文件）
+    commits: int = 100
+    # 目录层数（文件所在目录的深度）
+    depth: int = 3
+    # 未追踪文件数
+    untracked: int = 100
+    # 分支数（不包括main和merge-source）
+    branches: int = 10
+    # 每个提交修改的文件数
+    changes_per_commit: int = 5
+    # 文件内容的大致字节数
+    file_size: int = 256
+    seed: int = 0
+
+
+# 预设规模
+PRESETS: Dict[str, RepoSpec] = {
+    "tiny": RepoSpec(files=50, commits=10, depth=2, untracked=10, branches=2),
+    "small": RepoSpec(files=1000, commits=200, depth=3, untracked=200, branches=10),
+    "medium": RepoSpec(
+        files=10_000, commits=2000, depth=5, untracked=2000, branches=50
+    ),
+    "large": RepoSpec(
+        files=50_000, commits=10_000, depth=6, untracked=10_000, branches=200
+    ),
+}
+
+
+def file_path(index: int, depth: int) -> str:
+    """第index个文件的相对路径，如 d3/d0/d7/file_123.md（每个最深层目录约8个文件）"""
+    dirs = []
+    value = index
+    for _ in range(depth):
+        value //= DIRECTORY_FANOUT
+        dirs.append(f"d{value % DIRECTORY_FANOUT}")
+    name = f"file_{index}{_EXTENSIONS[index % len(_EXTENSIONS)]}"
+    return "/".join([*reversed(dirs), name])
+
+
+def _content(rng: random.Random, size: int, revision: int) -> bytes:
+    """文件内容（每个版本不同，避免所有对象相同）"""
+    line = f"revision {revision} {rng.random()}\n".encode()
+    return (line * (size // len(line) + 1))[:size]
+
+
+def _data(content: bytes) -> bytes:
+    return b"data %d\n%s\n" % (len(content), content)
+
+
+def _build_stream(spec: RepoSpec, paths: List[str], start_time: int) -> bytes:
+    """生成fast-import输入"""
+    rng = random.Random(spec.seed)
+    chunks: List[bytes] = []
+    ident = b"Bench <bench@example.com>"
+
+    def commit(ref: str, mark: int, message: str, parent: int, ops: List[bytes]):
+        timestamp = start_time + mark * 60
+        chunks.append(f"commit {ref}\nmark :{mark}\n".encode())
+        chunks.append(b"committer %s %d +0000\n" % (ident, timestamp))
+        chunks.append(_data(message.encode("utf-8")))
+        if parent:
+            chunks.append(b"from :%d\n" % parent)
+        chunks.extend(ops)
+        chunks.append(b"\n")
+
+    main_ref = f"refs/heads/{MAIN_BRANCH}"
+    commit(
+        main_ref,
+        1,
+        "初始快照",
+        0,
+        [
+            b"M 100644 inline %s\n%s"
+            % (path.encode(), _data(_content(rng, spec.file_size, 0)))
+            for path in paths
+        ],
+    )
+    for mark in range(2, spec.commits + 1):
+        changed = rng.sample(paths, min(spec.changes_per_commit, len(paths)))
+        ops = [
+            b"M 100644 inline %s\n%s"
+            % (path.encode(), _data(_content(rng, spec.file_size, mark)))
+            for path in changed
+        ]
+        commit(main_ref, mark, f"快照 {mark}: 更新{len(changed)}个文件", mark - 1, ops)
+
+    # 分支指向历史中随机的提交
+    for index in range(spec.branches):
+        target = rng.randint(1, spec.commits)
+        chunks.append(f"reset refs/heads/branch-{index}\nfrom :{target}\n\n".encode())
+
+    # 合并源分支：从历史中间分叉，添加一个主分支没有的文件
+    fork = max(1, spec.commits // 2)
+    commit(
+        f"refs/heads/{MERGE_SOURCE_BRANCH}",
+        spec.commits + 1,
+        "合并源分支上的快照",
+        fork,
+        [
+            b"M 100644 inline merge/only-in-branch.txt\n%s"
+            % _data(_content(rng, spec.file_size, -1))
+        ],
+    )
+    return b"".join(chunks)
+
+
+def _git(repo: Path, *args: str, input: Optional[bytes] = None):
+    subprocess.run(
+        ["git", *args],
+        cwd=str(repo),
+        input=input,
+        check=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+    )
+
+
+def generate_repo(path: Path, spec: RepoSpec) -> Dict[str, Any]:
+    """
+    生成合成仓库
+
+    Args:
+        path: 仓库目录（不存在时创建，必须为空）
+        spec: 仓库规模
+
+    Returns:
+        规模和生成耗时
+    """
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    if any(path.iterdir()):
+        raise ValueError(f"目录不为空: {path}")
+    if spec.files < 1 or spec.commits < 1:
+        raise ValueError("files和commits至少为1")
+
+    start = time.perf_counter()
+    paths = [file_path(i, spec.depth) for i in range(spec.files)]
+
+    _git(path, "init", "-q", "-b", MAIN_BRANCH)
+    _git(path, "config", "core.quotepath", "false")
+    _git(path, "config", "user.name", "Bench")
+    _git(path, "config", "user.email", "bench@example.com")
+    stream = _build_stream(spec, paths, start_time=1_700_000_000)
+    _git(path, "fast-import", "--quiet", input=stream)
+    # 检出主分支，生成索引和工作区
+    _git(path, "reset", "--hard", "-q", MAIN_BRANCH)
+
+    rng = random.Random(spec.seed + 1)
+    for index in range(spec.untracked):
+        untracked = path / "untracked" / f"u{index % DIRECTORY_FANOUT}"
+        untracked.mkdir(parents=True, exist_ok=True)
+        (untracked / f"new_{index}.txt").write_bytes(_content(rng, 64, index))
+
+    return {
+        **asdict(spec),
+        "path": str(path),
+        "generate_seconds": round(time.perf_counter() - start, 2),
+    }
+
+
+def add_spec_arguments(parser: argparse.ArgumentParser):
+    """添加 --preset 和各项规模参数"""
+    parser.add_argument("--preset", choices=list(PRESETS), default="small")
+    for name in RepoSpec.__dataclass_fields__:
+        parser.add_argument(f"--{name.replace('_', '-')}", type=int, default=None)
+
+
+def spec_from_args(args: argparse.Namespace) -> RepoSpec:
+    """由预设和命令行参数得到仓库规模（命令行参数覆盖预设）"""
+    overrides = {
+        name: getattr(args, name)
+        for name in RepoSpec.__dataclass_fields__
+        if getattr(args, name, None) is not None
+    }
+    return RepoSpec(**{**asdict(PRESETS[args.preset]), **overrides})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生成合成Git仓库")
+    parser.add_argument("path", type=Path)
+    add_spec_arguments(parser)
+    args = parser.parse_args()
+
+    spec = spec_from_args(args)
+    info = generate_repo(args.path, spec)
+    print(
+        f"已生成 {info['path']}: {spec.files}个文件, {spec.commits}个提交, "
+        f"{spec.untracked}个未追踪文件, {spec.branches}个分支, "
+        f"耗时 {info['generate_seconds']}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
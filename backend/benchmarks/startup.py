@@ -0,0 +1,236 @@
+"""
+后端冷启动基准测试
+反复启动后端进程（源码或打包后的二进制），测量从创建进程到输出就绪行、
+到第一次 /health 请求成功的耗时
+
+用法（在backend目录下执行）:
+    python -m benchmarks.startup
+    python -m benchmarks.startup --binary dist/backend/backend --iterations 20
+    python -m benchmarks.startup --binary dist/backend/backend --compare base.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import queue
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from benchmarks.suite import (
+    DEFAULT_MIN_DELTA_MS,
+    DEFAULT_THRESHOLD,
+    BenchmarkError,
+    compare_results,
+    percentile,
+)
+from services.startup import parse_ready_line
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# 单次启动的超时（秒）
+DEFAULT_TIMEOUT = 30.0
+
+# 就绪后轮询 /health 的间隔（秒）
+HEALTH_POLL_INTERVAL = 0.005
+
+
+def source_command() -> List[str]:
+    """以源码方式启动后端的命令"""
+    return [sys.executable, str(BACKEND_DIR / "main.py")]
+
+
+def _read_lines(stream, lines: "queue.Queue[Optional[str]]"):
+    """把子进程stdout逐行放入队列，结束时放入None"""
+    for line in stream:
+        lines.put(line)
+    lines.put(None)
+
+
+def _wait_ready(lines: "queue.Queue[Optional[str]]", deadline: float) -> Dict[str, Any]:
+    """等待就绪行"""
+    while True:
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            raise BenchmarkError("等待就绪行超时")
+        try:
+            line = lines.get(timeout=remaining)
+        except queue.Empty:
+            continue
+        if line is None:
+            raise BenchmarkError("后端在就绪前退出")
+        info = parse_ready_line(line)
+        if info is not None:
+            return info
+
+
+def _wait_healthy(url: str, deadline: float):
+    """轮询 /health 直到返回200"""
+    while True:
+        try:
+            with urllib.request.urlopen(url + "/health", timeout=1) as response:
+                if response.status == 200:
+                    return
+        except (urllib.error.URLError, ConnectionError):
+            pass
+        if time.perf_counter() > deadline:
+            raise BenchmarkError("等待 /health 超时")
+        time.sleep(HEALTH_POLL_INTERVAL)
+
+
+def measure_once(
+    command: List[str], timeout: float = DEFAULT_TIMEOUT
+) -> Dict[str, float]:
+    """
+    启动一次后端并测量
+
+    Args:
+        command: 启动命令（会追加 --port 0，由系统分配空闲端口）
+        timeout: 超时秒数
+
+    Returns:
+        {"ready_ms": 到就绪行的耗时, "health_ms": 到第一次/health成功的耗时}
+    """
+    start = time.perf_counter()
+    deadline = start + timeout
+    process = subprocess.Popen(
+        [*command, "--port", "0"],
+        cwd=str(BACKEND_DIR),
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+    )
+    lines: "queue.Queue[Optional[str]]" = queue.Queue()
+    reader = threading.Thread(
+        target=_read_lines, args=(process.stdout, lines), daemon=True
+    )
+    reader.start()
+    try:
+        info = _wait_ready(lines, deadline)
+        ready = time.perf_counter()
+        _wait_healthy(info["url"], deadline)
+        healthy = time.perf_counter()
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+        reader.join(timeout=5)
+    return {
+        "ready_ms": (ready - start) * 1000,
+        "health_ms": (healthy - start) * 1000,
+    }
+
+
+def _stats(values: List[float]) -> Dict[str, Any]:
+    return {
+        "iterations": len(values),
+        "p50_ms": round(percentile(values, 50), 1),
+        "p95_ms": round(percentile(values, 95), 1),
+        "mean_ms": round(sum(values) / len(values), 1),
+        "min_ms": round(min(values), 1),
+        "max_ms": round(max(values), 1),
+    }
+
+
+def measure_startup(
+    command: List[str],
+    iterations: int,
+    warmup: int = 1,
+    timeout: float = DEFAULT_TIMEOUT,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    多次启动并汇总
+
+    预热的启动不计入结果（第一次启动受磁盘缓存、字节码编译影响）
+
+    Returns:
+        {"ready": 统计, "health": 统计}
+    """
+    for _ in range(warmup):
+        measure_once(command, timeout)
+    runs = [measure_once(command, timeout) for _ in range(iterations)]
+    return {
+        "ready": _stats([run["ready_ms"] for run in runs]),
+        "health": _stats([run["health_ms"] for run in runs]),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="后端冷启动基准测试")
+    parser.add_argument(
+        "--binary",
+        action="append",
+        type=Path,
+        default=[],
+        help="打包后的后端可执行文件（可指定多个；不指定时测量源码启动）",
+    )
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT)
+    parser.add_argument("--output", type=Path, help="把结果写入JSON文件")
+    parser.add_argument("--compare", type=Path, help="与基线比较，回归时退出码为1")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--min-delta-ms", type=float, default=DEFAULT_MIN_DELTA_MS)
+    args = parser.parse_args()
+
+    targets = {str(binary): [str(binary.resolve())] for binary in args.binary}
+    if not targets:
+        targets = {"source": source_command()}
+
+    results: Dict[str, Dict[str, Any]] = {}
+    for label, command in targets.items():
+        for stage, stats in measure_startup(
+            command, args.iterations, args.warmup, args.timeout
+        ).items():
+            name = f"{label}:{stage}"
+            results[name] = stats
+            print(
+                f"{name:<40} p50 {stats['p50_ms']:>8.1f}ms  "
+                f"p95 {stats['p95_ms']:>8.1f}ms  min {stats['min_ms']:>8.1f}ms"
+            )
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "iterations": args.iterations,
+        },
+        "results": results,
+    }
+    if args.output:
+        args.output.write_text(
+            json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8"
+        )
+        print(f"结果已写入 {args.output}")
+
+    if not args.compare:
+        return 0
+    baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+    regressions = compare_results(
+        results, baseline["results"], args.threshold, args.min_delta_ms
+    )
+    if not regressions:
+        print(f"没有超过 {args.threshold:.0%} 的回归")
+        return 0
+    print(f"发现 {len(regressions)} 项回归（阈值 {args.threshold:.0%}）:")
+    for item in regressions:
+        print(
+            f"  {item['case']} {item['metric']}: "
+            f"{item['baseline']} -> {item['current']} (+{item['change']:.0%})"
+        )
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,601 @@
+"""
+GitWrapper和API端点基准测试套件
+
+在合成仓库（benchmarks.repo_generator）上对每个GitWrapper方法和每个API端点
+（通过ASGI测试客户端，包含全部中间件）计时，输出p50/p95和Python峰值内存；
+可以保存为基线JSON，并在与基线相比回归超过阈值时以退出码1结束
+
+用法（在backend目录下执行）:
+    python -m benchmarks.suite --preset small
+    python -m benchmarks.suite --preset medium --save-baseline baseline.json
+    python -m benchmarks.suite --preset medium --compare baseline.json --threshold 0.25
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi.testclient import TestClient
+
+from api.tracing import slow_request_log
+from benchmarks.repo_generator import (
+    MAIN_BRANCH,
+    MERGE_SOURCE_BRANCH,
+    RepoSpec,
+    add_spec_arguments,
+    file_path,
+    generate_repo,
+    spec_from_args,
+)
+from main import app
+from services.cat_file import get_git_version
+from services.commit_stats import commit_stats_cache
+from services.git_wrapper import GitWrapper
+from services.log_cache import log_cache
+from services.repo_registry import get_git_wrapper
+from services.status_cache import status_cache
+from services.tree_index import tree_index_cache
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None
+
+# 默认回归阈值：p50/p95/峰值内存比基线增加超过20%视为回归
+DEFAULT_THRESHOLD = 0.2
+
+# 低于该绝对差值的变化不视为回归（避免亚毫秒级用例的噪声）
+DEFAULT_MIN_DELTA_MS = 1.0
+MIN_DELTA_KIB = 256.0
+
+# 比较的指标
+COMPARED_METRICS = ("p50_ms", "p95_ms", "peak_kib")
+
+
+class BenchmarkError(Exception):
+    """用例执行结果不符合预期（如接口返回错误）"""
+
+
+@dataclass
+class Case:
+    """基准测试用例"""
+
+    name: str
+    run: Callable[[], Any]
+    # 每次计时前执行，不计入耗时
+    setup: Optional[Callable[[], None]] = None
+    # wrapper 或 api
+    group: str = "wrapper"
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """百分位数（线性插值）"""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    position = (len(ordered) - 1) * pct / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def _check(result: Any) -> Any:
+    """用例结果检查：HTTP错误状态或success为False时报错，避免只测到了错误路径"""
+    status_code = getattr(result, "status_code", None)
+    if status_code is not None and status_code >= 400:
+        raise BenchmarkError(f"HTTP {status_code}: {result.text[:200]}")
+    if isinstance(result, dict) and result.get("success") is False:
+        raise BenchmarkError(result.get("message", "操作失败"))
+    return result
+
+
+def measure(case: Case, iterations: int, warmup: int = 1) -> Dict[str, Any]:
+    """
+    执行用例并统计
+
+    Args:
+        case: 用例
+        iterations: 计时次数
+        warmup: 预热次数（不计时）
+
+    Returns:
+        {"group", "iterations", "p50_ms", "p95_ms", "mean_ms", "min_ms", "max_ms",
+         "peak_kib"}
+    """
+    for _ in range(warmup):
+        if case.setup:
+            case.setup()
+        _check(case.run())
+
+    durations = []
+    for _ in range(iterations):
+        if case.setup:
+            case.setup()
+        start = time.perf_counter()
+        result = case.run()
+        durations.append(time.perf_counter() - start)
+        _check(result)
+
+    # 峰值内存单独执行一次测量（tracemalloc会显著拖慢执行，不能和计时混在一起）
+    if case.setup:
+        case.setup()
+    tracemalloc.start()
+    try:
+        _check(case.run())
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    ms = [d * 1000 for d in durations]
+    return {
+        "group": case.group,
+        "iterations": iterations,
+        "p50_ms": round(percentile(ms, 50), 3),
+        "p95_ms": round(percentile(ms, 95), 3),
+        "mean_ms": round(sum(ms) / len(ms), 3),
+        "min_ms": round(min(ms), 3),
+        "max_ms": round(max(ms), 3),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def compare_results(
+    results: Dict[str, Dict[str, Any]],
+    baseline: Dict[str, Dict[str, Any]],
+    threshold: float = DEFAULT_THRESHOLD,
+    min_delta_ms: float = DEFAULT_MIN_DELTA_MS,
+) -> List[Dict[str, Any]]:
+    """
+    与基线比较
+
+    Args:
+        results: 本次结果 {用例: 统计}
+        baseline: 基线结果
+        threshold: 相对增加超过该比例视为回归
+        min_delta_ms: 耗时增加小于该毫秒数时不视为回归
+
+    Returns:
+        回归列表 [{"case", "metric", "baseline", "current", "change"}]
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        for metric in COMPARED_METRICS:
+            old, new = previous.get(metric), current.get(metric)
+            if old is None or new is None:
+                continue
+            min_delta = MIN_DELTA_KIB if metric == "peak_kib" else min_delta_ms
+            if new > old * (1 + threshold) and new - old > min_delta:
+                regressions.append(
+                    {
+                        "case": name,
+                        "metric": metric,
+                        "baseline": old,
+                        "current": new,
+                        "change": round(new / old - 1, 3) if old else None,
+                    }
+                )
+    return regressions
+
+
+class BenchmarkRepo:
+    """合成仓库及用例需要的辅助操作"""
+
+    def __init__(self, path: Path, spec: RepoSpec):
+        self.path = path
+        self.spec = spec
+        self.wrapper = get_git_wrapper(str(path))
+        self.tracked_file = file_path(0, spec.depth)
+        self._untracked = path / "untracked"
+        self._stashed = path.parent / f"{path.name}-untracked"
+        self._edits = itertools.count()
+
+    def git(self, *args: str) -> str:
+        return subprocess.run(
+            ["git", *args],
+            cwd=str(self.path),
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+
+    def drop_caches(self):
+        """清除该仓库的状态、历史和目录树缓存，以及按提交缓存的变更统计"""
+        repo_path = self.wrapper.repo_path
+        status_cache.invalidate(repo_path)
+        log_cache.invalidate(repo_path)
+        tree_index_cache.invalidate(repo_path)
+        commit_stats_cache.clear()
+
+    def edit_tracked_file(self):
+        """修改一个已追踪文件（提交用例的准备步骤）"""
+        target = self.path / self.tracked_file
+        target.write_text(f"bench edit {next(self._edits)}\n", encoding="utf-8")
+
+    def stash_untracked(self):
+        """把未追踪文件移出工作区（切换、回滚、合并要求工作区干净）"""
+        if self._untracked.exists():
+            self._untracked.rename(self._stashed)
+
+    def restore_untracked(self):
+        if self._stashed.exists():
+            self._untracked.parent.mkdir(parents=True, exist_ok=True)
+            self._stashed.rename(self._untracked)
+
+    def reset_main(self, tip: Optional[str] = None):
+        """回到主分支（可选重置到指定提交）"""
+        self.git("checkout", "-q", "-f", MAIN_BRANCH)
+        if tip:
+            self.git("reset", "-q", "--hard", tip)
+
+
+def _wrapper_read_cases(repo: BenchmarkRepo, arun, work_dir: Path) -> List[Case]:
+    """不修改仓库的GitWrapper用例"""
+    wrapper = repo.wrapper
+    middle = wrapper.get_log(limit=repo.spec.commits // 2 or 1)[-1]["id"]
+    init_dirs = itertools.count()
+    fresh: Dict[str, Path] = {}
+
+    def fresh_directory():
+        """init_repository用例：准备一个包含文件的新目录"""
+        shutil.rmtree(work_dir / "init", ignore_errors=True)
+        directory = work_dir / "init" / str(next(init_dirs))
+        for index in range(min(repo.spec.files, 1000)):
+            target = directory / file_path(index, repo.spec.depth)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_text(f"init {index}\n", encoding="utf-8")
+        fresh["path"] = directory
+
+    return [
+        Case("get_status", wrapper.get_status),
+        Case("get_status[cold]", wrapper.get_status, repo.drop_caches),
+        Case("get_status_async", lambda: arun(wrapper.get_status_async())),
+        Case("get_ignored_dirs", wrapper.get_ignored_dirs),
+        Case("get_tracked_files", wrapper.get_tracked_files),
+        Case(
+            "get_tracked_files_async", lambda: arun(wrapper.get_tracked_files_async())
+        ),
+        Case("get_tree", wrapper.get_tree),
+        Case("get_tree[cold]", wrapper.get_tree, repo.drop_caches),
+        Case("get_tree[depth=3]", lambda: wrapper.get_tree("", 3)),
+        Case("get_tree_async", lambda: arun(wrapper.get_tree_async())),
+        Case("get_current_branch", wrapper.get_current_branch),
+        Case(
+            "get_current_branch_async", lambda: arun(wrapper.get_current_branch_async())
+        ),
+        Case("get_log[limit=100]", lambda: wrapper.get_log(limit=100)),
+        Case("get_log[all]", wrapper.get_log),
+        Case("get_log[all,cold]", wrapper.get_log, repo.drop_caches),
+        Case("get_log[after]", lambda: wrapper.get_log(limit=100, after=middle)),
+        Case(
+            "get_log[limit=100,stats]",
+            lambda: wrapper.get_log(limit=100, with_stats=True),
+        ),
+        Case(
+            "get_log[limit=100,stats,cold]",
+            lambda: wrapper.get_log(limit=100, with_stats=True),
+            repo.drop_caches,
+        ),
+        Case(
+            "get_log_async[limit=100]", lambda: arun(wrapper.get_log_async(limit=100))
+        ),
+        Case("iter_log_async[all]", lambda: arun(_consume(wrapper.iter_log_async()))),
+        Case("count_commits", wrapper.count_commits),
+        Case("count_commits_async", lambda: arun(wrapper.count_commits_async())),
+        Case("get_branches", wrapper.get_branches),
+        Case("get_branches_async", lambda: arun(wrapper.get_branches_async())),
+        Case(
+            "init_repository",
+            lambda: GitWrapper(str(fresh["path"])).init_repository(),
+            fresh_directory,
+        ),
+    ]
+
+
+def _wrapper_write_cases(repo: BenchmarkRepo, arun) -> List[Case]:
+    """修改仓库的GitWrapper用例（在工作区干净时执行）"""
+    wrapper = repo.wrapper
+    branch_names = (f"bench-{i}" for i in itertools.count())
+    switch_targets = itertools.cycle(["branch-0", MAIN_BRANCH])
+    first_commit = repo.git("rev-list", "--max-parents=0", MAIN_BRANCH)
+    merge_base: Dict[str, str] = {}
+
+    def before_merge():
+        if "tip" not in merge_base:
+            merge_base["tip"] = repo.git("rev-parse", MAIN_BRANCH)
+        repo.reset_main(merge_base["tip"])
+
+    return [
+        Case(
+            "create_commit",
+            lambda: wrapper.create_commit("bench", [repo.tracked_file]),
+            repo.edit_tracked_file,
+        ),
+        Case(
+            "create_commit_async",
+            lambda: arun(wrapper.create_commit_async("bench", [repo.tracked_file])),
+            repo.edit_tracked_file,
+        ),
+        Case("create_branch", lambda: wrapper.create_branch(next(branch_names))),
+        Case(
+            "create_branch_async",
+            lambda: arun(wrapper.create_branch_async(next(branch_names))),
+        ),
+        Case("switch_branch", lambda: wrapper.switch_branch(next(switch_targets))),
+        Case(
+            "switch_branch_async",
+            lambda: arun(wrapper.switch_branch_async(next(switch_targets))),
+        ),
+        Case(
+            "checkout_commit",
+            lambda: wrapper.checkout_commit(first_commit),
+            repo.reset_main,
+        ),
+        Case(
+            "checkout_commit_async",
+            lambda: arun(wrapper.checkout_commit_async(first_commit)),
+            repo.reset_main,
+        ),
+        Case(
+            "merge_branch",
+            lambda: wrapper.merge_branch(MERGE_SOURCE_BRANCH),
+            before_merge,
+        ),
+        Case(
+            "merge_branch_async",
+            lambda: arun(wrapper.merge_branch_async(MERGE_SOURCE_BRANCH)),
+            before_merge,
+        ),
+    ]
+
+
+def _api_read_cases(repo: BenchmarkRepo, client: TestClient) -> List[Case]:
+    """不修改仓库的API用例"""
+    path = str(repo.path)
+    etags: Dict[str, str] = {}
+
+    def get(url: str, **params):
+        return lambda: client.get(url, params={"path": path, **params})
+
+    def fetch_etag():
+        etags["log"] = client.get(
+            "/api/repository/log", params={"path": path, "limit": 100}
+        ).headers["etag"]
+
+    def conditional_log():
+        return client.get(
+            "/api/repository/log",
+            params={"path": path, "limit": 100},
+            headers={"If-None-Match": etags["log"]},
+        )
+
+    cases = [
+        ("GET /status", get("/api/repository/status"), None),
+        ("GET /status[cold]", get("/api/repository/status"), repo.drop_caches),
+        ("GET /overview", get("/api/repository/overview"), None),
+        ("GET /files", get("/api/repository/files"), None),
+        ("GET /tree", get("/api/repository/tree"), None),
+        ("GET /tree[depth=3]", get("/api/repository/tree", depth=3), None),
+        ("GET /log[limit=100]", get("/api/repository/log", limit=100), None),
+        ("GET /log[all]", get("/api/repository/log"), None),
+        ("GET /log[all,cold]", get("/api/repository/log"), repo.drop_caches),
+        ("GET /log[stream]", get("/api/repository/log", stream="true"), None),
+        ("GET /log[304]", conditional_log, fetch_etag),
+        ("GET /branches", get("/api/repository/branches"), None),
+        ("GET /maintenance", get("/api/repository/maintenance"), None),
+        ("GET /metrics", lambda: client.get("/metrics"), None),
+        ("GET /health", lambda: client.get("/health"), None),
+    ]
+    return [Case(name, run, setup, group="api") for name, run, setup in cases]
+
+
+def _api_write_cases(repo: BenchmarkRepo, client: TestClient) -> List[Case]:
+    """修改仓库的API用例（在工作区干净时执行）"""
+    path = str(repo.path)
+    branch_names = (f"api-bench-{i}" for i in itertools.count())
+    switch_targets = itertools.cycle(["branch-1", MAIN_BRANCH])
+    first_commit = repo.git("rev-list", "--max-parents=0", MAIN_BRANCH)
+    merge_base: Dict[str, str] = {}
+
+    def post(url: str, body: Callable[[], Dict[str, Any]]):
+        return lambda: client.post(url, json={"path": path, **body()})
+
+    def before_merge():
+        if "tip" not in merge_base:
+            merge_base["tip"] = repo.git("rev-parse", MAIN_BRANCH)
+        repo.reset_main(merge_base["tip"])
+
+    cases = [
+        (
+            "POST /commit",
+            post(
+                "/api/repository/commit",
+                lambda: {"message": "bench", "files": [repo.tracked_file]},
+            ),
+            repo.edit_tracked_file,
+        ),
+        (
+            "POST /branch",
+            post("/api/repository/branch", lambda: {"branch_name": next(branch_names)}),
+            None,
+        ),
+        (
+            "POST /switch",
+            post(
+                "/api/repository/switch", lambda: {"branch_name": next(switch_targets)}
+            ),
+            None,
+        ),
+        (
+            "POST /checkout",
+            post("/api/repository/checkout", lambda: {"commit_id": first_commit}),
+            repo.reset_main,
+        ),
+        (
+            "POST /merge",
+            post(
+                "/api/repository/merge",
+                lambda: {"source_branch": MERGE_SOURCE_BRANCH},
+            ),
+            before_merge,
+        ),
+    ]
+    return [Case(name, run, setup, group="api") for name, run, setup in cases]
+
+
+async def _consume(iterator) -> int:
+    count = 0
+    async for _ in iterator:
+        count += 1
+    return count
+
+
+def run_suite(
+    spec: RepoSpec,
+    iterations: int = 10,
+    warmup: int = 1,
+    name_filter: Optional[str] = None,
+    progress: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """
+    生成合成仓库并执行全部用例
+
+    Args:
+        spec: 仓库规模
+        iterations: 每个用例的计时次数
+        warmup: 每个用例的预热次数
+        name_filter: 只执行名称包含该字符串的用例
+        progress: 每个用例完成后的回调(用例名, 统计)
+
+    Returns:
+        {"meta": 环境和仓库规模, "results": {用例名: 统计}}
+    """
+    # 大仓库上的请求会超过慢请求阈值，避免写入用户目录下的慢请求日志
+    slow_threshold = slow_request_log.threshold_ms
+    slow_request_log.threshold_ms = 0
+
+    work_dir = Path(tempfile.mkdtemp(prefix="chronos-bench-"))
+    loop = asyncio.new_event_loop()
+    try:
+        repo_info = generate_repo(work_dir / "repo", spec)
+        repo = BenchmarkRepo(work_dir / "repo", spec)
+        client = TestClient(app)
+
+        read_cases = _wrapper_read_cases(
+            repo, loop.run_until_complete, work_dir
+        ) + _api_read_cases(repo, client)
+        write_cases = _wrapper_write_cases(
+            repo, loop.run_until_complete
+        ) + _api_write_cases(repo, client)
+
+        results: Dict[str, Dict[str, Any]] = {}
+
+        def run_cases(cases: List[Case]):
+            for case in cases:
+                if name_filter and name_filter not in case.name:
+                    continue
+                results[case.name] = measure(case, iterations, warmup)
+                if progress:
+                    progress(case.name, results[case.name])
+
+        run_cases(read_cases)
+        repo.stash_untracked()
+        try:
+            for case in write_cases:
+                run_cases([case])
+                # 每个写操作用例结束后回到主分支，不影响下一个用例
+                repo.reset_main()
+        finally:
+            repo.restore_untracked()
+
+        meta = {
+            "timestamp": time.time(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "git": ".".join(str(v) for v in get_git_version()),
+            "iterations": iterations,
+            "repo": repo_info,
+        }
+        if resource is not None:
+            # Linux上单位为KiB
+            meta["max_rss_kib"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return {"meta": meta, "results": results}
+    finally:
+        slow_request_log.threshold_ms = slow_threshold
+        loop.close()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def _print_result(name: str, stats: Dict[str, Any]):
+    print(
+        f"{name:<34} p50 {stats['p50_ms']:>10.2f} ms   "
+        f"p95 {stats['p95_ms']:>10.2f} ms   peak {stats['peak_kib']:>10.1f} KiB"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="GitWrapper和API端点基准测试")
+    add_spec_arguments(parser)
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--filter", help="只执行名称包含该字符串的用例")
+    parser.add_argument("--output", type=Path, help="把结果写入JSON文件")
+    parser.add_argument("--save-baseline", type=Path, help="把结果保存为基线")
+    parser.add_argument("--compare", type=Path, help="与基线比较，回归时退出码为1")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--min-delta-ms", type=float, default=DEFAULT_MIN_DELTA_MS)
+    args = parser.parse_args()
+
+    spec = spec_from_args(args)
+    print(
+        f"合成仓库: {spec.files}个文件, {spec.commits}个提交, 目录深度{spec.depth}, "
+        f"{spec.untracked}个未追踪文件, {spec.branches}个分支"
+    )
+    report = run_suite(spec, args.iterations, args.warmup, args.filter, _print_result)
+
+    for target in (args.output, args.save_baseline):
+        if target:
+            target.write_text(
+                json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8"
+            )
+            print(f"结果已写入 {target}")
+
+    if not args.compare:
+        return 0
+
+    baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+    if (
+        baseline["meta"]["repo"].get("files") != spec.files
+        or baseline["meta"]["repo"].get("commits") != spec.commits
+    ):
+        print("WARNING: 基线的仓库规模与本次不同，比较结果可能没有意义")
+    regressions = compare_results(
+        report["results"], baseline["results"], args.threshold, args.min_delta_ms
+    )
+    if not regressions:
+        print(f"没有超过 {args.threshold:.0%} 的回归")
+        return 0
+    print(f"发现 {len(regressions)} 项回归（阈值 {args.threshold:.0%}）:")
+    for item in regressions:
+        print(
+            f"  {item['case']} {item['metric']}: "
+            f"{item['baseline']} -> {item['current']} (+{item['change']:.0%})"
+        )
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,8 @@
 #!/bin/bash
 # Build backend binary for Tauri sidecar
+#
+# 生成one-dir布局（可执行文件 + _internal/），复制到
+# frontend/src-tauri/binaries/backend-dist/，由Tauri作为资源整体打包
 
 set -e
 
@@ -12,29 +15,15 @@ echo "Building backend binary..."
 # Activate virtual environment
 source ./venv/bin/activate
 
-# Build with PyInstaller
-pyinstaller --onefile \
-    --name backend \
-    --add-data "main.py:." \
-    --hidden-import uvicorn.logging \
-    --hidden-import uvicorn.loops \
-    --hidden-import uvicorn.loops.auto \
-    --hidden-import uvicorn.protocols \
-    --hidden-import uvicorn.protocols.http \
-    --hidden-import uvicorn.protocols.http.auto \
-    --hidden-import uvicorn.protocols.websockets \
-    --hidden-import uvicorn.protocols.websockets.auto \
-    --hidden-import uvicorn.lifespan \
-    --hidden-import uvicorn.lifespan.on \
-    main.py
+BINARIES_DIR=../frontend/src-tauri/binaries
+mkdir -p "$BINARIES_DIR"
 
-echo "Binary built successfully at: dist/backend"
+# Build with PyInstaller（配置见 backend.spec）
+pyinstaller --noconfirm --clean backend.spec
+echo "Binary built successfully at: dist/backend/"
 
-# Copy to frontend binaries directory
-mkdir -p ../frontend/src-tauri/binaries
-cp dist/backend ../frontend/src-tauri/binaries/backend
-
-# Make it executable
-chmod +x ../frontend/src-tauri/binaries/backend
-
-echo "Binary copied to frontend/src-tauri/binaries/backend"
+# cp -p 保留执行权限（Tauri打包资源时沿用文件权限）
+rm -rf "$BINARIES_DIR/backend-dist"
+cp -Rp dist/backend "$BINARIES_DIR/backend-dist"
+chmod +x "$BINARIES_DIR/backend-dist/backend"
+echo "Binary copied to frontend/src-tauri/binaries/backend-dist/"
@@ -2,17 +2,41 @@
 Chronos Backend - FastAPI Application Entry Point
 """
 
+import argparse
+import os
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Optional
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from api.compression import CompressionMiddleware
+from api.metrics import MetricsMiddleware
+from api.metrics import router as metrics_router
 from api.repository import router as repository_router
+from api.tracing import TracingMiddleware
+from services.maintenance import maintenance_scheduler
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """应用生命周期：启动和停止后台仓库维护"""
+    maintenance_scheduler.start()
+    yield
+    maintenance_scheduler.stop()
+
 
 app = FastAPI(
     title="Chronos API",
     version="1.0.0",
     description="本地文件时光机 - Git版本管理工具API",
+    lifespan=lifespan,
 )
 
+# 压缩较大的JSON/NDJSON响应（按Accept-Encoding协商）
+app.add_middleware(CompressionMiddleware)
+
 # Configure CORS for local frontend
 app.add_middleware(
     CORSMiddleware,
@@ -31,6 +55,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 记录每个请求的git命令耗时（Server-Timing响应头和慢请求日志）
+app.add_middleware(TracingMiddleware)
+
+# 记录HTTP请求耗时和响应大小（最外层，包含压缩和CORS的耗时）
+app.add_middleware(MetricsMiddleware)
+
 
 @app.get("/")
 async def root():
@@ -49,9 +79,54 @@ async def health():
 
 # 注册路由
 app.include_router(repository_router, prefix="/api")
+app.include_router(metrics_router)
 
 
-if __name__ == "__main__":
+# 默认监听地址（前端固定连接该端口）
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+
+def serve(
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    ready_file: Optional[Path] = None,
+):
+    """
+    启动HTTP服务（打包后的二进制和 python main.py 的入口）
+
+    端口绑定完成后在stdout输出就绪行（见services.startup），并写入就绪文件（如果指定）
+
+    Args:
+        host: 监听地址
+        port: 监听端口，0表示由系统分配（实际端口见就绪行）
+        ready_file: 就绪文件路径
+    """
+    # 只在直接运行时需要，作为模块导入（测试、uvicorn main:app）时不加载
     import uvicorn
 
-    uvicorn.run(app, host="127.0.0.1", port=8765)
+    from services.startup import ReadyServer
+
+    # 应用不使用WebSocket，关闭后启动时不导入websockets
+    config = uvicorn.Config(app, host=host, port=port, ws="none")
+    ReadyServer(config, ready_file=ready_file).run()
+
+
+def main():
+    from services.startup import READY_FILE_ENV
+
+    parser = argparse.ArgumentParser(description="Chronos后端服务")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument(
+        "--ready-file",
+        type=Path,
+        default=os.environ.get(READY_FILE_ENV) or None,
+        help=f"就绪后写入的文件（也可通过环境变量 {READY_FILE_ENV} 指定）",
+    )
+    args = parser.parse_args()
+    serve(args.host, args.port, args.ready_file)
+
+
+if __name__ == "__main__":
+    main()
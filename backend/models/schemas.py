@@ -36,6 +36,7 @@ class FileChange(BaseModel):
 
     status: str = Field(..., description="文件状态（added/modified/deleted）")
     file: str = Field(..., description="文件路径")
+    old_file: Optional[str] = Field(None, description="重命名前的文件路径")
 
 
 class RepositoryStatus(BaseModel):
@@ -44,6 +45,12 @@ class RepositoryStatus(BaseModel):
     branch: str = Field(..., description="当前分支")
     changes: List[FileChange] = Field(..., description="变更文件列表")
     is_clean: bool = Field(..., description="工作区是否干净")
+    head: Optional[str] = Field(None, description="HEAD提交ID，新仓库为空")
+    detached: bool = Field(False, description="是否处于分离HEAD状态")
+    upstream: Optional[str] = Field(None, description="上游分支")
+    ahead: int = Field(0, description="领先上游的提交数")
+    behind: int = Field(0, description="落后上游的提交数")
+    conflicts: List[str] = Field(default_factory=list, description="未合并的冲突文件")
 
 
 # 快照操作相关模型
@@ -57,6 +64,14 @@ class CreateCommitRequest(BaseModel):
     )
 
 
+class CommitStats(BaseModel):
+    """提交的变更统计"""
+
+    files: int = Field(..., description="修改的文件数")
+    insertions: int = Field(..., description="新增行数")
+    deletions: int = Field(..., description="删除行数")
+
+
 class CommitInfo(BaseModel):
     """提交信息"""
 
@@ -69,6 +84,9 @@ class CommitInfo(BaseModel):
     date: Optional[str] = Field(None, description="提交日期")
     parents: Optional[List[str]] = Field(None, description="父提交列表")
     is_merge: Optional[bool] = Field(None, description="是否为合并提交")
+    stats: Optional[CommitStats] = Field(
+        None, description="变更统计（按需返回，合并提交为空）"
+    )
 
 
 class GetLogRequest(BaseModel):
@@ -129,3 +147,13 @@ class MergeBranchRequest(BaseModel):
     target_branch: Optional[str] = Field(
         None, description="目标分支（合并到的分支），None表示当前分支"
     )
+
+
+# 仓库维护相关模型
+class MaintenanceRequest(BaseModel):
+    """手动触发仓库维护请求"""
+
+    path: str = Field(..., description="仓库路径")
+    tasks: Optional[List[str]] = Field(
+        None, description="要执行的任务（commit-graph/repack/prune），None表示全部"
+    )
@@ -0,0 +1,106 @@
+"""
+文件内容缓存
+按blob OID缓存文件内容（LRU，按总字节数限制内存）。
+blob按内容寻址、不可变，同一个OID的内容永远相同，不需要失效，也可以在仓库之间共享
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+# 所有条目合计最多缓存的字节数
+DEFAULT_MAX_CACHED_BYTES = 64 * 1024 * 1024
+
+# 超过该大小的blob不缓存（由调用方流式读取）
+DEFAULT_MAX_BLOB_BYTES = 8 * 1024 * 1024
+
+
+class BlobCache:
+    """blob内容缓存（LRU，按总字节数淘汰）"""
+
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_MAX_CACHED_BYTES,
+        max_blob_bytes: int = DEFAULT_MAX_BLOB_BYTES,
+    ):
+        """
+        初始化缓存
+
+        Args:
+            max_bytes: 所有条目合计最多缓存的字节数
+            max_blob_bytes: 单个blob的最大字节数，超过时不缓存
+        """
+        self.max_bytes = max_bytes
+        self.max_blob_bytes = max_blob_bytes
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def cacheable(self, size: int) -> bool:
+        """该大小的blob是否可以缓存"""
+        return size <= min(self.max_blob_bytes, self.max_bytes)
+
+    def get(self, oid: str) -> Optional[bytes]:
+        """
+        获取blob内容
+
+        Args:
+            oid: blob的完整OID
+
+        Returns:
+            内容，未缓存时返回None
+        """
+        with self._lock:
+            content = self._entries.get(oid)
+            if content is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(oid)
+            self.hits += 1
+            return content
+
+    def put(self, oid: str, content: bytes):
+        """
+        写入blob内容，超出容量时淘汰最久未使用的条目
+
+        Args:
+            oid: blob的完整OID
+            content: 内容
+        """
+        if not self.cacheable(len(content)):
+            return
+        with self._lock:
+            if oid in self._entries:
+                self._entries.move_to_end(oid)
+                return
+            self._entries[oid] = content
+            self._size += len(content)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+                self.evictions += 1
+
+    def clear(self):
+        """清除全部缓存"""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """获取缓存统计信息"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+# 进程级共享的blob内容缓存
+blob_cache = BlobCache()
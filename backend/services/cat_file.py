@@ -0,0 +1,393 @@
+"""
+git cat-file 常驻进程服务
+为每个仓库维护一个长期运行的 cat-file 批处理进程，
+把对象类型、大小和内容查询变成管道往返，而不是每次启动新的git进程
+"""
+
+import atexit
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from services.errors import GitError
+from services.metrics import cat_file_request_duration
+from services.tracing import record_span
+
+# 空闲多久后关闭常驻进程（秒）
+DEFAULT_IDLE_TIMEOUT = 60.0
+
+# 后台清理线程的检查间隔（秒）
+REAPER_INTERVAL = 10.0
+
+# --batch-command 从 Git 2.36 开始支持
+BATCH_COMMAND_MIN_VERSION = (2, 36)
+
+_git_version: Optional[Tuple[int, ...]] = None
+_git_version_lock = threading.Lock()
+
+
+def get_git_version() -> Tuple[int, ...]:
+    """
+    获取本机Git版本（进程内只查询一次）
+
+    Returns:
+        版本号元组，如(2, 39, 5)；无法识别时返回(0,)
+    """
+    global _git_version
+    with _git_version_lock:
+        if _git_version is None:
+            try:
+                output = subprocess.run(
+                    ["git", "--version"], capture_output=True, text=True, check=False
+                ).stdout
+                # 输出形如 "git version 2.39.5" 或 "git version 2.39.3 (Apple Git-146)"
+                version_str = output.strip().split()[2]
+                parts = []
+                for piece in version_str.split("."):
+                    if not piece.isdigit():
+                        break
+                    parts.append(int(piece))
+                _git_version = tuple(parts) or (0,)
+            except (OSError, IndexError):
+                _git_version = (0,)
+        return _git_version
+
+
+class CatFileProcess:
+    """
+    单个仓库的 cat-file 常驻进程
+
+    优先使用 `git cat-file --batch-command`（一个进程同时支持 info/contents），
+    旧版本Git回退为 `--batch-check` 和 `--batch` 两个进程。
+    进程崩溃时在下一次请求自动重启，所有请求通过锁串行化。
+    """
+
+    def __init__(self, repo_path: Path):
+        """
+        初始化CatFileProcess
+
+        Args:
+            repo_path: 仓库路径（已解析的绝对路径）
+        """
+        self.repo_path = repo_path
+        self.use_batch_command = get_git_version() >= BATCH_COMMAND_MIN_VERSION
+        self.last_used = time.monotonic()
+        self.restarts = 0
+        self._procs: Dict[str, subprocess.Popen] = {}
+        self._lock = threading.Lock()
+
+    def _spawn(self, mode: str) -> subprocess.Popen:
+        """启动指定模式的 cat-file 进程"""
+        try:
+            return subprocess.Popen(
+                ["git", "cat-file", f"--{mode}"],
+                cwd=str(self.repo_path),
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+        except FileNotFoundError as e:
+            raise GitError("Git未安装或不在系统PATH中") from e
+        except OSError as e:
+            raise GitError(f"启动cat-file进程失败: {str(e)}") from e
+
+    def _get_proc(self, mode: str) -> subprocess.Popen:
+        """获取（必要时启动或重启）指定模式的进程"""
+        proc = self._procs.get(mode)
+        if proc is not None and proc.poll() is None:
+            return proc
+
+        if proc is not None:
+            # 进程已退出（崩溃或被杀），重新启动
+            self.restarts += 1
+        proc = self._spawn(mode)
+        self._procs[mode] = proc
+        return proc
+
+    def _kill(self, mode: str):
+        """终止指定模式的进程"""
+        proc = self._procs.pop(mode, None)
+        if proc is None:
+            return
+        try:
+            proc.stdin.close()
+        except OSError:
+            pass
+        try:
+            proc.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+
+    def _request(self, kind: str, obj: str) -> Optional[Tuple[str, str, int, bytes]]:
+        """
+        发送一次查询并读取响应
+
+        Args:
+            kind: "info" 或 "contents"
+            obj: 对象名（OID、引用或 <rev>:<path>）
+
+        Returns:
+            (oid, type, size, content) 元组，对象不存在时返回None
+
+        Raises:
+            GitError: 进程启动或通信失败（已重试一次）
+        """
+        return self._request_many(kind, [obj])[0]
+
+    def _request_many(
+        self, kind: str, objs: List[str]
+    ) -> List[Optional[Tuple[str, str, int, bytes]]]:
+        """
+        在一次持有锁期间依次查询多个对象（同一个进程，不启动新进程）
+
+        Args:
+            kind: "info" 或 "contents"
+            objs: 对象名列表
+
+        Returns:
+            与objs一一对应的 (oid, type, size, content)，对象不存在时为None
+
+        Raises:
+            GitError: 进程启动或通信失败（每个对象重试一次）
+        """
+        if self.use_batch_command:
+            mode = "batch-command"
+            prefix = f"{kind} "
+        else:
+            mode = "batch-check" if kind == "info" else "batch"
+            prefix = ""
+
+        results: List[Optional[Tuple[str, str, int, bytes]]] = []
+        with self._lock:
+            self.last_used = time.monotonic()
+            start = time.perf_counter()
+            try:
+                for obj in objs:
+                    if not obj or "\n" in obj:
+                        results.append(None)
+                        continue
+                    line = f"{prefix}{obj}\n".encode("utf-8")
+                    # 第一次失败时认为进程已崩溃，重启后重试一次
+                    for attempt in range(2):
+                        try:
+                            results.append(self._roundtrip(mode, kind, line))
+                            break
+                        except (OSError, ValueError) as e:
+                            self._kill(mode)
+                            if attempt == 0:
+                                self.restarts += 1
+                            else:
+                                raise GitError(f"cat-file进程通信失败: {str(e)}") from e
+            finally:
+                duration = time.perf_counter() - start
+                cat_file_request_duration.observe(kind, value=duration)
+                record_span("cat-file", duration)
+        return results
+
+    def _roundtrip(
+        self, mode: str, kind: str, line: bytes
+    ) -> Optional[Tuple[str, str, int, bytes]]:
+        """在持有锁的情况下完成一次请求/响应"""
+        proc = self._get_proc(mode)
+        proc.stdin.write(line)
+        proc.stdin.flush()
+
+        header = proc.stdout.readline()
+        if not header:
+            raise OSError("cat-file进程意外退出")
+
+        fields = header.decode("utf-8", errors="replace").rstrip("\n").split(" ")
+        # 不存在或有歧义的对象: "<obj> missing" / "<obj> ambiguous"
+        if len(fields) != 3 or fields[-1] in ("missing", "ambiguous"):
+            return None
+
+        oid, obj_type, size_str = fields
+        size = int(size_str)
+
+        content = b""
+        if kind == "contents":
+            content = proc.stdout.read(size)
+            # 内容后面跟一个换行符
+            proc.stdout.read(1)
+            if len(content) != size:
+                raise OSError("cat-file输出被截断")
+
+        return oid, obj_type, size, content
+
+    def info(self, obj: str) -> Optional[Tuple[str, str, int]]:
+        """
+        查询对象的OID、类型和大小
+
+        Args:
+            obj: 对象名
+
+        Returns:
+            (oid, type, size) 元组，对象不存在时返回None
+        """
+        result = self._request("info", obj)
+        if result is None:
+            return None
+        return result[0], result[1], result[2]
+
+    def contents(self, obj: str) -> Optional[Tuple[str, str, bytes]]:
+        """
+        读取对象内容
+
+        Args:
+            obj: 对象名
+
+        Returns:
+            (oid, type, content) 元组，对象不存在时返回None
+        """
+        result = self._request("contents", obj)
+        if result is None:
+            return None
+        return result[0], result[1], result[3]
+
+    def info_batch(self, objs: List[str]) -> List[Optional[Tuple[str, str, int]]]:
+        """
+        批量查询对象的OID、类型和大小
+
+        Args:
+            objs: 对象名列表
+
+        Returns:
+            与objs一一对应的 (oid, type, size)，对象不存在时为None
+        """
+        return [
+            None if result is None else result[:3]
+            for result in self._request_many("info", objs)
+        ]
+
+    def contents_batch(self, objs: List[str]) -> List[Optional[Tuple[str, str, bytes]]]:
+        """
+        批量读取对象内容
+
+        Args:
+            objs: 对象名列表（调用方负责控制总大小）
+
+        Returns:
+            与objs一一对应的 (oid, type, content)，对象不存在时为None
+        """
+        return [
+            None if result is None else (result[0], result[1], result[3])
+            for result in self._request_many("contents", objs)
+        ]
+
+    def health_check(self) -> bool:
+        """
+        健康检查：进程存活并且能完成一次往返
+
+        Returns:
+            True如果进程可用，否则False
+        """
+        try:
+            # 新仓库中HEAD可能不存在，返回None也说明通信正常
+            self.info("HEAD")
+            return self.is_alive()
+        except GitError:
+            return False
+
+    def is_alive(self) -> bool:
+        """是否有正在运行的进程"""
+        with self._lock:
+            return any(proc.poll() is None for proc in self._procs.values())
+
+    def close(self):
+        """关闭所有进程"""
+        with self._lock:
+            for mode in list(self._procs):
+                self._kill(mode)
+
+
+class CatFilePool:
+    """
+    按仓库路径管理 cat-file 常驻进程
+
+    后台线程定期关闭空闲超过 idle_timeout 的进程，
+    下一次查询时会按需重新启动。
+    """
+
+    def __init__(self, idle_timeout: float = DEFAULT_IDLE_TIMEOUT):
+        self.idle_timeout = idle_timeout
+        self._processes: Dict[Path, CatFileProcess] = {}
+        self._lock = threading.Lock()
+        self._reaper: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def get(self, repo_path: Path) -> CatFileProcess:
+        """
+        获取仓库对应的CatFileProcess（不存在则创建）
+
+        Args:
+            repo_path: 仓库路径（已解析的绝对路径）
+
+        Returns:
+            CatFileProcess实例
+        """
+        with self._lock:
+            process = self._processes.get(repo_path)
+            if process is None:
+                process = CatFileProcess(repo_path)
+                self._processes[repo_path] = process
+            self._ensure_reaper()
+            return process
+
+    def release(self, repo_path: Path):
+        """关闭并移除仓库对应的进程"""
+        with self._lock:
+            process = self._processes.pop(repo_path, None)
+        if process is not None:
+            process.close()
+
+    def reap_idle(self) -> int:
+        """
+        关闭空闲超时的进程
+
+        Returns:
+            被关闭的进程数量
+        """
+        now = time.monotonic()
+        with self._lock:
+            idle = [
+                p
+                for p in self._processes.values()
+                if now - p.last_used >= self.idle_timeout
+            ]
+        closed = 0
+        for process in idle:
+            if process.is_alive():
+                process.close()
+                closed += 1
+        return closed
+
+    def close_all(self):
+        """关闭所有进程并停止后台线程"""
+        self._stop.set()
+        with self._lock:
+            processes = list(self._processes.values())
+            self._processes.clear()
+        for process in processes:
+            process.close()
+
+    def _ensure_reaper(self):
+        """按需启动后台清理线程（调用方持有锁）"""
+        if self._reaper is not None and self._reaper.is_alive():
+            return
+        self._stop.clear()
+        self._reaper = threading.Thread(
+            target=self._reap_loop, name="cat-file-reaper", daemon=True
+        )
+        self._reaper.start()
+
+    def _reap_loop(self):
+        while not self._stop.wait(REAPER_INTERVAL):
+            self.reap_idle()
+
+
+# 进程级共享的 cat-file 进程池
+cat_file_pool = CatFilePool()
+atexit.register(cat_file_pool.close_all)
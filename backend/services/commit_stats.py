@@ -0,0 +1,91 @@
+"""
+提交变更统计缓存
+按提交OID缓存该提交修改的文件数、新增行数和删除行数（来自git log --numstat）。
+提交对象不可变，同一个OID的统计永远相同，不需要失效，只需按LRU限制条目数
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Tuple
+
+# 最多缓存的提交数量
+DEFAULT_MAX_CACHED_STATS = 200_000
+
+
+class CommitStatsCache:
+    """提交变更统计缓存（LRU，按条目数淘汰）"""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_CACHED_STATS):
+        """
+        初始化缓存
+
+        Args:
+            max_entries: 最多缓存的提交数量
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict[str, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_many(
+        self, commit_ids: Iterable[str]
+    ) -> Tuple[Dict[str, Dict[str, int]], List[str]]:
+        """
+        批量获取统计
+
+        Args:
+            commit_ids: 完整提交ID列表
+
+        Returns:
+            (已缓存的 {提交ID: 统计}, 未缓存的提交ID列表)
+        """
+        found: Dict[str, Dict[str, int]] = {}
+        missing: List[str] = []
+        with self._lock:
+            for commit_id in commit_ids:
+                stats = self._entries.get(commit_id)
+                if stats is None:
+                    missing.append(commit_id)
+                    continue
+                self._entries.move_to_end(commit_id)
+                found[commit_id] = stats
+            self.hits += len(found)
+            self.misses += len(missing)
+        return found, missing
+
+    def put_many(self, stats: Dict[str, Dict[str, int]]):
+        """
+        批量写入统计，超出容量时淘汰最久未使用的条目
+
+        Args:
+            stats: {提交ID: 统计}
+        """
+        with self._lock:
+            for commit_id, entry in stats.items():
+                self._entries[commit_id] = entry
+                self._entries.move_to_end(commit_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """清除全部缓存"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """获取缓存统计信息"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+# 进程级共享的提交变更统计缓存
+commit_stats_cache = CommitStatsCache()
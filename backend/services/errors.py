@@ -0,0 +1,32 @@
+"""
+Git服务异常定义
+"""
+
+from typing import List
+
+
+# 自定义异常类
+class GitError(Exception):
+    """Git操作错误基类"""
+
+    pass
+
+
+class RepositoryNotFoundError(GitError):
+    """仓库不存在错误"""
+
+    pass
+
+
+class InvalidPathError(GitError):
+    """无效路径错误"""
+
+    pass
+
+
+class MergeConflictError(GitError):
+    """合并冲突错误"""
+
+    def __init__(self, conflicts: List[str]):
+        self.conflicts = conflicts
+        super().__init__(f"合并冲突: {len(conflicts)}个文件")
@@ -3,13 +3,51 @@ Git命令封装服务
 提供对Git CLI命令的封装和输出解析
 """
 
+import asyncio
+import codecs
 import json
 import os
 import re
 import subprocess
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from services.blob_cache import blob_cache
+from services.cat_file import CatFileProcess, cat_file_pool, get_git_version
+from services.commit_stats import commit_stats_cache
+from services.errors import (  # noqa: F401
+    GitError,
+    InvalidPathError,
+    MergeConflictError,
+    RepositoryNotFoundError,
+)
+from services.log_cache import log_cache
+from services.metrics import GitCommandTimer, text_size
+from services.repo_lock import ReadWriteLock, read_locked, repo_locks, write_locked
+from services.repo_metadata import RepoMetadata, stat_stamp
+from services.repo_state import (
+    index_stamp,
+    read_head,
+    sample_directories,
+    worktree_monitors,
+)
+from services.status_cache import status_cache
+from services.system_files import SystemFileMatcher
+from services.tracing import traced
+from services.tree_index import TreeIndex, tree_index_cache
 
 # .gitignore默认规则分类
 GITIGNORE_RULES = {
@@ -91,32 +129,74 @@ SYSTEM_FILE_PATTERNS = [
     r"^\.settings/",
 ]
 
+# 由SYSTEM_FILE_PATTERNS预先构建的匹配器，避免每个文件逐条执行正则
+SYSTEM_FILE_MATCHER = SystemFileMatcher(SYSTEM_FILE_PATTERNS)
 
-# 自定义异常类
-class GitError(Exception):
-    """Git操作错误基类"""
 
-    pass
+@traced("filter-system-files")
+def filter_system_files(filenames: Iterable[str]) -> List[str]:
+    """
+    批量过滤系统文件
 
+    Args:
+        filenames: 文件路径序列
 
-class RepositoryNotFoundError(GitError):
-    """仓库不存在错误"""
+    Returns:
+        不是系统文件的路径列表（保持原顺序）
+    """
+    return SYSTEM_FILE_MATCHER.filter(filenames)
 
-    pass
 
+# 批量路径命令每个进程处理的最大路径数
+PATHSPEC_CHUNK_SIZE = 2000
 
-class InvalidPathError(GitError):
-    """无效路径错误"""
+# 批量路径命令遇到无法匹配的路径时的最大重试次数
+PATHSPEC_MAX_RETRIES = 3
 
-    pass
+# 流式读取git log时每次从管道读取的字节数
+LOG_STREAM_CHUNK_SIZE = 64 * 1024
 
+# 流式读取git log --numstat时每次从管道读取的字节数
+NUMSTAT_STREAM_CHUNK_SIZE = 64 * 1024
 
-class MergeConflictError(GitError):
-    """合并冲突错误"""
+# 流式读取大文件内容时每次从管道读取的字节数
+BLOB_STREAM_CHUNK_SIZE = 256 * 1024
 
-    def __init__(self, conflicts: List[str]):
-        self.conflicts = conflicts
-        super().__init__(f"合并冲突: {len(conflicts)}个文件")
+# 单次获取分支信息和文件变更的status参数
+# -uall 参数确保显示所有未追踪文件的完整路径，而不仅仅是文件夹名称
+# --no-optional-locks 避免status顺带刷新并重写索引，索引签名只在内容变化时改变
+STATUS_ARGS = [
+    "--no-optional-locks",
+    "status",
+    "--porcelain=v2",
+    "--branch",
+    "-z",
+    "-uall",
+]
+
+# 文件列表中不显示的Git管理文件（仓库根目录）
+GIT_MANAGEMENT_FILES = {".gitignore", ".chronos", ".gitattributes"}
+
+# merge-tree --write-tree（在对象库中完成合并，不修改工作区和索引）需要的最低Git版本
+MERGE_TREE_MIN_VERSION = (2, 38)
+
+# 冲突详情中单个文件内容的默认大小上限（字节），超过时只返回大小
+CONFLICT_FILE_MAX_BYTES = 1024 * 1024
+
+# 一次冲突详情请求返回的内容总大小上限（字节），超过后其余文件只返回大小
+CONFLICT_TOTAL_MAX_BYTES = 32 * 1024 * 1024
+
+# 判断二进制内容时检查的前缀长度（与Git相同：前8000字节中有NUL视为二进制）
+BINARY_SNIFF_BYTES = 8000
+
+# 冲突阶段编号对应的名称
+CONFLICT_STAGE_NAMES = {1: "base", 2: "ours", 3: "theirs"}
+
+# 子模块条目的模式（对象是另一个仓库的提交，无法读取内容）
+GITLINK_MODE = "160000"
+
+# 解析 "pathspec 'xxx' did not match any file(s)" 错误
+PATHSPEC_UNMATCHED_RE = re.compile(r"pathspec '(.*)' did not match any")
 
 
 class GitWrapper:
@@ -139,9 +219,28 @@ class GitWrapper:
             repo_path: 仓库路径（绝对路径）
         """
         self.repo_path = Path(repo_path).resolve()
+        # 同一仓库的所有GitWrapper实例共享一把读写锁
+        self.lock: ReadWriteLock = repo_locks.get(self.repo_path)
+        # .git位置和配置值缓存，GitWrapper通过注册表长期复用时生效
+        self.metadata = RepoMetadata(self.repo_path)
+        # 被忽略目录缓存：(忽略规则文件签名, 目录集合)
+        self._ignored_dirs = None
+
+    @property
+    def cat_file(self) -> CatFileProcess:
+        """
+        当前仓库共享的 cat-file 常驻进程
+
+        对象类型、大小和内容查询通过它完成，避免每次启动新的git进程
+        """
+        return cat_file_pool.get(self.repo_path)
 
     def _run_git_command(
-        self, args: List[str], check: bool = True, capture_output: bool = True
+        self,
+        args: List[str],
+        check: bool = True,
+        capture_output: bool = True,
+        input: Optional[str] = None,
     ) -> subprocess.CompletedProcess:
         """
         执行Git命令的通用方法
@@ -150,6 +249,7 @@ class GitWrapper:
             args: Git命令参数列表（不包含'git'）
             check: 是否检查返回码，如果为True且命令失败则抛出异常
             capture_output: 是否捕获输出
+            input: 写入标准输入的内容
 
         Returns:
             subprocess.CompletedProcess对象
@@ -157,6 +257,7 @@ class GitWrapper:
         Raises:
             GitError: Git命令执行失败
         """
+        timer = GitCommandTimer(args)
         try:
             result = subprocess.run(
                 ["git"] + args,
@@ -164,7 +265,9 @@ class GitWrapper:
                 capture_output=capture_output,
                 text=True,
                 check=False,
+                input=input,
             )
+            timer.finish(result.returncode, text_size(result.stdout))
 
             if check and result.returncode != 0:
                 error_msg = result.stderr.strip() if result.stderr else "未知错误"
@@ -178,7 +281,174 @@ class GitWrapper:
             if isinstance(e, GitError):
                 raise
             raise GitError(f"执行Git命令时发生错误: {str(e)}") from e
+        finally:
+            timer.finish()
+
+    async def _run_git_command_async(
+        self, args: List[str], check: bool = True
+    ) -> subprocess.CompletedProcess:
+        """
+        异步执行Git命令（基于asyncio.create_subprocess_exec）
+
+        等待子进程期间不会阻塞事件循环，不同仓库的请求可以并行执行
+
+        Args:
+            args: Git命令参数列表（不包含'git'）
+            check: 是否检查返回码，如果为True且命令失败则抛出异常
+
+        Returns:
+            subprocess.CompletedProcess对象（stdout/stderr为字符串）
+
+        Raises:
+            GitError: Git命令执行失败
+        """
+        timer = GitCommandTimer(args)
+        try:
+            process = await asyncio.create_subprocess_exec(
+                "git",
+                *args,
+                cwd=str(self.repo_path),
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+        except FileNotFoundError as e:
+            timer.finish()
+            raise GitError("Git未安装或不在系统PATH中") from e
+        except NotImplementedError:
+            # 事件循环不支持子进程（如Windows上的SelectorEventLoop），回退到线程池
+            timer.cancel()
+            return await asyncio.to_thread(self._run_git_command, args, check)
+        except Exception as e:
+            timer.finish()
+            raise GitError(f"执行Git命令时发生错误: {str(e)}") from e
+
+        try:
+            stdout_bytes, stderr_bytes = await process.communicate()
+        except BaseException:
+            # 请求被取消时记录为error
+            timer.finish()
+            raise
+        timer.finish(process.returncode, len(stdout_bytes))
+        result = subprocess.CompletedProcess(
+            ["git"] + args,
+            process.returncode,
+            stdout_bytes.decode("utf-8", errors="replace"),
+            stderr_bytes.decode("utf-8", errors="replace"),
+        )
+
+        if check and result.returncode != 0:
+            error_msg = result.stderr.strip() if result.stderr else "未知错误"
+            raise GitError(f"Git命令执行失败: {error_msg}")
+
+        return result
+
+    @write_locked
+    def _run_pathspec_batch(
+        self,
+        args: List[str],
+        paths: List[str],
+        worktree: bool = True,
+        chunk_size: int = PATHSPEC_CHUNK_SIZE,
+    ) -> Dict[str, Any]:
+        """
+        批量对路径执行Git命令（add、rm --cached、restore等）
+
+        通过 --pathspec-from-file=- --pathspec-file-nul 从标准输入传递路径，
+        每个分块只启动一个git进程。某些路径无法匹配时，一次性找出这些路径、
+        记录为失败后重试该分块，而不是退化为每个路径一个进程。
+
+        Args:
+            args: Git命令参数（不包含路径），如["add"]、["rm", "--cached", "-q"]
+            paths: 路径列表
+            worktree: 路径是否可以匹配工作区文件（add为True，操作索引的命令为False）
+            chunk_size: 每个git进程处理的最大路径数
+
+        Returns:
+            操作结果字典，包含：
+            - succeeded: List[str] - 成功处理的路径
+            - failed: List[Dict] - 失败的路径及原因（file, error）
+        """
+        succeeded: List[str] = []
+        failed: List[Dict[str, str]] = []
+
+        # 去重并保持顺序
+        paths = list(dict.fromkeys(p for p in paths if p))
+
+        for start in range(0, len(paths), chunk_size):
+            pending = paths[start : start + chunk_size]
+            unmatched_checked = False
+
+            for _ in range(PATHSPEC_MAX_RETRIES + 1):
+                if not pending:
+                    break
+
+                result = self._run_git_command(
+                    args + ["--pathspec-from-file=-", "--pathspec-file-nul"],
+                    check=False,
+                    input="\0".join(pending) + "\0",
+                )
+                if result.returncode == 0:
+                    succeeded.extend(pending)
+                    pending = []
+                    break
+
+                error_msg = result.stderr.strip() if result.stderr else "未知错误"
+                match = PATHSPEC_UNMATCHED_RE.search(error_msg)
+                if not match or match.group(1) not in pending:
+                    break
+
+                if not unmatched_checked:
+                    # 第一次失败时一次性找出分块中所有无法匹配的路径
+                    unmatched = self._find_unmatched_paths(pending, worktree)
+                    unmatched.add(match.group(1))
+                    unmatched_checked = True
+                else:
+                    unmatched = {match.group(1)}
+
+                for path in pending:
+                    if path in unmatched:
+                        failed.append({"file": path, "error": "文件不存在或未被追踪"})
+                pending = [p for p in pending if p not in unmatched]
+            else:
+                error_msg = "无法匹配的路径过多"
+
+            for path in pending:
+                failed.append({"file": path, "error": error_msg})
+
+        return {"succeeded": succeeded, "failed": failed}
+
+    def _find_unmatched_paths(self, paths: List[str], worktree: bool) -> set:
+        """
+        找出既不在工作区（worktree为True时）也不在索引中的路径
+
+        Args:
+            paths: 路径列表
+            worktree: 是否检查工作区文件
+
+        Returns:
+            无法匹配的路径集合
+        """
+        candidates = paths
+        if worktree:
+            candidates = [p for p in paths if not os.path.lexists(self.repo_path / p)]
+        if not candidates:
+            return set()
+
+        # ls-files不支持--pathspec-from-file，读取完整索引列表后在内存中匹配
+        result = self._run_git_command(["ls-files", "-z"], check=False)
+        tracked = set()
+        for entry in result.stdout.split("\0"):
+            if not entry:
+                continue
+            tracked.add(entry)
+            # 记录所有上级目录，支持以目录作为路径
+            parts = entry.split("/")
+            for i in range(1, len(parts)):
+                tracked.add("/".join(parts[:i]))
 
+        return {path for path in candidates if path.rstrip("/") not in tracked}
+
+    @write_locked
     def init_repository(self) -> Dict[str, Any]:
         """
         初始化Git仓库，并自动创建初始提交
@@ -314,6 +584,10 @@ class GitWrapper:
             "cleaned_files": cleaned_files,
         }
 
+    async def init_repository_async(self) -> Dict[str, Any]:
+        """init_repository的异步版本（包含文件读写，在线程池中执行）"""
+        return await asyncio.to_thread(self.init_repository)
+
     def _get_git_config(self, key: str) -> Optional[str]:
         """
         获取Git配置值
@@ -324,6 +598,10 @@ class GitWrapper:
         Returns:
             配置值，如果不存在则返回None
         """
+        return self.metadata.get_config(key, self._load_git_config)
+
+    def _load_git_config(self, key: str) -> Optional[str]:
+        """执行git config读取配置值（不经过缓存）"""
         try:
             result = self._run_git_command(["config", "--get", key], check=False)
             if result.returncode == 0:
@@ -379,7 +657,7 @@ class GitWrapper:
         """
         判断文件是否为系统文件
 
-        使用SYSTEM_FILE_PATTERNS进行正则匹配，支持文件名和路径匹配
+        使用SYSTEM_FILE_PATTERNS构建的匹配器，支持文件名和路径匹配
 
         Args:
             filename: 文件路径
@@ -387,23 +665,7 @@ class GitWrapper:
         Returns:
             True如果是系统文件，否则False
         """
-        if not filename:
-            return False
-
-        # 标准化路径分隔符（统一使用/）
-        filename = filename.replace("\\", "/")
-
-        # 检查是否匹配任何系统文件模式
-        for pattern in SYSTEM_FILE_PATTERNS:
-            if re.match(pattern, filename):
-                return True
-
-            # 同时检查文件名部分（处理路径中的文件）
-            basename = filename.split("/")[-1]
-            if basename and re.match(pattern, basename):
-                return True
-
-        return False
+        return SYSTEM_FILE_MATCHER.matches(filename)
 
     def _merge_gitignore_rules(
         self, existing_content: str, new_rules: List[str]
@@ -595,19 +857,16 @@ class GitWrapper:
             tracked_files = self.get_tracked_files()
 
             # 筛选系统文件
-            system_files = [f for f in tracked_files if self._is_system_file(f)]
+            system_files = [f for f in tracked_files if SYSTEM_FILE_MATCHER.matches(f)]
 
             if not system_files:
                 return []
 
-            # 对每个系统文件执行git rm --cached
-            for file in system_files:
-                try:
-                    self._run_git_command(["rm", "--cached", file])
-                    cleaned_files.append(file)
-                except GitError:
-                    # 单个文件失败不影响其他文件
-                    continue
+            # 批量执行git rm --cached，单个文件失败不影响其他文件
+            result = self._run_pathspec_batch(
+                ["rm", "--cached", "-q"], system_files, worktree=False
+            )
+            cleaned_files = result["succeeded"]
 
         except Exception:
             # 如果获取文件列表失败，返回已清理的文件
@@ -615,10 +874,13 @@ class GitWrapper:
 
         return cleaned_files
 
+    @read_locked
     def get_status(self) -> Dict[str, Any]:
         """
         获取仓库状态
 
+        仓库指纹不变时直接返回缓存的结果，返回的字典不能修改
+
         Returns:
             包含当前分支和文件变更列表的字典
 
@@ -628,47 +890,253 @@ class GitWrapper:
         """
         self._verify_repository()
 
-        # 获取当前分支
-        current_branch = self.get_current_branch()
+        fingerprint = self._status_fingerprint()
+        if fingerprint is not None:
+            cached = status_cache.get(self.repo_path, fingerprint[0], fingerprint[2])
+            if cached is not None:
+                return cached
+
+        # 分支、上游和文件变更都来自同一次git status调用
+        start = time.perf_counter()
+        result = self._run_git_command(STATUS_ARGS)
+        status = self._parse_status_output(result.stdout)
+
+        if fingerprint is not None:
+            status_cache.put(
+                self.repo_path,
+                fingerprint[0],
+                status,
+                time.perf_counter() - start,
+                fingerprint[1],
+            )
+        return status
 
-        # 执行git status --porcelain -uall
-        # -uall 参数确保显示所有未追踪文件的完整路径，而不仅仅是文件夹名称
-        result = self._run_git_command(["status", "--porcelain", "-uall"])
+    @read_locked
+    async def get_status_async(self) -> Dict[str, Any]:
+        """get_status的异步版本"""
+        self._verify_repository()
 
-        # 解析输出并过滤系统文件
-        changes = []
-        git_management_files = {".gitignore", ".chronos", ".gitattributes"}
+        fingerprint = await asyncio.to_thread(self._status_fingerprint)
+        if fingerprint is not None:
+            cached = status_cache.get(self.repo_path, fingerprint[0], fingerprint[2])
+            if cached is not None:
+                return cached
+
+        start = time.perf_counter()
+        result = await self._run_git_command_async(STATUS_ARGS)
+        status = self._parse_status_output(result.stdout)
+
+        if fingerprint is not None:
+            status_cache.put(
+                self.repo_path,
+                fingerprint[0],
+                status,
+                time.perf_counter() - start,
+                fingerprint[1],
+            )
+        return status
 
-        # 注意：不要对整个输出使用strip()，因为会去掉第一行开头的空格
-        # Git status --porcelain的格式是固定的，每行都是"XY filename"
-        for line in result.stdout.splitlines():
-            if not line:
-                continue
+    def _read_status_uncached(self) -> Dict[str, Any]:
+        """
+        直接执行git status读取仓库状态（不使用状态缓存）
+
+        写操作前检查未保存的变更时使用：没有文件监听时缓存按目录签名判断新鲜度，
+        原地修改文件不会改变目录签名，缓存的结果可能已经过期
+        """
+        result = self._run_git_command(STATUS_ARGS)
+        return self._parse_status_output(result.stdout)
+
+    @traced("status-fingerprint")
+    def _status_fingerprint(self) -> Optional[tuple]:
+        """
+        计算仓库状态指纹
+
+        指纹由HEAD（分支和提交ID）、索引文件签名和工作区变化标记组成：
+        有文件监听时使用监听器的变化计数，否则使用目录签名
+
+        Returns:
+            (指纹, 是否来自文件监听, 计算耗时)；监听器有尚未推送的变化时返回None
+        """
+        start = time.perf_counter()
+        git_dir = self.metadata.git_dir
+        if git_dir is None:
+            return None
+
+        monitor = worktree_monitors.get(self.repo_path)
+        if monitor is not None:
+            if monitor.settling:
+                return None
+            worktree: Hashable = ("watch", monitor.instance, monitor.generation)
+        else:
+            worktree = (
+                "sample",
+                sample_directories(self.repo_path, self.get_ignored_dirs()),
+            )
+
+        fingerprint = (read_head(git_dir), index_stamp(git_dir), worktree)
+        return fingerprint, monitor is not None, time.perf_counter() - start
+
+    def get_ignored_dirs(self) -> Set[str]:
+        """
+        获取被忽略的目录（如node_modules），相对仓库根目录
+
+        结果按根目录.gitignore和.git/info/exclude的签名缓存
+
+        Returns:
+            目录相对路径集合（不含末尾的/）
+        """
+        git_dir = self.metadata.git_dir
+        stamp = (
+            stat_stamp(self.repo_path / ".gitignore"),
+            stat_stamp(git_dir / "info" / "exclude") if git_dir else None,
+        )
+        cached = self._ignored_dirs
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+
+        result = self._run_git_command(
+            [
+                "ls-files",
+                "-z",
+                "--others",
+                "--ignored",
+                "--exclude-standard",
+                "--directory",
+            ],
+            check=False,
+        )
+        dirs = {
+            entry.rstrip("/")
+            for entry in result.stdout.split("\0")
+            if entry.endswith("/")
+        }
+        self._ignored_dirs = (stamp, dirs)
+        return dirs
+
+    def _after_write(self):
+        """写操作结束后清除依赖仓库状态的缓存（由write_locked调用）"""
+        status_cache.invalidate(self.repo_path)
+
+    @traced("parse-status")
+    def _parse_status_output(self, output: str) -> Dict[str, Any]:
+        """
+        解析git status --porcelain=v2 --branch -z输出
+
+        条目以NUL分隔，路径不做引号转义，文件名中的空格、引号和换行都能正确处理。
+        条目格式：
+        - # branch.oid <commit>|(initial)
+        - # branch.head <branch>|(detached)
+        - # branch.upstream <upstream>
+        - # branch.ab +<ahead> -<behind>
+        - 1 XY sub mH mI mW hH hI path
+        - 2 XY sub mH mI mW hH hI Xscore path<NUL>origPath（重命名/复制）
+        - u XY sub m1 m2 m3 mW h1 h2 h3 path（未合并）
+        - ? path（未追踪）
+
+        Args:
+            output: git status输出
 
-            # Git status --porcelain格式: XY filename
-            # X表示暂存区状态，Y表示工作区状态
-            # 前两个字符是状态码，第三个字符是空格，从第四个字符开始是文件名
-            if len(line) < 4:
+        Returns:
+            包含当前分支、上游信息和文件变更列表的字典
+        """
+        changes = []
+        conflicts = []
+        is_system_file = SYSTEM_FILE_MATCHER.matches
+
+        head_oid = None
+        branch_head = None
+        upstream = None
+        ahead = 0
+        behind = 0
+
+        entries = output.split("\0")
+        index = 0
+        while index < len(entries):
+            entry = entries[index]
+            index += 1
+            if not entry:
                 continue
 
-            status_code = line[:2]
-            filename = line[3:]
+            kind = entry[0]
+            old_file = None
+
+            if kind == "#":
+                key, _, value = entry[2:].partition(" ")
+                if key == "branch.oid":
+                    head_oid = None if value == "(initial)" else value
+                elif key == "branch.head":
+                    branch_head = value
+                elif key == "branch.upstream":
+                    upstream = value
+                elif key == "branch.ab":
+                    for part in value.split():
+                        if part.startswith("+"):
+                            ahead = int(part[1:])
+                        elif part.startswith("-"):
+                            behind = int(part[1:])
+                continue
+            elif kind == "1":
+                fields = entry.split(" ", 8)
+                if len(fields) < 9:
+                    continue
+                # v2使用'.'表示未变更，转换为v1的空格以复用状态标准化逻辑
+                status_code = fields[1].replace(".", " ")
+                filename = fields[8]
+            elif kind == "2":
+                fields = entry.split(" ", 9)
+                if len(fields) < 10:
+                    continue
+                status_code = fields[1].replace(".", " ")
+                filename = fields[9]
+                # 原路径作为下一个NUL分隔的条目紧随其后
+                if index < len(entries):
+                    old_file = entries[index]
+                    index += 1
+            elif kind == "u":
+                fields = entry.split(" ", 10)
+                if len(fields) < 11:
+                    continue
+                status_code = fields[1]
+                filename = fields[10]
+            elif kind == "?":
+                status_code = "??"
+                filename = entry[2:]
+            else:
+                # '!' 忽略文件等其他条目
+                continue
 
             # 过滤系统文件和Git管理文件
-            if self._is_system_file(filename) or filename in git_management_files:
+            if is_system_file(filename) or filename in GIT_MANAGEMENT_FILES:
                 continue
 
+            if kind == "u":
+                conflicts.append(filename)
+
             # 标准化状态
             status = self._normalize_status(status_code)
 
-            changes.append({"status": status, "file": filename})
+            change = {"status": status, "file": filename}
+            if old_file is not None:
+                change["old_file"] = old_file
+            changes.append(change)
+
+        detached = branch_head == "(detached)"
+        # 与get_current_branch保持一致：分离HEAD或无法识别时返回默认值main
+        current_branch = branch_head if branch_head and not detached else "main"
 
         return {
             "branch": current_branch,
             "changes": changes,
             "is_clean": len(changes) == 0,
+            "head": head_oid,
+            "detached": detached,
+            "upstream": upstream,
+            "ahead": ahead,
+            "behind": behind,
+            "conflicts": conflicts,
         }
 
+    @read_locked
     def get_tracked_files(self) -> List[str]:
         """
         获取所有已追踪的文件列表
@@ -687,21 +1155,244 @@ class GitWrapper:
         # 执行git ls-files
         result = self._run_git_command(["ls-files"])
 
-        # 解析输出并过滤系统文件
-        files = []
-        git_management_files = {".gitignore", ".chronos", ".gitattributes"}
+        return self._parse_tracked_files(result.stdout)
+
+    @read_locked
+    async def get_tracked_files_async(self) -> List[str]:
+        """get_tracked_files的异步版本"""
+        self._verify_repository()
+
+        result = await self._run_git_command_async(["ls-files"])
+
+        return self._parse_tracked_files(result.stdout)
+
+    def _parse_tracked_files(self, output: str) -> List[str]:
+        """
+        解析git ls-files输出
+
+        Args:
+            output: git ls-files输出
+
+        Returns:
+            已追踪文件路径列表（不包含系统文件）
+        """
+        filenames = (line.strip() for line in output.strip().split("\n") if line)
+
+        # 过滤系统文件和Git管理文件
+        return [
+            filename
+            for filename in filter_system_files(filenames)
+            if filename not in GIT_MANAGEMENT_FILES
+        ]
+
+    @read_locked
+    def get_tree(self, directory: str = "", depth: int = 1) -> Dict[str, Any]:
+        """
+        获取已追踪文件目录树中一个目录的内容
+
+        目录树按索引状态构建一次并缓存，展开目录的成本只与子项数量有关
+
+        Args:
+            directory: 目录相对路径，空字符串表示仓库根目录
+            depth: 展开的层数，1表示只返回直接子项
+
+        Returns:
+            目录信息字典：
+            - path: 目录路径
+            - file_count: 目录下（递归）的文件数量
+            - size: 目录下（递归）文件的字节大小之和
+            - children: 子项列表，文件夹包含file_count/size，文件包含size
+
+        Raises:
+            RepositoryNotFoundError: 不是Git仓库
+            ValueError: 目录不存在
+            GitError: 读取索引失败
+        """
+        self._verify_repository()
+        return self._get_tree_index().list(directory.strip("/"), depth)
+
+    @read_locked
+    async def get_tree_async(
+        self, directory: str = "", depth: int = 1
+    ) -> Dict[str, Any]:
+        """get_tree的异步版本（构建目录树在线程池中执行）"""
+        self._verify_repository()
+        tree = await asyncio.to_thread(self._get_tree_index)
+        return tree.list(directory.strip("/"), depth)
+
+    def _get_tree_index(self) -> TreeIndex:
+        """获取当前索引状态对应的目录树，索引变化后重建"""
+        # 签名在读取索引之前获取，读取期间索引变化时下次会重建
+        stamp = index_stamp(self.metadata.git_dir)
+        tree = tree_index_cache.get(self.repo_path, stamp)
+        if tree is None:
+            tree = TreeIndex(self._load_tree_entries())
+            tree_index_cache.put(self.repo_path, stamp, tree)
+        return tree
+
+    @traced("build-tree-index")
+    def _load_tree_entries(self) -> List[Tuple[str, int]]:
+        """
+        读取索引中的文件及其大小
+
+        git ls-files -s 提供每个文件的对象ID，
+        再由一次 git cat-file --batch-check 批量查询对象大小
+
+        Returns:
+            (文件路径, 字节大小) 列表（不包含系统文件和Git管理文件）
+        """
+        result = self._run_git_command(["ls-files", "-s", "-z"])
+
+        oids: Dict[str, str] = {}
+        for record in result.stdout.split("\0"):
+            if not record:
+                continue
+            info, _, path = record.partition("\t")
+            mode, oid, _stage = info.split(" ")
+            # 冲突文件有多个暂存阶段，只保留一条；子模块没有blob大小
+            if path not in oids:
+                oids[path] = "" if mode == "160000" else oid
+
+        paths = [
+            path
+            for path in filter_system_files(oids)
+            if path not in GIT_MANAGEMENT_FILES
+        ]
+
+        sizes: Dict[str, int] = {}
+        unique = {oids[path] for path in paths if oids[path]}
+        if unique:
+            result = self._run_git_command(
+                ["cat-file", "--batch-check=%(objectname) %(objectsize)"],
+                check=False,
+                input="\n".join(unique) + "\n",
+            )
+            for line in result.stdout.splitlines():
+                oid, _, size = line.partition(" ")
+                if size.isdigit():
+                    sizes[oid] = int(size)
+
+        return [(path, sizes.get(oids[path], 0)) for path in paths]
+
+    def resolve_blob(self, commit: str, file_path: str) -> Tuple[str, int]:
+        """
+        查找快照中文件对应的blob
+
+        通过cat-file常驻进程查询 <commit>:<path>，不启动新进程
+
+        Args:
+            commit: 提交ID或分支名称
+            file_path: 文件相对路径
+
+        Returns:
+            (blob OID, 字节大小)
+
+        Raises:
+            RepositoryNotFoundError: 不是Git仓库
+            ValueError: 提交或文件不存在、路径是目录
+        """
+        self._verify_repository()
+
+        commit = commit.strip()
+        file_path = file_path.strip().strip("/")
+        if not commit or commit.startswith("-"):
+            raise ValueError(f"无效的提交: {commit}")
+        if not file_path:
+            raise ValueError("文件路径不能为空")
+
+        info = self.cat_file.info(f"{commit}:{file_path}")
+        if info is None:
+            raise ValueError(f"快照 {commit} 中不存在文件: {file_path}")
+        oid, obj_type, size = info
+        if obj_type != "blob":
+            raise ValueError(f"不是文件: {file_path}")
+        return oid, size
+
+    def read_blob(self, oid: str) -> bytes:
+        """
+        读取blob内容（按OID缓存，大文件不缓存，应使用iter_blob_async）
+
+        Args:
+            oid: blob的完整OID
+
+        Returns:
+            文件内容
+
+        Raises:
+            GitError: 对象不存在
+        """
+        content = blob_cache.get(oid)
+        if content is None:
+            obj = self.cat_file.contents(oid)
+            if obj is None:
+                raise GitError(f"对象不存在: {oid}")
+            content = obj[2]
+            blob_cache.put(oid, content)
+        return content
+
+    async def iter_blob_async(
+        self, oid: str, start: int = 0, end: Optional[int] = None
+    ) -> AsyncIterator[bytes]:
+        """
+        流式读取blob内容中的 [start, end) 字节（git cat-file blob）
+
+        用于不适合整体读入内存的大文件；blob不可变，不持有仓库读锁
+
+        Args:
+            oid: blob的完整OID
+            start: 起始字节偏移
+            end: 结束字节偏移（不包含），None表示到文件末尾
 
-        for line in result.stdout.strip().split("\n"):
-            if line:
-                filename = line.strip()
-                # 过滤系统文件和Git管理文件
-                if (
-                    not self._is_system_file(filename)
-                    and filename not in git_management_files
-                ):
-                    files.append(filename)
+        Yields:
+            内容片段
+        """
+        args = ["cat-file", "blob", oid]
+        timer = GitCommandTimer(args)
+        try:
+            process = await asyncio.create_subprocess_exec(
+                "git",
+                *args,
+                cwd=str(self.repo_path),
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
+            )
+        except NotImplementedError:
+            # 事件循环不支持子进程时一次性读取
+            timer.cancel()
+            content = await asyncio.to_thread(self.read_blob, oid)
+            yield content[start:end]
+            return
+        except FileNotFoundError as e:
+            timer.finish()
+            raise GitError("Git未安装或不在系统PATH中") from e
 
-        return files
+        offset = 0
+        stdout_bytes = 0
+        eof = False
+        try:
+            while end is None or offset < end:
+                chunk = await process.stdout.read(BLOB_STREAM_CHUNK_SIZE)
+                if not chunk:
+                    eof = True
+                    break
+                stdout_bytes += len(chunk)
+                chunk_start = offset
+                offset += len(chunk)
+                # 跳过范围之前的部分，截掉范围之后的部分
+                piece = chunk[max(start - chunk_start, 0) :]
+                if end is not None:
+                    piece = piece[: max(end - max(start, chunk_start), 0)]
+                if piece:
+                    yield piece
+        finally:
+            # 范围读取完毕或客户端断开时终止git进程（读到EOF时进程已自行退出）
+            if not eof and process.returncode is None:
+                try:
+                    process.kill()
+                except ProcessLookupError:
+                    pass
+            await process.wait()
+            timer.finish(process.returncode, stdout_bytes)
 
     def get_current_branch(self) -> str:
         """
@@ -717,7 +1408,21 @@ class GitWrapper:
         self._verify_repository()
 
         result = self._run_git_command(["branch", "--show-current"])
-        branch = result.stdout.strip()
+
+        return self._parse_current_branch(result.stdout)
+
+    async def get_current_branch_async(self) -> str:
+        """get_current_branch的异步版本"""
+        self._verify_repository()
+
+        result = await self._run_git_command_async(["branch", "--show-current"])
+
+        return self._parse_current_branch(result.stdout)
+
+    @staticmethod
+    def _parse_current_branch(output: str) -> str:
+        """解析git branch --show-current输出"""
+        branch = output.strip()
 
         # 如果没有分支（新仓库），返回默认值
         if not branch:
@@ -760,10 +1465,10 @@ class GitWrapper:
         Raises:
             RepositoryNotFoundError: 不是Git仓库
         """
-        git_dir = self.repo_path / ".git"
-        if not git_dir.exists():
+        if not self.metadata.is_repository():
             raise RepositoryNotFoundError(f"不是Git仓库: {self.repo_path}")
 
+    @write_locked
     def create_commit(
         self, message: str, files: Optional[List[str]] = None
     ) -> Dict[str, Any]:
@@ -798,8 +1503,10 @@ class GitWrapper:
             # 选择性添加文件
             if not files:
                 raise ValueError("未指定要添加的文件")
-            for file in files:
-                self._run_git_command(["add", file])
+            add_result = self._run_pathspec_batch(["add"], files)
+            if add_result["failed"]:
+                failed_files = ", ".join(f["file"] for f in add_result["failed"])
+                raise GitError(f"Git命令执行失败: 无法添加文件 {failed_files}")
 
         # 检查是否有内容可提交
         status_result = self._run_git_command(["status", "--porcelain"], check=False)
@@ -814,13 +1521,32 @@ class GitWrapper:
 
         return {"success": True, "message": "快照创建成功", "commit": commit_info}
 
+    async def create_commit_async(
+        self, message: str, files: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """create_commit的异步版本（多步写操作，在线程池中执行）"""
+        return await asyncio.to_thread(self.create_commit, message, files)
+
     def _get_latest_commit(self) -> Dict[str, str]:
         """
         获取最新提交的信息
 
+        通过 cat-file 常驻进程读取HEAD提交对象并解析，
+        常驻进程不可用时回退为git log
+
         Returns:
             包含提交信息的字典
         """
+        try:
+            obj = self.cat_file.contents("HEAD")
+        except GitError:
+            obj = None
+
+        if obj is not None and obj[1] == "commit":
+            commit_info = self._parse_commit_object(obj[0], obj[2])
+            if commit_info:
+                return commit_info
+
         result = self._run_git_command(
             ["log", "-1", "--pretty=format:%H|%an|%ae|%at|%s"]
         )
@@ -840,15 +1566,67 @@ class GitWrapper:
             "message": parts[4],
         }
 
+    @staticmethod
+    def _parse_commit_object(commit_id: str, raw: bytes) -> Dict[str, str]:
+        """
+        解析原始提交对象，字段与 git log 的 %H|%an|%ae|%at|%s 一致
+
+        Args:
+            commit_id: 提交ID
+            raw: cat-file 返回的提交对象内容
+
+        Returns:
+            包含提交信息的字典，解析失败返回空字典
+        """
+        text = raw.decode("utf-8", errors="replace")
+        header, _, body = text.partition("\n\n")
+
+        author_line = None
+        for line in header.split("\n"):
+            if line.startswith("author "):
+                author_line = line[len("author ") :]
+                break
+
+        if author_line is None or "<" not in author_line:
+            return {}
+
+        # 格式: Name <email> timestamp timezone
+        name, _, rest = author_line.partition("<")
+        email, _, date_part = rest.rpartition(">")
+        date_fields = date_part.split()
+        timestamp = date_fields[0] if date_fields else ""
+
+        # %s 取消息的第一段，段内换行替换为空格
+        subject_lines = []
+        for line in body.strip("\n").split("\n"):
+            if not line.strip():
+                break
+            subject_lines.append(line.strip())
+
+        return {
+            "id": commit_id,
+            "author": name.strip(),
+            "email": email.strip(),
+            "timestamp": timestamp,
+            "message": " ".join(subject_lines),
+        }
+
+    @read_locked
     def get_log(
-        self, limit: Optional[int] = None, branch: Optional[str] = None
+        self,
+        limit: Optional[int] = None,
+        branch: Optional[str] = None,
+        after: Optional[str] = None,
+        with_stats: bool = False,
     ) -> List[Dict[str, Any]]:
         """
         获取提交历史记录
 
         Args:
-            limit: 限制返回的提交数量，None表示返回所有
+            limit: 限制返回的提交数量（分页大小），None表示返回所有
             branch: 指定分支，None表示当前分支
+            after: 分页游标，返回该提交之后（更早）的记录，None表示从头开始
+            with_stats: 是否附带每个提交的变更统计（stats字段）
 
         Returns:
             提交历史列表，每个元素包含id, message, author, email, date等信息
@@ -856,71 +1634,585 @@ class GitWrapper:
         Raises:
             RepositoryNotFoundError: 不是Git仓库
             GitError: 获取历史失败
+            ValueError: 游标提交无效或不在历史中
         """
         self._verify_repository()
 
-        # 构建git log命令
-        # %H: commit hash, %an: author name, %ae: author email, %at: author timestamp
-        # %B: raw body (完整提交消息，包括标题和详细说明), %P: parent hashes
-        # 使用 %x00 (NULL字符) 作为记录分隔符，%x1F (Unit Separator) 作为字段分隔符
-        args = ["log", "--pretty=format:%H%x1F%an%x1F%ae%x1F%at%x1F%B%x1F%P%x00"]
+        commits = self._get_log_cached(limit, branch, after)
+        if commits is None:
+            skip = self._find_log_position(after, branch) if after else None
+            result = self._run_git_command(
+                self._build_log_args(limit, branch, skip), check=False
+            )
+            commits = self._parse_log_output(result)
 
-        if limit:
-            args.append(f"-{limit}")
+        if with_stats:
+            return self._with_commit_stats(commits)
+        return commits
 
-        if branch:
-            args.append(branch)
+    @read_locked
+    async def get_log_async(
+        self,
+        limit: Optional[int] = None,
+        branch: Optional[str] = None,
+        after: Optional[str] = None,
+        with_stats: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """get_log的异步版本"""
+        self._verify_repository()
 
-        result = self._run_git_command(args, check=False)
+        commits = await asyncio.to_thread(self._get_log_cached, limit, branch, after)
+        if commits is None:
+            skip = None
+            if after:
+                skip = await asyncio.to_thread(self._find_log_position, after, branch)
+            result = await self._run_git_command_async(
+                self._build_log_args(limit, branch, skip), check=False
+            )
+            commits = self._parse_log_output(result)
 
-        # 如果没有提交历史，返回空列表
-        if result.returncode != 0 or not result.stdout.strip():
-            return []
+        if with_stats:
+            return await asyncio.to_thread(self._with_commit_stats, commits)
+        return commits
 
-        # 解析输出
-        # 使用 NULL 字符分隔每条记录
-        commits = []
-        records = result.stdout.strip().split("\x00")
+    def _with_commit_stats(self, commits: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        为提交列表附带变更统计
 
-        for record in records:
-            if not record.strip():
-                continue
+        缓存中的提交字典由多个请求共享，这里返回新的字典，不修改原字典。
+        合并提交没有单一的变更（git log --numstat不输出），stats为None，
+        以便和没有变更的空提交区分
 
-            # 使用 Unit Separator 分隔字段
-            parts = record.split("\x1F")
-            if len(parts) < 5:
+        Args:
+            commits: 提交历史列表
+
+        Returns:
+            每个元素增加stats字段（{files, insertions, deletions}或None）的新列表
+        """
+        found, missing = commit_stats_cache.get_many(
+            c["id"] for c in commits if len(c["parents"]) <= 1
+        )
+        if missing:
+            computed = self._compute_commit_stats(missing)
+            commit_stats_cache.put_many(computed)
+            found.update(computed)
+        return [{**c, "stats": found.get(c["id"])} for c in commits]
+
+    def _compute_commit_stats(self, commit_ids: List[str]) -> Dict[str, Dict[str, int]]:
+        """
+        计算提交的变更统计
+
+        所有提交通过标准输入交给一次git log --numstat -z，边读边解析输出，
+        不需要逐个提交执行git show --stat。调用方不传入合并提交
+
+        Args:
+            commit_ids: 完整提交ID列表
+
+        Returns:
+            {提交ID: {"files": 文件数, "insertions": 新增行数, "deletions": 删除行数}}
+        """
+        args = [
+            "log",
+            "--no-walk=unsorted",
+            "--stdin",
+            "--numstat",
+            "-z",
+            "--format=%x01%H",
+        ]
+        timer = GitCommandTimer(args)
+        try:
+            process = subprocess.Popen(
+                ["git"] + args,
+                cwd=str(self.repo_path),
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+        except FileNotFoundError as e:
+            timer.finish()
+            raise GitError("Git未安装或不在系统PATH中") from e
+
+        stdout_bytes = 0
+
+        def read_chunks() -> Iterator[bytes]:
+            nonlocal stdout_bytes
+            while True:
+                chunk = process.stdout.read(NUMSTAT_STREAM_CHUNK_SIZE)
+                if not chunk:
+                    return
+                stdout_bytes += len(chunk)
+                yield chunk
+
+        try:
+            # git log在遍历之前读完全部--stdin输入，先写完再读不会死锁
+            try:
+                process.stdin.write("".join(f"{c}\n" for c in commit_ids).encode())
+                process.stdin.close()
+            except BrokenPipeError:
+                pass
+            stats = dict(self._iter_numstat(read_chunks()))
+        finally:
+            if process.poll() is None:
+                process.kill()
+            process.stdout.close()
+            process.wait()
+            timer.finish(process.returncode, stdout_bytes)
+
+        if process.returncode != 0:
+            raise GitError("获取提交变更统计失败")
+        return stats
+
+    @staticmethod
+    def _iter_numstat(
+        chunks: Iterable[bytes],
+    ) -> Iterator[Tuple[str, Dict[str, int]]]:
+        """
+        增量解析 git log --numstat -z --format=%x01%H 的输出
+
+        每个提交以0x01字节和OID开头，随后每个文件一条"新增<TAB>删除<TAB>路径"；
+        重命名的路径为空，后面跟着旧路径和新路径两段；二进制文件的行数为 "-"
+
+        Args:
+            chunks: 输出的字节块
+
+        Yields:
+            (提交ID, {"files", "insertions", "deletions"})
+        """
+        commit_id = None
+        stats: Dict[str, int] = {}
+        rename_paths = 0
+        pending = b""
+
+        def tokens() -> Iterator[bytes]:
+            nonlocal pending
+            for chunk in chunks:
+                pending += chunk
+                *complete, pending = pending.split(b"\0")
+                yield from complete
+            if pending:
+                yield pending
+
+        for token in tokens():
+            if rename_paths:
+                rename_paths -= 1
+                continue
+            if token.startswith(b"\x01"):
+                if commit_id is not None:
+                    yield commit_id, stats
+                commit_id = token[1:].strip().decode("ascii")
+                stats = {"files": 0, "insertions": 0, "deletions": 0}
+                continue
+            token = token.lstrip(b"\n")
+            if not token or commit_id is None:
                 continue
+            added, _, rest = token.partition(b"\t")
+            deleted, _, path = rest.partition(b"\t")
+            stats["files"] += 1
+            if added.isdigit():
+                stats["insertions"] += int(added)
+            if deleted.isdigit():
+                stats["deletions"] += int(deleted)
+            if not path:
+                rename_paths = 2
+
+        if commit_id is not None:
+            yield commit_id, stats
+
+    def _get_log_cached(
+        self,
+        limit: Optional[int],
+        branch: Optional[str],
+        after: Optional[str],
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        通过提交历史缓存获取记录
+
+        - 引用指向未变化：直接使用缓存
+        - 引用快进（旧指向是新指向的祖先）：只读取 旧..新 之间的提交并拼接到前面
+        - 其他变化（回滚到旧提交、reset等）或快进范围内有合并提交：完整重建
+        - 缓存为空且只请求部分记录时不建立缓存，由调用方直接查询
 
-            commit_id = parts[0].strip()
-            author = parts[1].strip()
-            email = parts[2].strip()
-            timestamp = parts[3].strip()
-            message = parts[4].strip()  # 完整的提交消息（包括多行）
-            parents = parts[5].split() if len(parts) > 5 and parts[5].strip() else []
+        Args:
+            limit: 限制返回的提交数量
+            branch: 指定分支，None表示当前分支
+            after: 分页游标
 
-            # 转换时间戳为可读格式
+        Returns:
+            提交历史列表；无法使用缓存时返回None
+
+        Raises:
+            ValueError: 游标提交无效或不在历史中
+        """
+        ref = branch or "HEAD"
+        try:
+            info = self.cat_file.info(ref)
+        except GitError:
+            return None
+        if info is None or info[1] != "commit":
+            return None
+        tip = info[0]
+
+        entry = log_cache.get(self.repo_path, ref)
+        commits = None
+        if entry is not None and entry.tip == tip:
+            log_cache.record("hit")
+            commits = entry.commits
+        elif entry is not None and self._is_ancestor(entry.tip, tip):
+            result = self._run_git_command(
+                self._build_log_args(None, f"{entry.tip}..{tip}"), check=False
+            )
+            if result.returncode != 0:
+                return None
+            new_commits = self._parse_log_output(result)
+            # 新增范围内有合并提交时，合入的提交按日期穿插在旧历史之间，
+            # 拼接结果与git log的顺序不同（分页游标会跳过或重复提交），需要完整重建
+            if not any(len(c["parents"]) > 1 for c in new_commits):
+                commits = new_commits + entry.commits
+                log_cache.put(self.repo_path, ref, tip, commits)
+                log_cache.record("incremental")
+
+        if commits is None:
+            if entry is None and (limit is not None or after is not None):
+                log_cache.record("miss")
+                return None
+            result = self._run_git_command(self._build_log_args(None, tip), check=False)
+            if result.returncode != 0:
+                return None
+            commits = self._parse_log_output(result)
+            log_cache.put(self.repo_path, ref, tip, commits)
+            log_cache.record("rebuild" if entry is not None else "miss")
+
+        if after:
             try:
-                dt = datetime.fromtimestamp(int(timestamp))
-                date_str = dt.strftime("%Y-%m-%d %H:%M:%S")
-            except (ValueError, OSError):
-                date_str = timestamp
+                after_info = self.cat_file.info(after)
+            except GitError:
+                after_info = None
+            after_id = after_info[0] if after_info else None
+            position = next(
+                (i for i, c in enumerate(commits) if c["id"] == after_id), None
+            )
+            if position is None:
+                raise ValueError(f"提交 {after} 不在历史记录中")
+            commits = commits[position + 1 :]
 
-            commits.append(
-                {
-                    "id": commit_id,
-                    "short_id": commit_id[:7],
-                    "message": message,
-                    "author": author,
-                    "email": email,
-                    "timestamp": timestamp,
-                    "date": date_str,
-                    "parents": parents,
-                    "is_merge": len(parents) > 1,
-                }
+        if limit:
+            return commits[:limit]
+        return list(commits)
+
+    def _is_ancestor(self, ancestor: str, descendant: str) -> bool:
+        """判断ancestor是否为descendant的祖先（快进关系）"""
+        result = self._run_git_command(
+            ["merge-base", "--is-ancestor", ancestor, descendant], check=False
+        )
+        return result.returncode == 0
+
+    async def iter_log_async(
+        self,
+        branch: Optional[str] = None,
+        after: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        流式读取提交历史
+
+        从git log的管道中增量读取并逐条解析，内存占用与历史长度无关。
+        只读取对象库和引用，不修改索引，因此不持有仓库读锁。
+
+        Args:
+            branch: 指定分支，None表示当前分支
+            after: 分页游标，从该提交之后开始
+            limit: 最多返回的提交数量
+
+        Yields:
+            提交信息字典（与get_log的元素格式相同）
+
+        Raises:
+            RepositoryNotFoundError: 不是Git仓库
+            ValueError: 游标提交无效或不在历史中
+        """
+        self._verify_repository()
+
+        skip = None
+        if after:
+            skip = await asyncio.to_thread(self._find_log_position, after, branch)
+        args = self._build_log_args(limit, branch, skip)
+
+        timer = GitCommandTimer(args)
+        try:
+            process = await asyncio.create_subprocess_exec(
+                "git",
+                *args,
+                cwd=str(self.repo_path),
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
             )
+        except NotImplementedError:
+            # 事件循环不支持子进程时一次性读取
+            timer.cancel()
+            result = await asyncio.to_thread(self._run_git_command, args, False)
+            for commit in self._parse_log_output(result):
+                yield commit
+            return
+        except FileNotFoundError as e:
+            timer.finish()
+            raise GitError("Git未安装或不在系统PATH中") from e
+
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        pending = ""
+        stdout_bytes = 0
+        eof = False
+        try:
+            while True:
+                chunk = await process.stdout.read(LOG_STREAM_CHUNK_SIZE)
+                if not chunk:
+                    eof = True
+                    break
+                stdout_bytes += len(chunk)
+                pending += decoder.decode(chunk)
+                # 最后一段可能是不完整的记录，留到下一次继续拼接
+                *records, pending = pending.split("\x00")
+                for record in records:
+                    commit = self._parse_log_record(record)
+                    if commit is not None:
+                        yield commit
+
+            pending += decoder.decode(b"", final=True)
+            commit = self._parse_log_record(pending)
+            if commit is not None:
+                yield commit
+        finally:
+            # 客户端断开或提前结束时终止git进程；
+            # 读到EOF时进程已经自行退出，此时kill()内部的poll()会抢先回收子进程，
+            # 导致asyncio拿不到真实退出码（报告为255）
+            if not eof and process.returncode is None:
+                try:
+                    process.kill()
+                except ProcessLookupError:
+                    pass
+            await process.wait()
+            timer.finish(process.returncode, stdout_bytes)
+
+    def _find_log_position(self, after: str, branch: Optional[str]) -> int:
+        """
+        计算分页游标在历史中的位置
+
+        通过流式读取git rev-list（每行只有一个提交ID）定位游标，
+        找到后立即终止进程，不需要解析游标之前的提交
+
+        Args:
+            after: 游标提交ID（完整或短ID）
+            branch: 指定分支，None表示当前分支
+
+        Returns:
+            需要跳过的提交数量（包含游标本身）
+
+        Raises:
+            ValueError: 游标提交无效或不在历史中
+        """
+        try:
+            info = self.cat_file.info(after)
+        except GitError:
+            info = None
+        if info is None or info[1] != "commit":
+            raise ValueError(f"无效的提交ID: {after}")
+        commit_id = info[0]
+
+        args = ["rev-list", branch or "HEAD"]
+        timer = GitCommandTimer(args)
+        try:
+            process = subprocess.Popen(
+                ["git"] + args,
+                cwd=str(self.repo_path),
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+            )
+        except FileNotFoundError as e:
+            timer.finish()
+            raise GitError("Git未安装或不在系统PATH中") from e
+
+        stdout_bytes = 0
+        try:
+            for position, line in enumerate(process.stdout, start=1):
+                stdout_bytes += len(line)
+                if line.strip() == commit_id:
+                    return position
+        finally:
+            if process.poll() is None:
+                process.kill()
+            process.stdout.close()
+            process.wait()
+            timer.finish(process.returncode, stdout_bytes)
+
+        raise ValueError(f"提交 {after} 不在历史记录中")
+
+    @read_locked
+    def count_commits(self, branch: Optional[str] = None) -> int:
+        """
+        统计提交总数
+
+        提交历史缓存与引用当前指向一致时直接使用缓存，否则执行git rev-list --count
+
+        Args:
+            branch: 指定分支，None表示当前分支
+
+        Returns:
+            提交数量，没有提交时返回0
+        """
+        self._verify_repository()
+
+        cached = self._count_commits_cached(branch)
+        if cached is not None:
+            return cached
+
+        result = self._run_git_command(
+            ["rev-list", "--count", branch or "HEAD"], check=False
+        )
+
+        return self._parse_commit_count(result)
+
+    @read_locked
+    async def count_commits_async(self, branch: Optional[str] = None) -> int:
+        """count_commits的异步版本"""
+        self._verify_repository()
+
+        cached = await asyncio.to_thread(self._count_commits_cached, branch)
+        if cached is not None:
+            return cached
+
+        result = await self._run_git_command_async(
+            ["rev-list", "--count", branch or "HEAD"], check=False
+        )
+
+        return self._parse_commit_count(result)
+
+    def _count_commits_cached(self, branch: Optional[str]) -> Optional[int]:
+        """
+        通过提交历史缓存统计提交数
+
+        引用当前指向与缓存条目一致时，缓存中就是完整历史，不需要执行git rev-list
+
+        Returns:
+            提交数量；缓存不可用时返回None
+        """
+        ref = branch or "HEAD"
+        entry = log_cache.get(self.repo_path, ref)
+        if entry is None:
+            return None
+        try:
+            info = self.cat_file.info(ref)
+        except GitError:
+            return None
+        if info is None or info[0] != entry.tip:
+            return None
+        return len(entry.commits)
+
+    @staticmethod
+    def _parse_commit_count(result: subprocess.CompletedProcess) -> int:
+        """解析git rev-list --count输出"""
+        if result.returncode != 0:
+            return 0
+        try:
+            return int(result.stdout.strip())
+        except ValueError:
+            return 0
+
+    @staticmethod
+    def _build_log_args(
+        limit: Optional[int], branch: Optional[str], skip: Optional[int] = None
+    ) -> List[str]:
+        """构建git log命令参数"""
+        # %H: commit hash, %an: author name, %ae: author email, %at: author timestamp
+        # %B: raw body (完整提交消息，包括标题和详细说明), %P: parent hashes
+        # 使用 %x00 (NULL字符) 作为记录分隔符，%x1F (Unit Separator) 作为字段分隔符
+        args = ["log", "--pretty=format:%H%x1F%an%x1F%ae%x1F%at%x1F%B%x1F%P%x00"]
+
+        if skip:
+            args.append(f"--skip={skip}")
+
+        if limit:
+            args.append(f"-{limit}")
+
+        if branch:
+            args.append(branch)
+
+        return args
+
+    @classmethod
+    @traced("parse-log")
+    def _parse_log_output(
+        cls,
+        result: subprocess.CompletedProcess,
+    ) -> List[Dict[str, Any]]:
+        """
+        解析git log输出
+
+        Args:
+            result: git log命令结果
+
+        Returns:
+            提交历史列表
+        """
+        # 如果没有提交历史，返回空列表
+        if result.returncode != 0 or not result.stdout.strip():
+            return []
+
+        # 解析输出
+        # 使用 NULL 字符分隔每条记录
+        commits = []
+        for record in result.stdout.strip().split("\x00"):
+            commit = cls._parse_log_record(record)
+            if commit is not None:
+                commits.append(commit)
 
         return commits
 
+    @staticmethod
+    def _parse_log_record(record: str) -> Optional[Dict[str, Any]]:
+        """
+        解析单条git log记录
+
+        Args:
+            record: 以Unit Separator分隔字段的记录
+
+        Returns:
+            提交信息字典，记录无效时返回None
+        """
+        if not record.strip():
+            return None
+
+        # 使用 Unit Separator 分隔字段
+        parts = record.split("\x1F")
+        if len(parts) < 5:
+            return None
+
+        commit_id = parts[0].strip()
+        author = parts[1].strip()
+        email = parts[2].strip()
+        timestamp = parts[3].strip()
+        message = parts[4].strip()  # 完整的提交消息（包括多行）
+        parents = parts[5].split() if len(parts) > 5 and parts[5].strip() else []
+
+        # 转换时间戳为可读格式
+        try:
+            dt = datetime.fromtimestamp(int(timestamp))
+            date_str = dt.strftime("%Y-%m-%d %H:%M:%S")
+        except (ValueError, OSError):
+            date_str = timestamp
+
+        return {
+            "id": commit_id,
+            "short_id": commit_id[:7],
+            "message": message,
+            "author": author,
+            "email": email,
+            "timestamp": timestamp,
+            "date": date_str,
+            "parents": parents,
+            "is_merge": len(parents) > 1,
+        }
+
+    @write_locked
     def checkout_commit(self, commit_id: str) -> Dict[str, Any]:
         """
         回滚到指定提交
@@ -948,7 +2240,7 @@ class GitWrapper:
             raise ValueError(f"无效的提交ID: {commit_id}")
 
         # 检查是否有未提交的变更
-        status = self.get_status()
+        status = self._read_status_uncached()
         if not status["is_clean"]:
             return {
                 "success": False,
@@ -968,6 +2260,10 @@ class GitWrapper:
         except GitError as e:
             return {"success": False, "message": f"回滚失败: {str(e)}", "error": str(e)}
 
+    async def checkout_commit_async(self, commit_id: str) -> Dict[str, Any]:
+        """checkout_commit的异步版本（多步写操作，在线程池中执行）"""
+        return await asyncio.to_thread(self.checkout_commit, commit_id)
+
     def _is_valid_commit(self, commit_id: str) -> bool:
         """
         验证提交ID是否有效
@@ -978,12 +2274,20 @@ class GitWrapper:
         Returns:
             True如果有效，否则False
         """
+        try:
+            info = self.cat_file.info(commit_id)
+            return info is not None and info[1] == "commit"
+        except GitError:
+            pass
+
+        # 常驻进程不可用时回退为单次命令
         try:
             result = self._run_git_command(["cat-file", "-t", commit_id], check=False)
             return result.returncode == 0 and result.stdout.strip() == "commit"
         except Exception:
             return False
 
+    @read_locked
     def get_branches(self) -> Dict[str, Any]:
         """
         获取所有分支列表
@@ -999,10 +2303,33 @@ class GitWrapper:
 
         result = self._run_git_command(["branch", "-a"])
 
+        return self._parse_branches_output(result.stdout)
+
+    @read_locked
+    async def get_branches_async(self) -> Dict[str, Any]:
+        """get_branches的异步版本"""
+        self._verify_repository()
+
+        result = await self._run_git_command_async(["branch", "-a"])
+
+        return self._parse_branches_output(result.stdout)
+
+    @staticmethod
+    @traced("parse-branches")
+    def _parse_branches_output(output: str) -> Dict[str, Any]:
+        """
+        解析git branch -a输出
+
+        Args:
+            output: git branch输出
+
+        Returns:
+            包含分支列表和当前分支的字典
+        """
         branches = []
         current_branch = None
 
-        for line in result.stdout.strip().split("\n"):
+        for line in output.strip().split("\n"):
             if not line:
                 continue
 
@@ -1021,6 +2348,7 @@ class GitWrapper:
 
         return {"branches": branches, "current": current_branch}
 
+    @write_locked
     def create_branch(self, branch_name: str) -> Dict[str, Any]:
         """
         创建新分支
@@ -1061,6 +2389,11 @@ class GitWrapper:
             "branch": branch_name,
         }
 
+    async def create_branch_async(self, branch_name: str) -> Dict[str, Any]:
+        """create_branch的异步版本（在线程池中执行）"""
+        return await asyncio.to_thread(self.create_branch, branch_name)
+
+    @write_locked
     def switch_branch(self, branch_name: str) -> Dict[str, Any]:
         """
         切换到指定分支
@@ -1083,7 +2416,7 @@ class GitWrapper:
         branch_name = branch_name.strip()
 
         # 检查是否有未提交的变更
-        status = self.get_status()
+        status = self._read_status_uncached()
         if not status["is_clean"]:
             return {
                 "success": False,
@@ -1107,6 +2440,11 @@ class GitWrapper:
                 "error": str(e),
             }
 
+    async def switch_branch_async(self, branch_name: str) -> Dict[str, Any]:
+        """switch_branch的异步版本（多步写操作，在线程池中执行）"""
+        return await asyncio.to_thread(self.switch_branch, branch_name)
+
+    @write_locked
     def merge_branch(
         self, source_branch: str, target_branch: Optional[str] = None
     ) -> Dict[str, Any]:
@@ -1132,6 +2470,16 @@ class GitWrapper:
 
         source_branch = source_branch.strip()
 
+        # 先在对象库中预演合并，有冲突时直接返回，不切换分支、不改动工作区
+        # （分支不存在等错误仍由下面的切换和合并报告）
+        if get_git_version() >= MERGE_TREE_MIN_VERSION:
+            try:
+                preview = self.preview_merge(source_branch, target_branch)
+            except (ValueError, GitError):
+                preview = None
+            if preview is not None and preview["conflicts"]:
+                raise MergeConflictError(preview["conflicts"])
+
         # 如果指定了目标分支，先切换到目标分支
         if target_branch:
             switch_result = self.switch_branch(target_branch)
@@ -1169,6 +2517,319 @@ class GitWrapper:
             "target": current_branch,
         }
 
+    async def merge_branch_async(
+        self, source_branch: str, target_branch: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """merge_branch的异步版本（多步写操作，在线程池中执行）"""
+        return await asyncio.to_thread(self.merge_branch, source_branch, target_branch)
+
+    @read_locked
+    def preview_merge(
+        self, source_branch: str, target_branch: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        预演合并（git merge-tree --write-tree）
+
+        合并结果只写入对象库，不切换分支，不修改工作区和索引
+
+        Args:
+            source_branch: 源分支（要合并的分支）
+            target_branch: 目标分支（合并到的分支），None表示当前分支
+
+        Returns:
+            {
+                "source", "target": 分支名称,
+                "source_commit", "target_commit": 两个分支指向的提交,
+                "clean": 是否可以无冲突合并,
+                "up_to_date": 源分支已经包含在目标分支中（无需合并）,
+                "fast_forward": 目标分支是源分支的祖先（可以快进）,
+                "tree": 合并结果的树对象（有冲突时包含冲突标记）,
+                "conflicts": 冲突文件路径列表,
+                "messages": [{"paths", "type", "message"}] 冲突说明
+            }
+
+        Raises:
+            RepositoryNotFoundError: 不是Git仓库
+            ValueError: 分支名称为空或分支不存在
+            GitError: Git版本过低或合并预演失败
+        """
+        self._verify_repository()
+
+        if not source_branch or not source_branch.strip():
+            raise ValueError("源分支名称不能为空")
+        if get_git_version() < MERGE_TREE_MIN_VERSION:
+            version = ".".join(map(str, MERGE_TREE_MIN_VERSION))
+            raise GitError(f"合并预演需要Git {version}或更高版本")
+
+        source = source_branch.strip()
+        target = target_branch.strip() if target_branch else None
+        source_commit, target_commit = self._resolve_commits([source, target or "HEAD"])
+
+        merge_base = self._run_git_command(
+            ["merge-base", target_commit, source_commit], check=False
+        ).stdout.strip()
+
+        tree, stages, messages = self._merge_tree(target_commit, source_commit)
+        conflicts = list(dict.fromkeys(path for _, _, _, path in stages))
+        up_to_date = merge_base == source_commit
+
+        return {
+            "source": source,
+            "target": target or self.get_current_branch(),
+            "source_commit": source_commit,
+            "target_commit": target_commit,
+            "clean": not conflicts,
+            "up_to_date": up_to_date,
+            "fast_forward": merge_base == target_commit and not up_to_date,
+            "tree": tree,
+            "conflicts": conflicts,
+            # 只保留冲突说明（去掉Auto-merging等提示）
+            "messages": [m for m in messages if m["type"].startswith("CONFLICT")],
+        }
+
+    async def preview_merge_async(
+        self, source_branch: str, target_branch: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """preview_merge的异步版本（多个git命令，在线程池中执行）"""
+        return await asyncio.to_thread(self.preview_merge, source_branch, target_branch)
+
+    def _resolve_commits(self, revisions: List[str]) -> List[str]:
+        """
+        把分支名称或提交ID解析为提交ID
+
+        Raises:
+            ValueError: 名称无效或不存在
+        """
+        for revision in revisions:
+            if revision.startswith("-"):
+                raise ValueError(f"无效的分支名称: {revision}")
+        specs = [f"{revision}^{{commit}}" for revision in revisions]
+        # 末尾的--避免名称被当作路径，输出中会原样带上--
+        result = self._run_git_command(["rev-parse", *specs, "--"], check=False)
+        resolved = [line for line in result.stdout.split() if line != "--"]
+        if result.returncode != 0:
+            # 在第一个无法解析的名称处停止
+            missing = revisions[min(len(resolved), len(revisions) - 1)]
+            raise ValueError(f"分支或提交不存在: {missing}")
+        return resolved
+
+    def _merge_tree(
+        self, ours: str, theirs: str
+    ) -> Tuple[str, List[Tuple[str, str, int, str]], List[Dict[str, Any]]]:
+        """
+        执行 git merge-tree --write-tree -z 并解析输出
+
+        Args:
+            ours: 目标提交
+            theirs: 源提交
+
+        Returns:
+            (结果树对象, 冲突文件的各阶段 [(mode, oid, stage, path)], 冲突说明)
+
+        Raises:
+            GitError: 合并预演失败（如两个分支没有共同历史）
+        """
+        result = self._run_git_command(
+            ["merge-tree", "--write-tree", "-z", ours, theirs], check=False
+        )
+        # 退出码0表示无冲突，1表示有冲突，其他为错误
+        if result.returncode not in (0, 1):
+            error_msg = result.stderr.strip() if result.stderr else "未知错误"
+            raise GitError(f"合并预演失败: {error_msg}")
+        return self._parse_merge_tree_output(result.stdout)
+
+    @staticmethod
+    def _parse_merge_tree_output(
+        output: str,
+    ) -> Tuple[str, List[Tuple[str, str, int, str]], List[Dict[str, Any]]]:
+        """
+        解析 merge-tree --write-tree -z 输出
+
+        格式: <tree> NUL，之后有冲突时依次为
+        - 冲突文件: <mode> SP <oid> SP <stage> TAB <path> NUL（每阶段一项），空项结束
+        - 说明: <路径数> NUL <路径>... NUL <类型> NUL <说明> NUL
+        """
+        fields = output.split("\0")
+        tree = fields[0].strip()
+        stages: List[Tuple[str, str, int, str]] = []
+        messages: List[Dict[str, Any]] = []
+
+        index = 1
+        while index < len(fields) and fields[index]:
+            stages.append(GitWrapper._parse_stage_entry(fields[index]))
+            index += 1
+
+        index += 1
+        while index < len(fields) and fields[index].isdigit():
+            count = int(fields[index])
+            paths = fields[index + 1 : index + 1 + count]
+            index += 1 + count
+            if index + 1 >= len(fields):
+                break
+            messages.append(
+                {
+                    "paths": paths,
+                    "type": fields[index],
+                    "message": fields[index + 1].strip(),
+                }
+            )
+            index += 2
+
+        return tree, stages, messages
+
+    @staticmethod
+    def _parse_stage_entry(record: str) -> Tuple[str, str, int, str]:
+        """解析 <mode> SP <oid> SP <stage> TAB <path>（ls-files -u与merge-tree相同）"""
+        info, path = record.split("\t", 1)
+        mode, oid, stage = info.split(" ")
+        return mode, oid, int(stage), path
+
+    @read_locked
+    def get_conflict_details(
+        self,
+        source_branch: Optional[str] = None,
+        target_branch: Optional[str] = None,
+        max_bytes: int = CONFLICT_FILE_MAX_BYTES,
+    ) -> Dict[str, Any]:
+        """
+        获取所有冲突文件的base/ours/theirs三个版本
+
+        指定source_branch时由merge-tree预演合并得到冲突（不修改工作区），
+        否则读取索引中未解决的冲突（合并进行中）。
+        所有版本的内容通过同一个cat-file常驻进程批量读取：先批量查询大小，
+        再只读取不超过上限的内容，不会为每个文件启动进程
+
+        Args:
+            source_branch: 源分支，None表示读取索引中的冲突
+            target_branch: 目标分支，None表示当前分支
+            max_bytes: 单个版本内容的大小上限，超过时不返回内容
+
+        Returns:
+            {
+                "origin": "merge-tree" 或 "index",
+                "files": [{"path", "stages": {"base", "ours", "theirs"}}],
+                "max_bytes": 单个版本的大小上限,
+                "omitted": 因超过大小上限未返回内容的版本数
+            }
+            每个版本为 {"oid", "mode", "size", "binary", "truncated", "content"}，
+            该文件没有这个版本（如一方新增、一方删除）时为None；
+            未读取内容时content为None，binary为None表示未知
+
+        Raises:
+            RepositoryNotFoundError: 不是Git仓库
+            ValueError: 分支不存在或max_bytes为负数
+            GitError: Git命令执行失败
+        """
+        self._verify_repository()
+
+        if max_bytes < 0:
+            raise ValueError("max_bytes不能为负数")
+
+        if source_branch and source_branch.strip():
+            if get_git_version() < MERGE_TREE_MIN_VERSION:
+                version = ".".join(map(str, MERGE_TREE_MIN_VERSION))
+                raise GitError(f"合并预演需要Git {version}或更高版本")
+            source_commit, target_commit = self._resolve_commits(
+                [
+                    source_branch.strip(),
+                    target_branch.strip() if target_branch else "HEAD",
+                ]
+            )
+            _, stages, _ = self._merge_tree(target_commit, source_commit)
+            origin = "merge-tree"
+        else:
+            result = self._run_git_command(["ls-files", "-u", "-z"])
+            stages = [
+                self._parse_stage_entry(record)
+                for record in result.stdout.split("\0")
+                if record
+            ]
+            origin = "index"
+
+        blobs, omitted = self._read_stage_blobs(stages, max_bytes)
+
+        files: Dict[str, Dict[str, Any]] = {}
+        for mode, oid, stage, path in stages:
+            entry = files.setdefault(
+                path,
+                {"path": path, "stages": dict.fromkeys(CONFLICT_STAGE_NAMES.values())},
+            )
+            entry["stages"][CONFLICT_STAGE_NAMES[stage]] = {
+                "oid": oid,
+                "mode": mode,
+                **blobs.get(oid, self._unread_blob(None)),
+            }
+
+        return {
+            "origin": origin,
+            "files": list(files.values()),
+            "max_bytes": max_bytes,
+            "omitted": omitted,
+        }
+
+    async def get_conflict_details_async(
+        self,
+        source_branch: Optional[str] = None,
+        target_branch: Optional[str] = None,
+        max_bytes: int = CONFLICT_FILE_MAX_BYTES,
+    ) -> Dict[str, Any]:
+        """get_conflict_details的异步版本（多个git命令和cat-file往返，在线程池中执行）"""
+        return await asyncio.to_thread(
+            self.get_conflict_details, source_branch, target_branch, max_bytes
+        )
+
+    @staticmethod
+    def _unread_blob(size: Optional[int]) -> Dict[str, Any]:
+        """未读取内容的版本（超过大小上限、子模块或对象不存在）"""
+        return {"size": size, "binary": None, "truncated": True, "content": None}
+
+    def _read_stage_blobs(
+        self, stages: List[Tuple[str, str, int, str]], max_bytes: int
+    ) -> Tuple[Dict[str, Dict[str, Any]], int]:
+        """
+        批量读取冲突各版本的内容
+
+        Returns:
+            ({oid: {"size", "binary", "truncated", "content"}}, 未返回内容的版本数)
+        """
+        oids = list(
+            dict.fromkeys(oid for mode, oid, _, _ in stages if mode != GITLINK_MODE)
+        )
+        if not oids:
+            return {}, 0
+
+        # 第一轮只查询大小，决定读取哪些内容
+        blobs: Dict[str, Dict[str, Any]] = {}
+        wanted: List[str] = []
+        budget = CONFLICT_TOTAL_MAX_BYTES
+        for oid, info in zip(oids, self.cat_file.info_batch(oids), strict=True):
+            size = info[2] if info is not None else None
+            if size is None or size > max_bytes or size > budget:
+                blobs[oid] = self._unread_blob(size)
+                continue
+            budget -= size
+            wanted.append(oid)
+
+        for oid, obj in zip(wanted, self.cat_file.contents_batch(wanted), strict=True):
+            if obj is None:
+                blobs[oid] = self._unread_blob(None)
+                continue
+            content = obj[2]
+            binary = b"\0" in content[:BINARY_SNIFF_BYTES]
+            blobs[oid] = {
+                "size": len(content),
+                "binary": binary,
+                "truncated": False,
+                "content": None if binary else content.decode("utf-8", "replace"),
+            }
+
+        omitted = sum(
+            1
+            for mode, oid, _, _ in stages
+            if mode == GITLINK_MODE or blobs[oid]["truncated"]
+        )
+        return blobs, omitted
+
     def _is_valid_branch_name(self, branch_name: str) -> bool:
         """
         验证分支名称是否有效
@@ -0,0 +1,136 @@
+"""
+提交历史缓存
+按（仓库, 引用）缓存解析后的提交列表和对应的引用指向（tip），
+引用前进时只需读取新增的提交
+"""
+
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+# 所有条目合计最多缓存的提交数量
+DEFAULT_MAX_CACHED_COMMITS = 100_000
+
+
+class LogCacheEntry(NamedTuple):
+    """缓存条目：引用指向的提交ID和从该提交开始的完整历史"""
+
+    tip: str
+    commits: List[Dict[str, Any]]
+
+
+class LogCache:
+    """
+    提交历史缓存（LRU，按提交总数限制内存）
+
+    缓存中的提交字典由多个请求共享，调用方不能修改
+    """
+
+    def __init__(self, max_commits: int = DEFAULT_MAX_CACHED_COMMITS):
+        """
+        初始化缓存
+
+        Args:
+            max_commits: 所有条目合计最多缓存的提交数量
+        """
+        self.max_commits = max_commits
+        self._entries: "OrderedDict[Tuple[Path, str], LogCacheEntry]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.incremental_updates = 0
+        self.rebuilds = 0
+
+    def get(self, repo_path: Path, ref: str) -> Optional[LogCacheEntry]:
+        """
+        获取缓存条目（不计入命中统计）
+
+        Args:
+            repo_path: 仓库路径
+            ref: 引用名称（分支名或HEAD）
+
+        Returns:
+            缓存条目，不存在时返回None
+        """
+        key = (repo_path, ref)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, repo_path: Path, ref: str, tip: str, commits: List[Dict[str, Any]]):
+        """
+        写入缓存条目，超出容量时淘汰最久未使用的条目
+
+        Args:
+            repo_path: 仓库路径
+            ref: 引用名称
+            tip: 引用指向的提交ID
+            commits: 从tip开始的完整提交历史
+        """
+        key = (repo_path, ref)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old.commits)
+
+            # 单个条目超过容量时不缓存
+            if len(commits) > self.max_commits:
+                return
+
+            self._entries[key] = LogCacheEntry(tip, commits)
+            self._size += len(commits)
+            while self._size > self.max_commits:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted.commits)
+
+    def invalidate(self, repo_path: Optional[Path] = None):
+        """
+        清除缓存
+
+        Args:
+            repo_path: 只清除该仓库的条目，None表示全部清除
+        """
+        with self._lock:
+            for key in list(self._entries):
+                if repo_path is None or key[0] == repo_path:
+                    self._size -= len(self._entries.pop(key).commits)
+
+    def record(self, outcome: str):
+        """
+        记录一次查询结果
+
+        Args:
+            outcome: "hit"、"miss"、"incremental" 或 "rebuild"
+        """
+        with self._lock:
+            if outcome == "hit":
+                self.hits += 1
+            elif outcome == "incremental":
+                self.incremental_updates += 1
+            elif outcome == "rebuild":
+                self.rebuilds += 1
+            else:
+                self.misses += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """获取缓存统计信息"""
+        with self._lock:
+            lookups = self.hits + self.misses + self.incremental_updates + self.rebuilds
+            return {
+                "entries": len(self._entries),
+                "cached_commits": self._size,
+                "max_commits": self.max_commits,
+                "hits": self.hits,
+                "misses": self.misses,
+                "incremental_updates": self.incremental_updates,
+                "rebuilds": self.rebuilds,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+# 进程级共享的提交历史缓存
+log_cache = LogCache()
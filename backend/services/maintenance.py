@@ -0,0 +1,324 @@
+"""
+仓库后台维护服务
+统计各仓库的松散对象和pack数量，在仓库空闲时执行commit-graph写入、增量repack和prune
+"""
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from services.cat_file import get_git_version
+from services.errors import GitError
+from services.git_wrapper import GitWrapper
+from services.repo_metadata import common_git_dir
+from services.repo_registry import git_wrappers
+
+# 支持的维护任务（按执行顺序）
+MAINTENANCE_TASKS = ("commit-graph", "repack", "prune")
+
+# 松散对象达到该数量时打包并清理
+LOOSE_OBJECTS_THRESHOLD = 100
+
+# pack文件达到该数量时合并
+PACK_COUNT_THRESHOLD = 10
+
+# prune只删除早于该时间的不可达对象，不影响正在写入的对象
+PRUNE_EXPIRE = "2.weeks.ago"
+
+# repack --geometric 需要的最低Git版本
+GEOMETRIC_REPACK_MIN_VERSION = (2, 32)
+
+# 仓库最近一次访问后至少空闲多少秒才执行后台维护
+DEFAULT_IDLE_SECONDS = 30.0
+
+# 后台检查间隔（秒），可通过环境变量 CHRONOS_MAINTENANCE_INTERVAL 调整，0表示关闭
+DEFAULT_CHECK_INTERVAL = 300.0
+
+
+def _mtime(path: Path) -> Optional[float]:
+    """文件修改时间，不存在时返回None"""
+    try:
+        return path.stat().st_mtime
+    except OSError:
+        return None
+
+
+def collect_stats(wrapper: GitWrapper) -> Dict[str, Any]:
+    """
+    收集仓库对象存储统计
+
+    Args:
+        wrapper: 仓库对应的GitWrapper
+
+    Returns:
+        统计信息字典：
+        - loose_objects: 松散对象数量
+        - loose_size_kib: 松散对象占用空间
+        - packed_objects: pack中的对象数量
+        - packs: pack文件数量
+        - pack_size_kib: pack占用空间
+        - garbage: 无效文件数量
+        - commit_graph: 是否存在commit-graph
+        - commit_graph_stale: 提交历史是否在commit-graph写入后发生过变化
+
+    Raises:
+        RepositoryNotFoundError: 不是Git仓库
+        GitError: git count-objects执行失败
+    """
+    wrapper._verify_repository()
+    result = wrapper._run_git_command(["count-objects", "-v"])
+
+    values = {}
+    for line in result.stdout.splitlines():
+        key, _, value = line.partition(":")
+        value = value.strip()
+        if value.isdigit():
+            values[key.strip()] = int(value)
+
+    git_dir = wrapper.metadata.git_dir
+    info_dir = common_git_dir(git_dir) / "objects" / "info"
+    graph_mtime = _mtime(info_dir / "commit-graph")
+    if graph_mtime is None:
+        graph_mtime = _mtime(info_dir / "commit-graphs" / "commit-graph-chain")
+
+    # 每次提交、切换、合并都会追加HEAD的reflog
+    reflog_mtime = _mtime(git_dir / "logs" / "HEAD")
+    stale = graph_mtime is None or (
+        reflog_mtime is not None and reflog_mtime > graph_mtime
+    )
+
+    return {
+        "loose_objects": values.get("count", 0),
+        "loose_size_kib": values.get("size", 0),
+        "packed_objects": values.get("in-pack", 0),
+        "packs": values.get("packs", 0),
+        "pack_size_kib": values.get("size-pack", 0),
+        "garbage": values.get("garbage", 0),
+        "commit_graph": graph_mtime is not None,
+        # 空仓库没有提交，不需要commit-graph
+        "commit_graph_stale": stale and reflog_mtime is not None,
+    }
+
+
+def plan_tasks(stats: Dict[str, Any]) -> List[str]:
+    """
+    根据统计信息决定需要执行的维护任务
+
+    Args:
+        stats: collect_stats的返回值
+
+    Returns:
+        任务名称列表（按执行顺序）
+    """
+    tasks = []
+    if stats["commit_graph_stale"]:
+        tasks.append("commit-graph")
+    if (
+        stats["loose_objects"] >= LOOSE_OBJECTS_THRESHOLD
+        or stats["packs"] >= PACK_COUNT_THRESHOLD
+    ):
+        tasks.append("repack")
+    if stats["loose_objects"] >= LOOSE_OBJECTS_THRESHOLD or stats["garbage"]:
+        tasks.append("prune")
+    return tasks
+
+
+def _task_command(task: str) -> List[str]:
+    """维护任务对应的git命令"""
+    if task == "commit-graph":
+        return ["commit-graph", "write", "--reachable", "--split", "--no-progress"]
+    if task == "repack":
+        # 只把松散对象和小pack合并为新pack，不重写整个对象库
+        args = ["repack", "-d", "-l", "-q"]
+        if get_git_version() >= GEOMETRIC_REPACK_MIN_VERSION:
+            args.append("--geometric=2")
+        return args
+    if task == "prune":
+        return ["prune", f"--expire={PRUNE_EXPIRE}"]
+    raise ValueError(f"未知的维护任务: {task}")
+
+
+class MaintenanceScheduler:
+    """
+    仓库维护调度器
+
+    - 后台线程定期检查注册表中已打开的仓库，空闲且达到阈值时执行维护
+    - 每个任务执行期间持有仓库读锁：读操作照常进行，写操作（提交、切换等）等待
+    - 后台维护以非阻塞方式获取锁，有写操作进行或等待时立即让出，剩余任务留到下次
+    - 同一仓库同时只执行一轮维护
+    """
+
+    def __init__(
+        self,
+        idle_seconds: float = DEFAULT_IDLE_SECONDS,
+        interval: Optional[float] = None,
+    ):
+        """
+        初始化调度器
+
+        Args:
+            idle_seconds: 仓库空闲多少秒后才执行后台维护
+            interval: 后台检查间隔（秒），None表示读取环境变量或使用默认值
+        """
+        if interval is None:
+            interval = float(
+                os.environ.get("CHRONOS_MAINTENANCE_INTERVAL", DEFAULT_CHECK_INTERVAL)
+            )
+        self.idle_seconds = idle_seconds
+        self.interval = interval
+        self._running: set = set()
+        self._last_runs: Dict[Path, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def is_running(self, repo_path: Path) -> bool:
+        """仓库是否正在执行维护"""
+        with self._lock:
+            return repo_path in self._running
+
+    def last_run(self, repo_path: Path) -> Optional[Dict[str, Any]]:
+        """仓库最近一轮维护的结果"""
+        with self._lock:
+            return self._last_runs.get(repo_path)
+
+    def get_status(self, wrapper: GitWrapper) -> Dict[str, Any]:
+        """
+        获取仓库维护状态
+
+        Args:
+            wrapper: 仓库对应的GitWrapper
+
+        Returns:
+            状态字典：stats、planned_tasks、running、idle_seconds、last_run
+        """
+        stats = collect_stats(wrapper)
+        return {
+            "stats": stats,
+            "planned_tasks": plan_tasks(stats),
+            "running": self.is_running(wrapper.repo_path),
+            "idle_seconds": round(wrapper.lock.idle_seconds, 1),
+            "last_run": self.last_run(wrapper.repo_path),
+        }
+
+    def run(
+        self,
+        wrapper: GitWrapper,
+        tasks: Optional[List[str]] = None,
+        trigger: str = "manual",
+        wait: bool = True,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        执行一轮维护
+
+        Args:
+            wrapper: 仓库对应的GitWrapper
+            tasks: 要执行的任务，None表示全部任务
+            trigger: 触发方式（manual/scheduled），记录在结果中
+            wait: 是否等待正在进行的写操作；为False时遇到写操作立即让出
+
+        Returns:
+            本轮维护结果；该仓库已有维护在执行时返回None
+
+        Raises:
+            ValueError: 任务名称无效
+        """
+        if tasks is None:
+            tasks = list(MAINTENANCE_TASKS)
+        unknown = [task for task in tasks if task not in MAINTENANCE_TASKS]
+        if unknown:
+            raise ValueError(f"未知的维护任务: {', '.join(unknown)}")
+        # 按固定顺序执行：先写commit-graph，再打包，最后清理
+        tasks = [task for task in MAINTENANCE_TASKS if task in tasks]
+
+        repo_path = wrapper.repo_path
+        with self._lock:
+            if repo_path in self._running:
+                return None
+            self._running.add(repo_path)
+
+        started = time.time()
+        start = time.perf_counter()
+        results = []
+        try:
+            for task in tasks:
+                # 每个任务单独获取读锁，任务之间让写操作有机会执行
+                if not wrapper.lock.acquire_read(blocking=wait):
+                    results.append({"task": task, "success": False, "skipped": True})
+                    continue
+                task_start = time.perf_counter()
+                try:
+                    wrapper._run_git_command(_task_command(task))
+                    entry = {"task": task, "success": True}
+                except GitError as e:
+                    entry = {"task": task, "success": False, "error": str(e)}
+                finally:
+                    wrapper.lock.release_read()
+                entry["duration_ms"] = round(
+                    (time.perf_counter() - task_start) * 1000, 1
+                )
+                results.append(entry)
+        finally:
+            summary = {
+                "trigger": trigger,
+                "started_at": started,
+                "duration_ms": round((time.perf_counter() - start) * 1000, 1),
+                "tasks": results,
+            }
+            with self._lock:
+                self._running.discard(repo_path)
+                self._last_runs[repo_path] = summary
+        return summary
+
+    def run_pending(self) -> int:
+        """
+        检查所有已打开的仓库，对空闲且需要维护的仓库执行维护
+
+        Returns:
+            执行了维护的仓库数量
+        """
+        count = 0
+        for wrapper in git_wrappers.wrappers():
+            if self._stop.is_set():
+                break
+            if wrapper.lock.idle_seconds < self.idle_seconds:
+                continue
+            try:
+                tasks = plan_tasks(collect_stats(wrapper))
+            except GitError:
+                # 仓库已被删除或尚未初始化
+                continue
+            if tasks and self.run(wrapper, tasks, trigger="scheduled", wait=False):
+                count += 1
+        return count
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_pending()
+            except Exception as e:
+                # 后台线程不能因为单次失败退出
+                print(f"WARNING: 仓库维护失败: {e}")
+
+    def start(self):
+        """启动后台检查线程（检查间隔为0时不启动）"""
+        if self.interval <= 0 or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._loop, name="repo-maintenance", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """停止后台检查线程（不中断正在执行的git命令）"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+# 进程级共享的维护调度器
+maintenance_scheduler = MaintenanceScheduler()
@@ -0,0 +1,347 @@
+"""
+运行指标
+进程内的计数器、仪表和直方图，按Prometheus文本格式输出，不依赖外部服务；
+记录每次git命令的耗时、退出码、输出字节数和同时运行的进程数，
+耗时同时记入当前请求的追踪（services.tracing）
+"""
+
+import bisect
+import math
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from services.tracing import record_span
+
+# git命令耗时的直方图分桶（秒）
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+# 字节数的直方图分桶
+SIZE_BUCKETS = tuple(float(4**i * 256) for i in range(10))  # 256B ~ 64MiB
+
+# Prometheus文本格式的Content-Type
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    """转义标签值"""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    """格式化标签，如 {subcommand="log",code="0"}"""
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values, strict=True))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    """格式化数值（整数不带小数点）"""
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """指标基类：按标签值保存序列"""
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, ...], Any] = {}
+
+    def _key(self, labels: Sequence[Any]) -> Tuple[str, ...]:
+        if len(labels) != len(self.label_names):
+            raise ValueError(f"{self.name} 需要标签: {', '.join(self.label_names)}")
+        return tuple(str(v) for v in labels)
+
+    def clear(self):
+        """清除所有序列"""
+        with self._lock:
+            self._series.clear()
+
+    def _samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        """输出文本格式的行（包含HELP和TYPE）"""
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        with self._lock:
+            lines.extend(self._samples())
+        return lines
+
+
+class Counter(_Metric):
+    """只增不减的计数器"""
+
+    type_name = "counter"
+
+    def inc(self, *labels: Any, amount: float = 1.0):
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0.0) + amount
+
+    def value(self, *labels: Any) -> float:
+        with self._lock:
+            return self._series.get(self._key(labels), 0.0)
+
+    def _samples(self) -> Iterable[str]:
+        for key, value in sorted(self._series.items()):
+            labels = _format_labels(self.label_names, key)
+            yield f"{self.name}{labels} {_format_value(value)}"
+
+
+class Gauge(Counter):
+    """可增可减的仪表"""
+
+    type_name = "gauge"
+
+    def dec(self, *labels: Any, amount: float = 1.0):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels: Any, value: float):
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = value
+
+
+class Histogram(_Metric):
+    """直方图：按分桶统计观测值的分布"""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, *labels: Any, value: float):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # 各分桶的计数（不累计）、总和、总数
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, *labels: Any) -> int:
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            return series[2] if series else 0
+
+    def _samples(self) -> Iterable[str]:
+        names = self.label_names + ("le",)
+        for key, (counts, total, count) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts, strict=True):
+                cumulative += bucket_count
+                labels = _format_labels(names, key + (_format_value(bound),))
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(names, key + ("+Inf",))
+            yield f"{self.name}_bucket{labels} {count}"
+            labels = _format_labels(self.label_names, key)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {count}"
+
+
+class MetricsRegistry:
+    """
+    指标登记表
+
+    - 注册的指标按注册顺序输出
+    - collector在每次输出时调用，用于导出各缓存的stats()等快照数据，
+      返回 [(名称, 说明, 标签字典, 数值), ...]，同名的样本输出为一个gauge
+    """
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], Iterable[Tuple]]] = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labels=()) -> Counter:
+        return self.register(Counter(name, documentation, labels))
+
+    def gauge(self, name: str, documentation: str, labels=()) -> Gauge:
+        return self.register(Gauge(name, documentation, labels))
+
+    def histogram(
+        self, name: str, documentation: str, labels=(), buckets=LATENCY_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labels, buckets))
+
+    def add_collector(self, collector: Callable[[], Iterable[Tuple]]):
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self) -> str:
+        """输出所有指标（Prometheus文本格式）"""
+        with self._lock:
+            metrics = list(self._metrics)
+            collectors = list(self._collectors)
+
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+
+        families: Dict[str, Tuple[str, List[str]]] = {}
+        for collector in collectors:
+            for name, documentation, labels, value in collector():
+                if not isinstance(value, (int, float)) or isinstance(value, bool):
+                    continue
+                _, samples = families.setdefault(name, (documentation, []))
+                label_str = _format_labels(
+                    tuple(labels), tuple(str(v) for v in labels.values())
+                )
+                samples.append(f"{name}{label_str} {_format_value(value)}")
+        for name, (documentation, samples) in families.items():
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} gauge")
+            lines.extend(samples)
+
+        return "\n".join(lines) + "\n"
+
+
+# 进程级共享的指标登记表
+metrics = MetricsRegistry()
+
+git_command_duration = metrics.histogram(
+    "chronos_git_command_duration_seconds", "git命令耗时", ("subcommand",)
+)
+git_command_exits = metrics.counter(
+    "chronos_git_command_exit_total",
+    "git命令按退出码计数（error表示进程未能启动）",
+    ("subcommand", "code"),
+)
+git_command_stdout = metrics.histogram(
+    "chronos_git_command_stdout_bytes",
+    "git命令标准输出字节数",
+    ("subcommand",),
+    SIZE_BUCKETS,
+)
+git_commands_in_flight = metrics.gauge(
+    "chronos_git_commands_in_flight", "正在运行的git进程数", ("subcommand",)
+)
+
+cat_file_request_duration = metrics.histogram(
+    "chronos_cat_file_request_duration_seconds",
+    "常驻cat-file进程的单次查询耗时",
+    ("kind",),
+)
+
+http_request_duration = metrics.histogram(
+    "chronos_http_request_duration_seconds",
+    "HTTP请求耗时（到响应体发送完毕）",
+    ("method", "route", "status"),
+)
+http_response_size = metrics.histogram(
+    "chronos_http_response_size_bytes",
+    "HTTP响应体字节数（压缩后）",
+    ("method", "route"),
+    SIZE_BUCKETS,
+)
+
+
+def git_subcommand(args: Sequence[str]) -> str:
+    """
+    从git参数中取出子命令名称
+
+    跳过 -c key=value、-C path 等全局选项，如 ["-c", "x=y", "log"] -> "log"
+    """
+    skip_next = False
+    for arg in args:
+        if skip_next:
+            skip_next = False
+        elif arg in ("-c", "-C", "--git-dir", "--work-tree", "--namespace"):
+            skip_next = True
+        elif not arg.startswith("-"):
+            return arg
+    return "unknown"
+
+
+def text_size(text: Optional[str]) -> int:
+    """文本按UTF-8编码的字节数（纯ASCII时不需要编码）"""
+    if not text:
+        return 0
+    if text.isascii():
+        return len(text)
+    return len(text.encode("utf-8", errors="replace"))
+
+
+class GitCommandTimer:
+    """
+    一次git命令的计时
+
+    创建时计入正在运行的进程数；finish记录耗时、退出码和输出字节数，
+    多次调用只有第一次生效；cancel撤销计数（转交给其他执行方式时使用）
+    """
+
+    def __init__(self, args: Sequence[str]):
+        self.subcommand = git_subcommand(args)
+        self._start = time.perf_counter()
+        self._done = False
+        git_commands_in_flight.inc(self.subcommand)
+
+    def finish(self, returncode: Optional[int] = None, stdout_bytes: int = 0):
+        """
+        记录结果
+
+        Args:
+            returncode: 退出码，None表示进程未能启动或执行出错
+            stdout_bytes: 标准输出字节数
+        """
+        if self._done:
+            return
+        self._done = True
+        duration = time.perf_counter() - self._start
+        git_commands_in_flight.dec(self.subcommand)
+        git_command_duration.observe(self.subcommand, value=duration)
+        record_span(f"git-{self.subcommand}", duration)
+        code = "error" if returncode is None else str(returncode)
+        git_command_exits.inc(self.subcommand, code)
+        if returncode is not None:
+            git_command_stdout.observe(self.subcommand, value=stdout_bytes)
+
+    def cancel(self):
+        """撤销计数，不记录结果"""
+        if not self._done:
+            self._done = True
+            git_commands_in_flight.dec(self.subcommand)
@@ -0,0 +1,250 @@
+"""
+仓库读写锁服务
+按仓库路径提供读写锁：读操作共享，写操作（修改索引、引用、工作区）独占
+"""
+
+import asyncio
+import functools
+import threading
+import time
+import weakref
+from contextlib import asynccontextmanager, contextmanager
+from pathlib import Path
+
+
+class ReadWriteLock:
+    """
+    可重入的读写锁（写者优先）
+
+    - 多个线程可以同时持有读锁
+    - 写锁独占，等待中的写者会阻止新的读者进入，避免写操作饿死
+    - 持有写锁的线程可以再次获取读锁或写锁（写操作内部会调用读操作）
+    - 同一线程内读锁可重入；不支持读锁升级为写锁
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = None
+        self._writer_depth = 0
+        self._waiting_writers = 0
+        self._local = threading.local()
+        # 最近一次释放锁的时间，用于判断仓库是否空闲
+        self._last_active = time.monotonic()
+
+    def _read_depth(self) -> int:
+        return getattr(self._local, "depth", 0)
+
+    def acquire_read(self, reentrant: bool = True, blocking: bool = True) -> bool:
+        """
+        获取读锁
+
+        Args:
+            reentrant: 是否按线程记录持有次数；跨线程释放的场景（异步）需要传False
+            blocking: 为False时有写者持有或等待写锁则立即返回False
+
+        Returns:
+            是否获取成功
+        """
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me or (reentrant and self._read_depth() > 0):
+                # 写者线程或已持有读锁的线程直接进入，避免自身死锁
+                self._readers += 1
+            else:
+                if not blocking and (self._writer is not None or self._waiting_writers):
+                    return False
+                while self._writer is not None or self._waiting_writers:
+                    self._cond.wait()
+                self._readers += 1
+            if reentrant:
+                self._local.depth = self._read_depth() + 1
+            return True
+
+    def release_read(self, reentrant: bool = True):
+        """释放读锁"""
+        with self._cond:
+            self._readers -= 1
+            self._last_active = time.monotonic()
+            if reentrant:
+                self._local.depth = self._read_depth() - 1
+            if self._readers == 0:
+                self._cond.notify_all()
+
+    def acquire_write(self, blocking: bool = True) -> bool:
+        """
+        获取写锁
+
+        Args:
+            blocking: 为False时锁被占用立即返回False
+
+        Returns:
+            是否获取成功
+        """
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me:
+                self._writer_depth += 1
+                return True
+
+            if self._read_depth() > 0:
+                raise RuntimeError("不支持将读锁升级为写锁")
+
+            if not blocking:
+                if self._writer is not None or self._readers:
+                    return False
+            else:
+                self._waiting_writers += 1
+                try:
+                    while self._writer is not None or self._readers:
+                        self._cond.wait()
+                finally:
+                    self._waiting_writers -= 1
+
+            self._writer = me
+            self._writer_depth = 1
+            return True
+
+    def release_write(self):
+        """释放写锁"""
+        with self._cond:
+            if self._writer != threading.get_ident():
+                raise RuntimeError("当前线程未持有写锁")
+            self._writer_depth -= 1
+            if self._writer_depth == 0:
+                self._writer = None
+                self._last_active = time.monotonic()
+                self._cond.notify_all()
+
+    @property
+    def is_busy(self) -> bool:
+        """是否有线程持有锁或正在等待写锁"""
+        with self._cond:
+            return bool(self._readers or self._writer or self._waiting_writers)
+
+    @property
+    def idle_seconds(self) -> float:
+        """距离最近一次释放锁的秒数，锁被占用时为0"""
+        with self._cond:
+            if self._readers or self._writer or self._waiting_writers:
+                return 0.0
+            return time.monotonic() - self._last_active
+
+    @contextmanager
+    def read(self):
+        """读锁上下文管理器"""
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write(self):
+        """写锁上下文管理器"""
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+    @asynccontextmanager
+    async def read_async(self):
+        """
+        读锁异步上下文管理器
+
+        在线程池中等待锁，不阻塞事件循环；
+        等待期间任务被取消时，锁在获取成功后会被立即释放
+        """
+        acquire = asyncio.ensure_future(
+            asyncio.to_thread(self.acquire_read, reentrant=False)
+        )
+        try:
+            await asyncio.shield(acquire)
+        except asyncio.CancelledError:
+            acquire.add_done_callback(self._release_abandoned_read)
+            raise
+        try:
+            yield
+        finally:
+            self.release_read(reentrant=False)
+
+    def _release_abandoned_read(self, future: asyncio.Future):
+        if not future.cancelled() and future.exception() is None:
+            self.release_read(reentrant=False)
+
+
+class RepoLockManager:
+    """
+    按仓库路径管理读写锁
+
+    同一个已解析路径总是得到同一把锁；
+    没有任何GitWrapper引用时锁会被自动回收
+    """
+
+    def __init__(self):
+        self._locks: "weakref.WeakValueDictionary[Path, ReadWriteLock]" = (
+            weakref.WeakValueDictionary()
+        )
+        self._lock = threading.Lock()
+
+    def get(self, repo_path: Path) -> ReadWriteLock:
+        """
+        获取仓库对应的读写锁
+
+        Args:
+            repo_path: 仓库路径（已解析的绝对路径）
+
+        Returns:
+            ReadWriteLock实例
+        """
+        with self._lock:
+            lock = self._locks.get(repo_path)
+            if lock is None:
+                lock = ReadWriteLock()
+                self._locks[repo_path] = lock
+            return lock
+
+
+def read_locked(method):
+    """方法装饰器：执行期间持有self.lock的读锁"""
+
+    if asyncio.iscoroutinefunction(method):
+
+        @functools.wraps(method)
+        async def async_wrapper(self, *args, **kwargs):
+            async with self.lock.read_async():
+                return await method(self, *args, **kwargs)
+
+        return async_wrapper
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock.read():
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+def write_locked(method):
+    """
+    方法装饰器：执行期间持有self.lock的写锁
+
+    方法结束后（无论成功与否）调用self._after_write()（如果存在），用于清除缓存
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock.write():
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                after_write = getattr(self, "_after_write", None)
+                if after_write is not None:
+                    after_write()
+
+    return wrapper
+
+
+# 进程级共享的仓库锁管理器
+repo_locks = RepoLockManager()
@@ -0,0 +1,156 @@
+"""
+仓库元数据缓存
+缓存.git目录位置和Git配置值，.git/config、HEAD或全局配置变化时自动失效
+"""
+
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+# 文件状态签名: (mtime_ns, size, inode)，文件不存在时为None
+FileStamp = Optional[Tuple[int, int, int]]
+
+
+def stat_stamp(path: Path) -> FileStamp:
+    """获取文件状态签名"""
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+
+def _global_config_paths():
+    """全局Git配置文件路径（user.name等通常配置在这里）"""
+    try:
+        home = Path.home()
+    except RuntimeError:
+        return []
+    return [home / ".gitconfig", home / ".config" / "git" / "config"]
+
+
+def common_git_dir(git_dir: Path) -> Path:
+    """
+    共享的.git目录（对象库、refs、packed-refs所在位置）
+
+    工作树的.git目录通过commondir文件指向主仓库的.git目录
+    """
+    commondir = git_dir / "commondir"
+    if commondir.is_file():
+        try:
+            target = Path(commondir.read_text(encoding="utf-8").strip())
+        except OSError:
+            return git_dir
+        if not target.is_absolute():
+            target = git_dir / target
+        return target.resolve()
+    return git_dir
+
+
+class RepoMetadata:
+    """
+    单个仓库的元数据缓存
+
+    每次访问时只比较几个文件的stat签名，签名不变则直接使用缓存，
+    不再重复探测.git目录或启动git config进程
+    """
+
+    def __init__(self, repo_path: Path):
+        """
+        初始化RepoMetadata
+
+        Args:
+            repo_path: 仓库路径（已解析的绝对路径）
+        """
+        self.repo_path = repo_path
+        self._git_dir: Optional[Path] = None
+        self._stamp: Optional[Tuple[FileStamp, ...]] = None
+        self._config: Dict[str, Optional[str]] = {}
+        self._lock = threading.Lock()
+
+    def _discover_git_dir(self) -> Optional[Path]:
+        """
+        定位.git目录
+
+        .git可以是目录，也可以是包含 "gitdir: <path>" 的文件（工作树、子模块）
+        """
+        dot_git = self.repo_path / ".git"
+        if dot_git.is_dir():
+            return dot_git
+        if dot_git.is_file():
+            try:
+                content = dot_git.read_text(encoding="utf-8").strip()
+            except OSError:
+                return None
+            if content.startswith("gitdir:"):
+                target = Path(content[len("gitdir:") :].strip())
+                if not target.is_absolute():
+                    target = self.repo_path / target
+                return target.resolve()
+        return None
+
+    def _current_stamp(self, git_dir: Optional[Path]) -> Tuple[FileStamp, ...]:
+        """计算当前的元数据签名"""
+        stamps = [stat_stamp(path) for path in _global_config_paths()]
+        if git_dir is None:
+            return (None, None, *stamps)
+        return (stat_stamp(git_dir / "HEAD"), stat_stamp(git_dir / "config"), *stamps)
+
+    def _validate(self):
+        """签名变化时清空缓存（调用方持有锁）"""
+        git_dir = self._git_dir
+        stamp = self._current_stamp(git_dir)
+
+        # 尚未初始化的仓库每次都重新探测；HEAD消失说明缓存的.git位置已失效
+        if git_dir is not None and stamp == self._stamp and stamp[0] is not None:
+            return
+
+        git_dir = self._discover_git_dir()
+        self._git_dir = git_dir
+        self._stamp = self._current_stamp(git_dir)
+        self._config.clear()
+
+    @property
+    def git_dir(self) -> Optional[Path]:
+        """.git目录位置，不是Git仓库时为None"""
+        with self._lock:
+            self._validate()
+            return self._git_dir
+
+    def is_repository(self) -> bool:
+        """当前路径是否为Git仓库"""
+        return self.git_dir is not None
+
+    def get_config(
+        self, key: str, loader: Callable[[str], Optional[str]]
+    ) -> Optional[str]:
+        """
+        获取Git配置值（带缓存）
+
+        Args:
+            key: 配置键名
+            loader: 缓存未命中时读取配置的函数
+
+        Returns:
+            配置值，如果不存在则返回None
+        """
+        with self._lock:
+            self._validate()
+            if key in self._config:
+                return self._config[key]
+            stamp = self._stamp
+
+        value = loader(key)
+
+        with self._lock:
+            # 读取期间配置发生变化时不写入缓存
+            if self._stamp == stamp:
+                self._config[key] = value
+        return value
+
+    def invalidate(self):
+        """强制清空缓存"""
+        with self._lock:
+            self._git_dir = None
+            self._stamp = None
+            self._config.clear()
@@ -0,0 +1,154 @@
+"""
+GitWrapper注册表
+进程内按规范化仓库路径复用GitWrapper实例，超出容量时淘汰最久未使用的仓库；
+不是Git仓库的路径每次返回新的临时实例
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional
+
+from services.cat_file import cat_file_pool
+from services.git_wrapper import GitWrapper
+
+# 默认最多保留的仓库数量
+DEFAULT_MAX_REPOSITORIES = 32
+
+
+class GitWrapperRegistry:
+    """
+    GitWrapper注册表（LRU）
+
+    同一个仓库在整个进程中只对应一个长期存在的GitWrapper，
+    其.git位置、配置值等元数据缓存可以跨请求复用
+    """
+
+    def __init__(self, max_size: int = DEFAULT_MAX_REPOSITORIES):
+        """
+        初始化注册表
+
+        Args:
+            max_size: 最多保留的仓库数量
+        """
+        self.max_size = max_size
+        self._wrappers: "OrderedDict[Path, GitWrapper]" = OrderedDict()
+        # 请求中的原始绝对路径 -> 规范化路径，避免每次都调用Path.resolve()
+        self._aliases: "OrderedDict[str, Path]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, repo_path: str) -> GitWrapper:
+        """
+        获取仓库对应的GitWrapper（不存在则创建；只有Git仓库会被注册）
+
+        Args:
+            repo_path: 仓库路径
+
+        Returns:
+            GitWrapper实例
+        """
+        with self._lock:
+            canonical = self._aliases.get(repo_path)
+            if canonical is not None:
+                wrapper = self._wrappers.get(canonical)
+                if wrapper is not None:
+                    self._wrappers.move_to_end(canonical)
+                    self._aliases.move_to_end(repo_path)
+                    return wrapper
+
+        # 解析路径放在锁外，避免慢文件系统阻塞其他仓库
+        wrapper = GitWrapper(repo_path)
+        # 不是Git仓库的路径（不存在、尚未初始化）返回临时实例，不进入注册表，
+        # 否则这类路径会把真实仓库的常驻进程和各项缓存淘汰掉
+        if wrapper.metadata.git_dir is None:
+            return wrapper
+        canonical = wrapper.repo_path
+
+        evicted = []
+        with self._lock:
+            existing = self._wrappers.get(canonical)
+            if existing is not None:
+                wrapper = existing
+                self._wrappers.move_to_end(canonical)
+            else:
+                self._wrappers[canonical] = wrapper
+                while len(self._wrappers) > self.max_size:
+                    evicted.append(self._wrappers.popitem(last=False)[0])
+
+            # 相对路径依赖当前工作目录，不缓存别名
+            if os.path.isabs(repo_path):
+                self._aliases[repo_path] = canonical
+                self._aliases.move_to_end(repo_path)
+                while len(self._aliases) > self.max_size * 4:
+                    self._aliases.popitem(last=False)
+
+        for path in evicted:
+            cat_file_pool.release(path)
+
+        return wrapper
+
+    def peek(self, repo_path: str) -> Optional[GitWrapper]:
+        """
+        获取已注册的GitWrapper（不创建实例，不改变LRU顺序）
+
+        Args:
+            repo_path: 仓库路径
+
+        Returns:
+            GitWrapper实例，未注册时返回None
+        """
+        with self._lock:
+            canonical = self._aliases.get(repo_path)
+        if canonical is None:
+            try:
+                canonical = Path(repo_path).resolve()
+            except (OSError, RuntimeError):
+                return None
+        with self._lock:
+            return self._wrappers.get(canonical)
+
+    def evict(self, repo_path: str):
+        """
+        移除仓库对应的GitWrapper并关闭其常驻进程
+
+        Args:
+            repo_path: 仓库路径
+        """
+        canonical = Path(repo_path).resolve()
+        with self._lock:
+            self._wrappers.pop(canonical, None)
+            for alias in [a for a, c in self._aliases.items() if c == canonical]:
+                del self._aliases[alias]
+        cat_file_pool.release(canonical)
+
+    def wrappers(self) -> List[GitWrapper]:
+        """当前注册的所有GitWrapper（快照）"""
+        with self._lock:
+            return list(self._wrappers.values())
+
+    def clear(self):
+        """清空注册表"""
+        with self._lock:
+            paths = list(self._wrappers)
+            self._wrappers.clear()
+            self._aliases.clear()
+        for path in paths:
+            cat_file_pool.release(path)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._wrappers)
+
+    def __contains__(self, repo_path: object) -> bool:
+        with self._lock:
+            return repo_path in self._wrappers
+
+
+# 进程级共享的GitWrapper注册表
+git_wrappers = GitWrapperRegistry()
+
+
+def get_git_wrapper(repo_path: str) -> GitWrapper:
+    """获取仓库对应的共享GitWrapper"""
+    return git_wrappers.get(repo_path)
@@ -0,0 +1,196 @@
+"""
+仓库状态指纹
+不启动git进程，直接读取.git中的文件得到HEAD指向、索引文件签名和工作区目录签名
+"""
+
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from services.repo_metadata import FileStamp, common_git_dir, stat_stamp
+
+
+def resolve_ref(git_dir: Path, ref: str) -> Optional[str]:
+    """
+    解析引用指向的提交ID（先查松散引用，再查packed-refs）
+
+    Args:
+        git_dir: .git目录
+        ref: 完整引用名，如 refs/heads/main
+
+    Returns:
+        提交ID；引用不存在时返回None
+    """
+    common = common_git_dir(git_dir)
+    try:
+        return (common / ref).read_text(encoding="utf-8").strip() or None
+    except OSError:
+        pass
+
+    try:
+        with open(common / "packed-refs", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith(("#", "^")):
+                    continue
+                oid, _, name = line.rstrip("\n").partition(" ")
+                if name == ref:
+                    return oid
+    except OSError:
+        pass
+    return None
+
+
+def read_head(git_dir: Path) -> Tuple[Optional[str], Optional[str]]:
+    """
+    读取HEAD
+
+    Args:
+        git_dir: .git目录
+
+    Returns:
+        (分支引用, 提交ID)：分离HEAD时分支引用为None，新仓库没有提交时提交ID为None
+    """
+    try:
+        content = (git_dir / "HEAD").read_text(encoding="utf-8").strip()
+    except OSError:
+        return None, None
+    if content.startswith("ref: "):
+        ref = content[5:]
+        return ref, resolve_ref(git_dir, ref)
+    return None, content or None
+
+
+def index_stamp(git_dir: Path) -> FileStamp:
+    """索引文件签名（mtime、大小、inode）"""
+    return stat_stamp(git_dir / "index")
+
+
+def refs_state(git_dir: Path) -> Tuple[Any, ...]:
+    """
+    引用状态：HEAD内容、所有松散引用指向的提交ID和packed-refs签名
+
+    不启动git进程；任一分支、标签前进或HEAD切换时改变
+
+    Args:
+        git_dir: .git目录
+
+    Returns:
+        可比较、可哈希的状态元组
+    """
+    try:
+        head = (git_dir / "HEAD").read_bytes().strip()
+    except OSError:
+        head = None
+
+    common = common_git_dir(git_dir)
+    refs = []
+    stack = [str(common / "refs")]
+    while stack:
+        directory = stack.pop()
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                stack.append(entry.path)
+                continue
+            try:
+                with open(entry.path, "rb") as f:
+                    refs.append((entry.path, f.read().strip()))
+            except OSError:
+                # 引用正在被删除
+                continue
+    refs.sort()
+    return head, tuple(refs), stat_stamp(common / "packed-refs")
+
+
+def index_entry_count(git_dir: Path) -> Optional[int]:
+    """
+    索引中的条目数（即已追踪的文件数），读取索引文件头，不启动git进程
+
+    Args:
+        git_dir: .git目录
+
+    Returns:
+        条目数；没有索引或格式无法识别时返回None
+    """
+    try:
+        with open(git_dir / "index", "rb") as f:
+            header = f.read(12)
+    except OSError:
+        return None
+    # 文件头: "DIRC" + 版本号 + 条目数（均为4字节大端整数）
+    if len(header) != 12 or header[:4] != b"DIRC":
+        return None
+    return int.from_bytes(header[8:12], "big")
+
+
+def sample_directories(root: Path, skip_dirs: Iterable[str] = ()) -> int:
+    """
+    工作区目录签名
+
+    只对目录执行stat：新增、删除、重命名文件以及编辑器的原子保存（写临时文件后重命名）
+    都会改变所在目录的mtime；原地修改文件内容不会改变目录mtime
+
+    Args:
+        root: 工作区根目录
+        skip_dirs: 跳过的目录（相对路径，如被忽略的node_modules）
+
+    Returns:
+        签名值，任一目录变化时改变
+    """
+    skip = {os.path.join(str(root), d) for d in skip_dirs}
+    digest = 0
+    stack = [str(root)]
+    while stack:
+        directory = stack.pop()
+        try:
+            st = os.stat(directory)
+            entries = list(os.scandir(directory))
+        except OSError:
+            continue
+        digest = (digest + hash((directory, st.st_mtime_ns))) & 0xFFFFFFFFFFFFFFFF
+        for entry in entries:
+            if (
+                entry.name != ".git"
+                and entry.is_dir(follow_symlinks=False)
+                and entry.path not in skip
+            ):
+                stack.append(entry.path)
+    return digest
+
+
+class WorktreeMonitors:
+    """
+    正在监听工作区的监听器登记表（只登记事件驱动的监听，轮询监听不登记）
+
+    监听器需要提供instance（实例编号）、generation（工作区变化计数）
+    和settling（是否有尚未推送的变化）；
+    状态缓存据此判断工作区是否变化，无需扫描目录
+    """
+
+    def __init__(self):
+        self._monitors: Dict[Path, Any] = {}
+        self._lock = threading.Lock()
+
+    def register(self, repo_path: Path, monitor: Any):
+        """登记监听器"""
+        with self._lock:
+            self._monitors[repo_path] = monitor
+
+    def unregister(self, repo_path: Path, monitor: Any):
+        """注销监听器（只注销同一个实例）"""
+        with self._lock:
+            if self._monitors.get(repo_path) is monitor:
+                del self._monitors[repo_path]
+
+    def get(self, repo_path: Path) -> Optional[Any]:
+        """获取仓库的监听器"""
+        with self._lock:
+            return self._monitors.get(repo_path)
+
+
+# 进程级共享的工作区监听器登记表
+worktree_monitors = WorktreeMonitors()
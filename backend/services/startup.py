@@ -0,0 +1,107 @@
+"""
+启动就绪信号
+打包后的后端由Tauri作为子进程启动。监听端口绑定完成后在stdout输出一行就绪信息
+（可选同时写入就绪文件），启动方等待这一行即可开始请求，不需要固定等待若干秒
+
+就绪行格式:
+    CHRONOS_READY {"pid": 1234, "host": "127.0.0.1", "port": 8765, "url": "..."}
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import uvicorn
+
+# 就绪行前缀
+READY_PREFIX = "CHRONOS_READY"
+
+# 就绪文件路径的环境变量（命令行 --ready-file 优先）
+READY_FILE_ENV = "CHRONOS_READY_FILE"
+
+
+def format_ready_line(info: Dict[str, Any]) -> str:
+    """生成就绪行"""
+    return f"{READY_PREFIX} {json.dumps(info, ensure_ascii=False)}"
+
+
+def parse_ready_line(line: str) -> Optional[Dict[str, Any]]:
+    """
+    解析就绪行
+
+    Returns:
+        就绪信息；不是就绪行时返回None
+    """
+    line = line.strip()
+    if not line.startswith(READY_PREFIX + " "):
+        return None
+    try:
+        info = json.loads(line[len(READY_PREFIX) + 1 :])
+    except ValueError:
+        return None
+    return info if isinstance(info, dict) else None
+
+
+def write_ready_file(path: Path, info: Dict[str, Any]):
+    """写入就绪文件（先写临时文件再改名，等待方不会读到不完整的内容）"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(info, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def announce_ready(info: Dict[str, Any], ready_file: Optional[Path] = None):
+    """写入就绪文件（如果指定），再输出就绪行（看到就绪行时就绪文件已经存在）"""
+    if ready_file is not None:
+        write_ready_file(ready_file, info)
+    # stdout是管道时默认全缓冲，必须立即flush
+    print(format_ready_line(info), file=sys.stdout, flush=True)
+
+
+def remove_ready_file(path: Optional[Path]):
+    """删除就绪文件（启动前清除上次运行留下的文件，退出时清除本次的文件）"""
+    if path is None:
+        return
+    try:
+        Path(path).unlink()
+    except FileNotFoundError:
+        pass
+
+
+class ReadyServer(uvicorn.Server):
+    """监听端口绑定完成后发出就绪信号的uvicorn服务器"""
+
+    def __init__(self, config: uvicorn.Config, ready_file: Optional[Path] = None):
+        super().__init__(config)
+        self.ready_file = ready_file
+
+    def bound_port(self) -> int:
+        """实际监听的端口（配置为0时由系统分配）"""
+        for server in self.servers:
+            for sock in server.sockets:
+                return sock.getsockname()[1]
+        return self.config.port
+
+    async def startup(self, sockets=None):
+        remove_ready_file(self.ready_file)
+        await super().startup(sockets=sockets)
+        # 启动失败（如端口被占用）时uvicorn不会设置started
+        if not self.started:
+            return
+        port = self.bound_port()
+        announce_ready(
+            {
+                "pid": os.getpid(),
+                "host": self.config.host,
+                "port": port,
+                "url": f"http://{self.config.host}:{port}",
+            },
+            self.ready_file,
+        )
+
+    async def shutdown(self, sockets=None):
+        remove_ready_file(self.ready_file)
+        await super().shutdown(sockets=sockets)
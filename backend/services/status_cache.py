@@ -0,0 +1,134 @@
+"""
+仓库状态缓存
+按仓库缓存git status的解析结果，仓库指纹（HEAD、索引签名、工作区变化标记）不变时直接返回
+"""
+
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Hashable, NamedTuple, Optional
+
+# 没有文件监听时，缓存结果最长使用时间（秒）；
+# 目录签名无法发现原地修改的文件内容，用有效期限制这种情况下的过期时间
+SAMPLED_STATUS_TTL = 2.0
+
+
+class StatusCacheEntry(NamedTuple):
+    """缓存条目"""
+
+    fingerprint: Hashable
+    status: Dict[str, Any]
+    # 生成该结果耗费的时间（秒）
+    cost: float
+    created: float
+    # 工作区标记是否来自文件监听（否则来自目录签名，需要检查有效期）
+    watched: bool
+
+
+class StatusCache:
+    """
+    仓库状态缓存
+
+    缓存中的状态字典由多个请求共享，调用方不能修改
+    """
+
+    def __init__(self, sampled_ttl: float = SAMPLED_STATUS_TTL):
+        """
+        初始化缓存
+
+        Args:
+            sampled_ttl: 没有文件监听时缓存结果的有效期（秒）
+        """
+        self.sampled_ttl = sampled_ttl
+        self._entries: Dict[Path, StatusCacheEntry] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.time_saved = 0.0
+        self.fingerprint_time = 0.0
+
+    def get(
+        self, repo_path: Path, fingerprint: Hashable, fingerprint_cost: float = 0.0
+    ) -> Optional[Dict[str, Any]]:
+        """
+        获取缓存的状态
+
+        Args:
+            repo_path: 仓库路径
+            fingerprint: 当前仓库指纹
+            fingerprint_cost: 计算指纹耗费的时间（秒），计入统计
+
+        Returns:
+            状态字典；未命中时返回None
+        """
+        with self._lock:
+            self.fingerprint_time += fingerprint_cost
+            entry = self._entries.get(repo_path)
+            if (
+                entry is not None
+                and entry.fingerprint == fingerprint
+                and (
+                    entry.watched or time.monotonic() - entry.created < self.sampled_ttl
+                )
+            ):
+                self.hits += 1
+                self.time_saved += entry.cost - fingerprint_cost
+                return entry.status
+            self.misses += 1
+            return None
+
+    def put(
+        self,
+        repo_path: Path,
+        fingerprint: Hashable,
+        status: Dict[str, Any],
+        cost: float,
+        watched: bool,
+    ):
+        """
+        写入缓存
+
+        Args:
+            repo_path: 仓库路径
+            fingerprint: 执行git status之前计算的仓库指纹
+            status: 状态字典
+            cost: 生成状态耗费的时间（秒）
+            watched: 工作区标记是否来自文件监听
+        """
+        with self._lock:
+            self._entries[repo_path] = StatusCacheEntry(
+                fingerprint, status, cost, time.monotonic(), watched
+            )
+
+    def invalidate(self, repo_path: Optional[Path] = None):
+        """
+        清除缓存
+
+        Args:
+            repo_path: 只清除该仓库的条目，None表示全部清除
+        """
+        with self._lock:
+            if repo_path is None:
+                self.invalidations += len(self._entries)
+                self._entries.clear()
+            elif self._entries.pop(repo_path, None) is not None:
+                self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """获取缓存统计信息"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "time_saved_ms": round(self.time_saved * 1000, 1),
+                "fingerprint_ms": round(self.fingerprint_time * 1000, 1),
+            }
+
+
+# 进程级共享的仓库状态缓存
+status_cache = StatusCache()
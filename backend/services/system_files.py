@@ -0,0 +1,162 @@
+"""
+系统文件匹配器
+由SYSTEM_FILE_PATTERNS一次性构建，用哈希查找和前后缀匹配代替逐条正则匹配
+"""
+
+import re
+from typing import Iterable, List, Optional
+
+# 正则元字符（出现未转义的元字符说明不是纯文本）
+_REGEX_META = set(".^$*+?{}[]|()")
+
+
+def _unescape_literal(body: str) -> Optional[str]:
+    """
+    将不含元字符的正则片段还原为纯文本
+
+    Args:
+        body: 正则片段，如 r"\\.DS_Store"
+
+    Returns:
+        纯文本字符串；包含元字符时返回None
+    """
+    chars = []
+    escaped = False
+    for char in body:
+        if escaped:
+            # \\d、\\w 等转义序列不是纯文本
+            if char.isalnum():
+                return None
+            chars.append(char)
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif char in _REGEX_META:
+            return None
+        else:
+            chars.append(char)
+    if escaped:
+        return None
+    return "".join(chars)
+
+
+class SystemFileMatcher:
+    """
+    系统文件匹配器
+
+    与逐条 re.match(pattern, 路径) / re.match(pattern, 文件名) 的结果完全一致，
+    但把模式预先分类：
+    - ^name$      -> 文件名集合查找
+    - ^prefix.*   -> 路径或文件名前缀匹配
+    - .*suffix$   -> 路径后缀匹配
+    - ^dir/       -> 路径前缀匹配
+    - 其他        -> 合并为一个正则，一次匹配
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        """
+        初始化匹配器
+
+        Args:
+            patterns: 正则表达式列表（re.match语义）
+        """
+        self.patterns = list(patterns)
+        literal_names = set()
+        prefixes = []
+        suffixes = []
+        path_prefixes = []
+        fallback = []
+
+        for pattern in self.patterns:
+            literal = None
+            if pattern.startswith("^") and pattern.endswith("$"):
+                literal = _unescape_literal(pattern[1:-1])
+                if literal is not None and "/" not in literal:
+                    literal_names.add(literal)
+                    continue
+            elif pattern.startswith("^") and pattern.endswith(".*"):
+                literal = _unescape_literal(pattern[1:-2])
+                if literal is not None:
+                    prefixes.append(literal)
+                    continue
+            elif pattern.startswith(".*") and pattern.endswith("$"):
+                literal = _unescape_literal(pattern[2:-1])
+                if literal is not None and "/" not in literal:
+                    suffixes.append(literal)
+                    continue
+            elif pattern.startswith("^") and pattern.endswith("/"):
+                literal = _unescape_literal(pattern[1:])
+                if literal is not None:
+                    path_prefixes.append(literal)
+                    continue
+            fallback.append(pattern)
+
+        self._literal_names = frozenset(literal_names)
+        self._prefixes = tuple(prefixes)
+        self._suffixes = tuple(suffixes)
+        self._path_prefixes = tuple(path_prefixes)
+        self._fallback = (
+            re.compile("|".join(f"(?:{p})" for p in fallback)) if fallback else None
+        )
+        # 包含换行符等特殊情况时使用的完整合并正则（与逐条匹配语义一致）
+        self._combined = re.compile("|".join(f"(?:{p})" for p in self.patterns))
+
+    def matches(self, filename: str) -> bool:
+        """
+        判断文件是否为系统文件
+
+        Args:
+            filename: 文件路径
+
+        Returns:
+            True如果是系统文件，否则False
+        """
+        if not filename:
+            return False
+
+        # 标准化路径分隔符（统一使用/）
+        filename = filename.replace("\\", "/")
+        basename = filename.rsplit("/", 1)[-1]
+
+        if "\n" in filename:
+            # '.'和'$'对换行符有特殊语义，直接使用正则保持一致
+            combined = self._combined
+            return bool(
+                combined.match(filename) or (basename and combined.match(basename))
+            )
+
+        if basename in self._literal_names:
+            return True
+
+        prefixes = self._prefixes
+        if prefixes and (
+            filename.startswith(prefixes) or basename.startswith(prefixes)
+        ):
+            return True
+
+        # 文件名是路径的后缀，只需检查完整路径
+        if self._suffixes and filename.endswith(self._suffixes):
+            return True
+
+        if self._path_prefixes and filename.startswith(self._path_prefixes):
+            return True
+
+        fallback = self._fallback
+        if fallback is not None:
+            if fallback.match(filename) or (basename and fallback.match(basename)):
+                return True
+
+        return False
+
+    def filter(self, filenames: Iterable[str]) -> List[str]:
+        """
+        过滤掉系统文件
+
+        Args:
+            filenames: 文件路径序列
+
+        Returns:
+            不是系统文件的路径列表（保持原顺序）
+        """
+        matches = self.matches
+        return [name for name in filenames if not matches(name)]
@@ -0,0 +1,101 @@
+"""
+请求级耗时追踪
+每个HTTP请求持有一个RequestTrace（通过contextvars传递，asyncio.to_thread的线程同样可见），
+记录该请求执行的每个git命令和Python侧解析步骤的耗时
+"""
+
+import contextvars
+import functools
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class RequestTrace:
+    """一个请求的耗时记录"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        # (名称, 耗时秒数)，按完成顺序
+        self.spans: List[Tuple[str, float]] = []
+        self._lock = threading.Lock()
+
+    def add(self, name: str, duration: float):
+        """记录一个步骤"""
+        with self._lock:
+            self.spans.append((name, duration))
+
+    def elapsed(self) -> float:
+        """请求开始至今的时间（秒）"""
+        return time.perf_counter() - self.start
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """
+        按名称汇总
+
+        Returns:
+            {名称: {"count": 次数, "ms": 总耗时毫秒}}，按首次出现顺序
+        """
+        result: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            spans = list(self.spans)
+        for name, duration in spans:
+            entry = result.setdefault(name, {"count": 0, "ms": 0.0})
+            entry["count"] += 1
+            entry["ms"] += duration * 1000
+        for entry in result.values():
+            entry["ms"] = round(entry["ms"], 2)
+        return result
+
+
+_current_trace: contextvars.ContextVar[Optional[RequestTrace]] = contextvars.ContextVar(
+    "chronos_request_trace", default=None
+)
+
+
+def start_trace() -> Tuple[RequestTrace, contextvars.Token]:
+    """
+    为当前上下文开始一个新的追踪
+
+    Returns:
+        (追踪对象, 用于end_trace的token)
+    """
+    trace = RequestTrace()
+    return trace, _current_trace.set(trace)
+
+
+def end_trace(token: contextvars.Token):
+    """结束追踪，恢复之前的上下文"""
+    _current_trace.reset(token)
+
+
+def current_trace() -> Optional[RequestTrace]:
+    """当前上下文的追踪对象，不在请求中时返回None"""
+    return _current_trace.get()
+
+
+def record_span(name: str, duration: float):
+    """向当前追踪记录一个步骤（不在请求中时忽略）"""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add(name, duration)
+
+
+def traced(name: str) -> Callable:
+    """记录函数耗时的装饰器（只用于同步函数）"""
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            trace = _current_trace.get()
+            if trace is None:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                trace.add(name, time.perf_counter() - start)
+
+        return wrapper
+
+    return decorator
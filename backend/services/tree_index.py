@@ -0,0 +1,179 @@
+"""
+已追踪文件目录树索引
+由索引（git ls-files -s）一次性构建前缀树，每个目录记录文件数量和字节大小，
+展开目录只需遍历其直接子项
+"""
+
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+# 最多缓存的仓库数量
+DEFAULT_MAX_TREE_INDEXES = 8
+
+
+class _DirNode:
+    """目录节点"""
+
+    __slots__ = ("dirs", "files", "file_count", "size", "_sorted")
+
+    def __init__(self):
+        self.dirs: Dict[str, "_DirNode"] = {}
+        self.files: Dict[str, int] = {}
+        self.file_count = 0
+        self.size = 0
+        self._sorted: Optional[Tuple[List[str], List[str]]] = None
+
+    def sorted_names(self) -> Tuple[List[str], List[str]]:
+        """按名称排序的子目录和文件（首次访问时排序）"""
+        if self._sorted is None:
+            self._sorted = (sorted(self.dirs), sorted(self.files))
+        return self._sorted
+
+
+class TreeIndex:
+    """
+    目录树索引
+
+    构建成本与文件数量成正比，只在索引变化后重建；
+    list()的成本只与返回的节点数量有关
+    """
+
+    def __init__(self, entries: Iterable[Tuple[str, int]]):
+        """
+        构建目录树
+
+        Args:
+            entries: (文件路径, 字节大小) 序列，路径使用/分隔
+        """
+        self.root = _DirNode()
+        self._dirs: Dict[str, _DirNode] = {"": self.root}
+
+        for path, size in entries:
+            parts = path.split("/")
+            node = self.root
+            node.file_count += 1
+            node.size += size
+            prefix = ""
+            for part in parts[:-1]:
+                prefix = f"{prefix}/{part}" if prefix else part
+                child = node.dirs.get(part)
+                if child is None:
+                    child = node.dirs[part] = _DirNode()
+                    self._dirs[prefix] = child
+                node = child
+                node.file_count += 1
+                node.size += size
+            node.files[parts[-1]] = size
+
+    def __contains__(self, directory: str) -> bool:
+        return directory in self._dirs
+
+    def list(self, directory: str = "", depth: int = 1) -> Dict[str, Any]:
+        """
+        列出目录内容
+
+        Args:
+            directory: 目录相对路径，空字符串表示仓库根目录
+            depth: 展开的层数，1表示只返回直接子项
+
+        Returns:
+            目录信息字典：path、file_count、size、children
+
+        Raises:
+            ValueError: 目录不存在
+        """
+        node = self._dirs.get(directory)
+        if node is None:
+            raise ValueError(f"目录 {directory} 不存在或不包含已追踪文件")
+        return {
+            "path": directory,
+            "file_count": node.file_count,
+            "size": node.size,
+            "children": self._children(node, directory, depth),
+        }
+
+    def _children(self, node: _DirNode, directory: str, depth: int) -> List[Dict]:
+        dir_names, file_names = node.sorted_names()
+        children = []
+        # 文件夹在前，文件在后（与前端treeBuilder的排序一致）
+        for name in dir_names:
+            child = node.dirs[name]
+            path = f"{directory}/{name}" if directory else name
+            entry = {
+                "name": name,
+                "path": path,
+                "type": "folder",
+                "file_count": child.file_count,
+                "size": child.size,
+            }
+            if depth > 1:
+                entry["children"] = self._children(child, path, depth - 1)
+            children.append(entry)
+        for name in file_names:
+            children.append(
+                {
+                    "name": name,
+                    "path": f"{directory}/{name}" if directory else name,
+                    "type": "file",
+                    "size": node.files[name],
+                }
+            )
+        return children
+
+
+class TreeIndexCache:
+    """按仓库缓存目录树索引（LRU），索引文件签名变化时重建"""
+
+    def __init__(self, max_size: int = DEFAULT_MAX_TREE_INDEXES):
+        self.max_size = max_size
+        self._entries: "OrderedDict[Path, Tuple[Hashable, TreeIndex]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.builds = 0
+
+    def get(self, repo_path: Path, stamp: Hashable) -> Optional[TreeIndex]:
+        """获取与索引签名匹配的目录树"""
+        with self._lock:
+            entry = self._entries.get(repo_path)
+            if entry is None or entry[0] != stamp:
+                return None
+            self._entries.move_to_end(repo_path)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, repo_path: Path, stamp: Hashable, tree: TreeIndex):
+        """写入目录树"""
+        with self._lock:
+            self.builds += 1
+            self._entries[repo_path] = (stamp, tree)
+            self._entries.move_to_end(repo_path)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, repo_path: Optional[Path] = None):
+        """
+        清除缓存
+
+        Args:
+            repo_path: 只清除该仓库的目录树，None表示全部清除
+        """
+        with self._lock:
+            if repo_path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(repo_path, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """获取缓存统计信息"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "builds": self.builds,
+            }
+
+
+# 进程级共享的目录树索引缓存
+tree_index_cache = TreeIndexCache()
@@ -0,0 +1,651 @@
+"""
+仓库文件监听服务
+监听工作区和.git中的HEAD、refs、index，合并短时间内的连续变化后推送类型化事件：
+- worktree_changed: 工作区文件或暂存区变化（需要重新获取status/files）
+- head_moved: HEAD指向的提交变化（提交、回滚、切换分支）
+- branches_changed: 分支列表或分支指向变化
+
+Linux上优先使用inotify，其他平台安装了watchfiles时使用watchfiles，否则退化为轮询
+"""
+
+import asyncio
+import errno
+import itertools
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from services.errors import GitError
+from services.git_wrapper import SYSTEM_FILE_MATCHER, GitWrapper
+from services.repo_metadata import common_git_dir
+from services.repo_state import worktree_monitors
+
+# 事件类型（按推送顺序）
+EVENT_TYPES = ("head_moved", "branches_changed", "worktree_changed")
+
+# 第一个变化之后等待多久没有新变化才推送（秒）
+DEBOUNCE_SECONDS = 0.2
+
+# 持续变化时最长合并时间（秒），避免长时间写入期间一直不推送
+MAX_BATCH_SECONDS = 1.0
+
+# 轮询模式的扫描间隔（秒）
+POLL_INTERVAL = 2.0
+
+# 单个事件中最多携带的路径数量
+MAX_EVENT_PATHS = 100
+
+# 每个订阅者最多积压的事件数量
+SUBSCRIBER_QUEUE_SIZE = 100
+
+# 监听后端，可通过环境变量 CHRONOS_WATCHER 指定：auto/inotify/watchfiles/polling
+WATCHER_BACKEND = os.environ.get("CHRONOS_WATCHER", "auto")
+
+# 事件队列溢出时返回的特殊路径，表示可能丢失了变化
+OVERFLOW = "\0overflow"
+
+# 监听目标：(目录, 是否递归)
+WatchSpec = List[Tuple[Path, bool]]
+
+_watcher_ids = itertools.count(1)
+
+
+class _InotifyBackend:
+    """基于inotify的监听（通过ctypes调用libc，无需第三方依赖）"""
+
+    name = "inotify"
+    # 变化发生后立即收到通知，可以作为状态缓存的工作区变化标记
+    event_driven = True
+
+    IN_MODIFY = 0x00000002
+    IN_ATTRIB = 0x00000004
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ISDIR = 0x40000000
+
+    WATCH_MASK = (
+        IN_MODIFY
+        | IN_ATTRIB
+        | IN_CLOSE_WRITE
+        | IN_MOVED_FROM
+        | IN_MOVED_TO
+        | IN_CREATE
+        | IN_DELETE
+        | IN_DELETE_SELF
+    )
+
+    _EVENT_HEADER = struct.Struct("iIII")
+
+    def __init__(self, specs: WatchSpec, skip_dir: Callable[[Path], bool]):
+        # 只在第一次监听仓库时加载ctypes，不增加后端启动耗时
+        import ctypes
+        import ctypes.util
+
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._libc = libc
+        self._skip_dir = skip_dir
+        self._watches: Dict[int, Tuple[Path, bool]] = {}
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        try:
+            for path, recursive in specs:
+                self._add_watch(path, recursive, strict=True)
+        except OSError:
+            self.close()
+            raise
+
+    def _add_watch(self, path: Path, recursive: bool, strict: bool = False):
+        """
+        添加目录监听
+
+        Args:
+            path: 目录路径
+            recursive: 是否递归监听子目录
+            strict: 为True时监听数量超限等错误直接抛出（初始化阶段退化为轮询）
+        """
+        import ctypes
+
+        wd = self._libc.inotify_add_watch(
+            self._fd, os.fsencode(path), ctypes.c_uint32(self.WATCH_MASK)
+        )
+        if wd < 0:
+            err = ctypes.get_errno()
+            if strict and err in (errno.ENOSPC, errno.ENOMEM, errno.EMFILE):
+                raise OSError(err, os.strerror(err))
+            return
+        self._watches[wd] = (path, recursive)
+
+        if not recursive:
+            return
+        try:
+            entries = list(os.scandir(path))
+        except OSError:
+            return
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                child = Path(entry.path)
+                if not self._skip_dir(child):
+                    self._add_watch(child, True, strict)
+
+    def poll(self, timeout: float) -> List[str]:
+        """
+        等待变化
+
+        Args:
+            timeout: 最长等待时间（秒）
+
+        Returns:
+            发生变化的绝对路径列表；超时返回空列表
+        """
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return []
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        paths = []
+        offset = 0
+        header = self._EVENT_HEADER
+        while offset + header.size <= len(data):
+            wd, mask, _cookie, length = header.unpack_from(data, offset)
+            offset += header.size
+            name = data[offset : offset + length].rstrip(b"\0")
+            offset += length
+
+            if mask & self.IN_Q_OVERFLOW:
+                paths.append(OVERFLOW)
+                continue
+            watch = self._watches.get(wd)
+            if watch is None:
+                continue
+            if mask & self.IN_IGNORED:
+                # 目录被删除或移走，内核已自动移除监听
+                self._watches.pop(wd, None)
+                continue
+
+            directory, recursive = watch
+            path = directory / os.fsdecode(name) if name else directory
+            paths.append(str(path))
+
+            if (
+                recursive
+                and mask & self.IN_ISDIR
+                and mask & (self.IN_CREATE | self.IN_MOVED_TO)
+                and not self._skip_dir(path)
+            ):
+                self._add_watch(path, True)
+                # 新目录在添加监听之前可能已经写入了文件
+                paths.extend(str(p) for p in _walk_files(path, self._skip_dir))
+        return paths
+
+    def close(self):
+        """关闭inotify文件描述符"""
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+        self._watches.clear()
+
+
+class _WatchfilesBackend:
+    """基于watchfiles的监听（macOS上使用FSEvents，Windows上使用ReadDirectoryChangesW）"""
+
+    name = "watchfiles"
+    # 变化发生后立即收到通知，可以作为状态缓存的工作区变化标记
+    event_driven = True
+
+    def __init__(self, specs: WatchSpec, skip_dir: Callable[[Path], bool]):
+        import watchfiles
+
+        self._stop = threading.Event()
+        # 工作区目录已经包含.git，只需监听不在其他目录内的根目录
+        roots = {path for path, _ in specs}
+        roots = [p for p in roots if not any(r in p.parents for r in roots)]
+        self._changes = watchfiles.watch(
+            *roots,
+            # 默认过滤器会忽略.git目录，这里需要接收HEAD、refs和index的变化
+            watch_filter=None,
+            stop_event=self._stop,
+            yield_on_timeout=True,
+            rust_timeout=int(DEBOUNCE_SECONDS * 1000),
+            debounce=int(DEBOUNCE_SECONDS * 1000),
+            step=50,
+            raise_interrupt=False,
+        )
+
+    def poll(self, timeout: float) -> List[str]:
+        """等待变化，返回发生变化的绝对路径列表（.git内部和忽略文件由调用方过滤）"""
+        try:
+            changes = next(self._changes)
+        except StopIteration:
+            return []
+        return [path for _change, path in changes]
+
+    def close(self):
+        self._stop.set()
+        self._changes.close()
+
+
+class _PollingBackend:
+    """轮询监听：定期比较文件的修改时间和大小"""
+
+    name = "polling"
+    # 变化要等到下一次扫描才能发现，期间状态缓存不能把结果当作确定的
+    event_driven = False
+
+    def __init__(
+        self,
+        specs: WatchSpec,
+        skip_dir: Callable[[Path], bool],
+        interval: float = POLL_INTERVAL,
+    ):
+        self._specs = specs
+        self._skip_dir = skip_dir
+        self._interval = interval
+        self._snapshot = self._scan()
+        self._next_scan = time.monotonic() + interval
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        snapshot = {}
+        for root, recursive in self._specs:
+            if recursive:
+                files = _walk_files(root, self._skip_dir)
+            else:
+                try:
+                    files = [Path(e.path) for e in os.scandir(root) if e.is_file()]
+                except OSError:
+                    files = []
+            for path in files:
+                try:
+                    st = path.stat()
+                except OSError:
+                    continue
+                snapshot[str(path)] = (st.st_mtime_ns, st.st_size)
+        return snapshot
+
+    def poll(self, timeout: float) -> List[str]:
+        """到达扫描时间时比较快照，返回发生变化的绝对路径列表"""
+        wait = self._next_scan - time.monotonic()
+        if wait > timeout:
+            time.sleep(timeout)
+            return []
+        if wait > 0:
+            time.sleep(wait)
+        self._next_scan = time.monotonic() + self._interval
+
+        snapshot = self._scan()
+        old = self._snapshot
+        self._snapshot = snapshot
+        changed = [path for path, stamp in snapshot.items() if old.get(path) != stamp]
+        changed.extend(path for path in old if path not in snapshot)
+        return changed
+
+    def close(self):
+        self._snapshot = {}
+
+
+def _walk_files(root: Path, skip_dir: Callable[[Path], bool]) -> List[Path]:
+    """递归列出目录下的文件（跳过skip_dir为True的目录）"""
+    files = []
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            continue
+        for entry in entries:
+            path = Path(entry.path)
+            if entry.is_dir(follow_symlinks=False):
+                if not skip_dir(path):
+                    stack.append(path)
+            else:
+                files.append(path)
+    return files
+
+
+def _create_backend(specs: WatchSpec, skip_dir: Callable[[Path], bool]):
+    """按配置和平台选择监听后端，原生监听不可用时退化为轮询"""
+    backend = WATCHER_BACKEND
+    if backend in ("auto", "inotify") and sys.platform.startswith("linux"):
+        try:
+            return _InotifyBackend(specs, skip_dir)
+        except (OSError, AttributeError) as e:
+            print(f"WARNING: inotify不可用，使用轮询监听: {e}")
+    elif backend in ("auto", "watchfiles"):
+        try:
+            return _WatchfilesBackend(specs, skip_dir)
+        except ImportError:
+            pass
+    return _PollingBackend(specs, skip_dir)
+
+
+class RepoWatcher:
+    """
+    单个仓库的文件监听器
+
+    在后台线程中等待变化，合并短时间内的连续变化后按类型分发事件；
+    工作区变化会过滤掉.gitignore忽略的文件和系统文件
+    """
+
+    def __init__(self, wrapper: GitWrapper, listener: Callable[[Dict[str, Any]], None]):
+        """
+        初始化RepoWatcher
+
+        Args:
+            wrapper: 仓库对应的GitWrapper
+            listener: 事件回调（在监听线程中调用）
+        """
+        self.wrapper = wrapper
+        self.repo_path = wrapper.repo_path
+        self._listener = listener
+        self.git_dir = wrapper.metadata.git_dir
+        if self.git_dir is None:
+            raise GitError(f"路径 {self.repo_path} 不是Git仓库")
+        self.common_dir = common_git_dir(self.git_dir)
+        # 工作区变化计数，每推送一次worktree_changed加一；
+        # 重新启动的监听器从0开始计数，用实例编号区分
+        self.generation = 0
+        self.instance = next(_watcher_ids)
+        # 已收到变化但尚未归类推送（此时工作区状态不确定）
+        self.settling = False
+        self.backend_name: Optional[str] = None
+        self._ignored_dirs: Set[str] = set()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._backend = None
+
+    def _load_ignored_dirs(self):
+        """读取被忽略的目录（如node_modules），这些目录不需要监听"""
+        self._ignored_dirs = self.wrapper.get_ignored_dirs()
+
+    def _skip_dir(self, path: Path) -> bool:
+        """是否跳过该目录的监听"""
+        if path.name == ".git":
+            return True
+        try:
+            rel = path.relative_to(self.repo_path).as_posix()
+        except ValueError:
+            return False
+        return rel in self._ignored_dirs
+
+    def _watch_specs(self) -> WatchSpec:
+        specs = [(self.repo_path, True), (self.git_dir, False)]
+        if self.common_dir != self.git_dir:
+            specs.append((self.common_dir, False))
+        heads = self.common_dir / "refs" / "heads"
+        heads.mkdir(parents=True, exist_ok=True)
+        specs.append((heads, True))
+        return specs
+
+    def start(self):
+        """启动监听线程"""
+        if self._thread is not None:
+            return
+        self._load_ignored_dirs()
+        self._backend = _create_backend(self._watch_specs(), self._skip_dir)
+        self.backend_name = self._backend.name
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name=f"repo-watcher:{self.repo_path.name}", daemon=True
+        )
+        self._thread.start()
+        # 只有事件驱动的后端登记为工作区监听器；轮询后端发现变化前有最长
+        # POLL_INTERVAL的延迟，状态缓存仍按目录签名和有效期判断
+        if self._backend.event_driven:
+            worktree_monitors.register(self.repo_path, self)
+
+    def stop(self):
+        """停止监听线程"""
+        worktree_monitors.unregister(self.repo_path, self)
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        if self._backend is not None:
+            self._backend.close()
+            self._backend = None
+
+    def _run(self):
+        backend = self._backend
+        while not self._stop.is_set():
+            try:
+                paths = backend.poll(0.5)
+                if not paths:
+                    continue
+                self.settling = True
+
+                # 合并连续的变化：等到DEBOUNCE_SECONDS内没有新变化或达到最长合并时间
+                pending = set(paths)
+                deadline = time.monotonic() + MAX_BATCH_SECONDS
+                while time.monotonic() < deadline and not self._stop.is_set():
+                    more = backend.poll(DEBOUNCE_SECONDS)
+                    if not more:
+                        break
+                    pending.update(more)
+
+                events = self.classify(pending)
+                self.settling = False
+                for event in events:
+                    self._listener(event)
+            except Exception as e:
+                self.settling = False
+                # 监听线程不能因为单次失败退出
+                print(f"WARNING: 文件监听失败: {e}")
+                self._stop.wait(1)
+
+    def _current_branch_ref(self) -> Optional[str]:
+        """HEAD指向的分支引用，如 refs/heads/main；分离HEAD时返回None"""
+        try:
+            content = (self.git_dir / "HEAD").read_text(encoding="utf-8").strip()
+        except OSError:
+            return None
+        if content.startswith("ref: "):
+            return content[5:]
+        return None
+
+    def _filter_ignored(self, rel_paths: Iterable[str]) -> List[str]:
+        """过滤掉系统文件和.gitignore忽略的文件"""
+        candidates = SYSTEM_FILE_MATCHER.filter(rel_paths)
+        if not candidates:
+            return []
+        result = self.wrapper._run_git_command(
+            ["check-ignore", "-z", "--stdin"],
+            check=False,
+            input="\0".join(candidates) + "\0",
+        )
+        ignored = set(result.stdout.split("\0"))
+        return [path for path in candidates if path not in ignored]
+
+    def classify(self, paths: Iterable[str]) -> List[Dict[str, Any]]:
+        """
+        将变化的路径归类为事件
+
+        Args:
+            paths: 发生变化的绝对路径
+
+        Returns:
+            事件列表，每个事件包含type、paths、generation
+        """
+        types: Set[str] = set()
+        worktree_paths = []
+        gitignore_changed = False
+        current_ref = self._current_branch_ref()
+
+        for path in paths:
+            if path == OVERFLOW:
+                types.update(EVENT_TYPES)
+                gitignore_changed = True
+                continue
+            if path.endswith(".lock"):
+                continue
+            path = Path(path)
+
+            for base in (self.git_dir, self.common_dir):
+                try:
+                    rel = path.relative_to(base).as_posix()
+                except ValueError:
+                    continue
+                if rel == "HEAD":
+                    types.update(("head_moved", "branches_changed"))
+                elif rel == "index":
+                    types.add("worktree_changed")
+                elif rel == "packed-refs" or rel.startswith("refs/heads/"):
+                    types.add("branches_changed")
+                    if rel == "packed-refs" or rel == current_ref:
+                        types.add("head_moved")
+                break
+            else:
+                try:
+                    rel = path.relative_to(self.repo_path).as_posix()
+                except ValueError:
+                    continue
+                if rel == ".git" or rel.startswith(".git/"):
+                    continue
+                if path.name == ".gitignore":
+                    gitignore_changed = True
+                worktree_paths.append(rel)
+
+        if gitignore_changed:
+            self._load_ignored_dirs()
+            types.add("worktree_changed")
+        if worktree_paths:
+            worktree_paths = self._filter_ignored(sorted(set(worktree_paths)))
+            if worktree_paths:
+                types.add("worktree_changed")
+
+        events = []
+        for event_type in EVENT_TYPES:
+            if event_type not in types:
+                continue
+            if event_type == "worktree_changed":
+                self.generation += 1
+            events.append(
+                {
+                    "type": event_type,
+                    "paths": (
+                        worktree_paths[:MAX_EVENT_PATHS]
+                        if event_type == "worktree_changed"
+                        else []
+                    ),
+                    "generation": self.generation,
+                    "timestamp": time.time(),
+                }
+            )
+        return events
+
+
+class _Subscriber:
+    """SSE订阅者：把监听线程中的事件转交到订阅者所在的事件循环"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(
+            SUBSCRIBER_QUEUE_SIZE
+        )
+
+    def _put(self, event: Dict[str, Any]):
+        if self.queue.full():
+            # 客户端消费太慢时丢弃最早的事件，事件只是重新获取数据的信号
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+    def deliver(self, event: Dict[str, Any]):
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            # 事件循环已关闭
+            pass
+
+
+class WatcherManager:
+    """
+    按仓库管理文件监听器
+
+    第一个订阅者出现时启动监听，最后一个订阅者离开时停止
+    """
+
+    def __init__(self):
+        self._watchers: Dict[Path, RepoWatcher] = {}
+        self._subscribers: Dict[Path, List[_Subscriber]] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(
+        self, wrapper: GitWrapper, loop: asyncio.AbstractEventLoop
+    ) -> Tuple[RepoWatcher, _Subscriber]:
+        """
+        订阅仓库的变化事件
+
+        Args:
+            wrapper: 仓库对应的GitWrapper
+            loop: 接收事件的事件循环
+
+        Returns:
+            (监听器, 订阅者)，事件从订阅者的queue中读取
+
+        Raises:
+            GitError: 不是Git仓库
+        """
+        repo_path = wrapper.repo_path
+        subscriber = _Subscriber(loop)
+        with self._lock:
+            watcher = self._watchers.get(repo_path)
+            if watcher is None:
+                watcher = RepoWatcher(
+                    wrapper, lambda event: self._dispatch(repo_path, event)
+                )
+                watcher.start()
+                self._watchers[repo_path] = watcher
+            self._subscribers.setdefault(repo_path, []).append(subscriber)
+        return watcher, subscriber
+
+    def unsubscribe(self, repo_path: Path, subscriber: _Subscriber):
+        """取消订阅，没有订阅者时停止监听"""
+        watcher = None
+        with self._lock:
+            subscribers = self._subscribers.get(repo_path, [])
+            if subscriber in subscribers:
+                subscribers.remove(subscriber)
+            if not subscribers:
+                self._subscribers.pop(repo_path, None)
+                watcher = self._watchers.pop(repo_path, None)
+        if watcher is not None:
+            watcher.stop()
+
+    def get(self, repo_path: Path) -> Optional[RepoWatcher]:
+        """获取仓库正在运行的监听器"""
+        with self._lock:
+            return self._watchers.get(repo_path)
+
+    def _dispatch(self, repo_path: Path, event: Dict[str, Any]):
+        with self._lock:
+            subscribers = list(self._subscribers.get(repo_path, []))
+        for subscriber in subscribers:
+            subscriber.deliver(event)
+
+    def stop_all(self):
+        """停止所有监听器"""
+        with self._lock:
+            watchers = list(self._watchers.values())
+            self._watchers.clear()
+            self._subscribers.clear()
+        for watcher in watchers:
+            watcher.stop()
+
+
+# 进程级共享的监听器管理器
+repo_watchers = WatcherManager()
@@ -0,0 +1,62 @@
+"""
+测试共用的fixture
+"""
+
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Dict, List
+
+import pytest
+
+from services.git_wrapper import GitWrapper
+
+
+def commit_files(wrapper: GitWrapper, commits: List[Dict[str, str]]):
+    """
+    按顺序写入文件并各创建一个提交（提交消息为 "提交 <序号>"）
+
+    Args:
+        wrapper: 已初始化的仓库
+        commits: 每个元素是 {相对路径: 文件内容}，对应一个提交
+    """
+    for i, files in enumerate(commits):
+        for name, content in files.items():
+            path = Path(wrapper.repo_path) / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(content)
+        wrapper.create_commit(f"提交 {i}")
+
+
+@pytest.fixture
+def temp_dir():
+    """创建临时目录用于测试"""
+    temp_path = tempfile.mkdtemp()
+    yield temp_path
+    shutil.rmtree(temp_path, ignore_errors=True)
+
+
+@pytest.fixture
+def initialized_repo(temp_dir):
+    """创建已初始化的Git仓库（只有初始化时的提交）"""
+    wrapper = GitWrapper(temp_dir)
+    wrapper.init_repository()
+    return wrapper
+
+
+@pytest.fixture
+def repo_commits():
+    """repo创建的提交，测试模块可以覆盖"""
+    return [{"a.txt": "a"}]
+
+
+@pytest.fixture
+def repo(request, initialized_repo, repo_commits):
+    """
+    创建带提交的仓库
+
+    提交内容来自repo_commits，也可以通过
+    @pytest.mark.parametrize("repo", [提交列表], indirect=True) 指定
+    """
+    commit_files(initialized_repo, getattr(request, "param", repo_commits))
+    return initialized_repo
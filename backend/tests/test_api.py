@@ -3,6 +3,8 @@ API端点集成测试
 使用FastAPI TestClient测试所有API端点
 """
 
+import asyncio
+import json
 import shutil
 import tempfile
 from pathlib import Path
@@ -11,6 +13,8 @@ import pytest
 from fastapi.testclient import TestClient
 
 from main import app
+from services.blob_cache import blob_cache
+from services.git_wrapper import GitWrapper
 
 client = TestClient(app)
 
@@ -373,3 +377,413 @@ class TestAPIResponseFormat:
 
         assert response.status_code >= 400
         assert "detail" in response.json()
+
+
+class TestLogPaginationAPI:
+    """测试提交历史分页和流式输出"""
+
+    def _create_commits(self, temp_repo, count):
+        client.post("/api/repository/init", json={"path": temp_repo})
+        for i in range(count):
+            (Path(temp_repo) / f"file{i}.txt").write_text(str(i))
+            client.post(
+                "/api/repository/commit",
+                json={"path": temp_repo, "message": f"提交 {i}"},
+            )
+
+    def test_cursor_pagination(self, temp_repo):
+        """测试按游标翻页"""
+        self._create_commits(temp_repo, 5)
+
+        seen = []
+        cursor = None
+        while True:
+            url = f"/api/repository/log?path={temp_repo}&page_size=2"
+            if cursor:
+                url += f"&after={cursor}"
+            data = client.get(url).json()["data"]
+            assert data["total"] == 6
+            seen.extend(c["id"] for c in data["logs"])
+            cursor = data["next_cursor"]
+            if not cursor:
+                break
+
+        full = client.get(f"/api/repository/log?path={temp_repo}").json()["data"]
+        assert seen == [c["id"] for c in full["logs"]]
+
+    def test_pages_from_cache_without_git(self, temp_repo, monkeypatch):
+        """测试历史已缓存时翻页（包括总数）不再执行git命令"""
+        self._create_commits(temp_repo, 3)
+        full = client.get(f"/api/repository/log?path={temp_repo}").json()["data"]
+
+        def fail(*args, **kwargs):
+            raise AssertionError("不应执行git命令")
+
+        monkeypatch.setattr(GitWrapper, "_run_git_command", fail)
+        monkeypatch.setattr(GitWrapper, "_run_git_command_async", fail)
+        cursor = full["logs"][0]["id"]
+        data = client.get(
+            f"/api/repository/log?path={temp_repo}&page_size=2&after={cursor}"
+        ).json()["data"]
+
+        assert data["total"] == full["total"]
+        assert [c["id"] for c in data["logs"]] == [c["id"] for c in full["logs"][1:3]]
+
+    def test_invalid_cursor(self, temp_repo):
+        """测试无效游标返回400"""
+        self._create_commits(temp_repo, 1)
+
+        response = client.get(f"/api/repository/log?path={temp_repo}&after=nope")
+
+        assert response.status_code == 400
+
+    def test_stream_ndjson(self, temp_repo):
+        """测试NDJSON流式输出"""
+        self._create_commits(temp_repo, 3)
+
+        response = client.get(f"/api/repository/log?path={temp_repo}&stream=true")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [c["message"] for c in lines[:3]] == ["提交 2", "提交 1", "提交 0"]
+        assert len(lines) == 4
+
+    def test_stats(self, temp_repo):
+        """测试按需附带变更统计"""
+        self._create_commits(temp_repo, 2)
+
+        plain = client.get(f"/api/repository/log?path={temp_repo}").json()["data"]
+        response = client.get(f"/api/repository/log?path={temp_repo}&stats=true")
+
+        assert plain["logs"][0]["stats"] is None
+        logs = response.json()["data"]["logs"]
+        assert logs[0]["stats"] == {"files": 1, "insertions": 1, "deletions": 0}
+
+    def test_stream_not_a_repo(self, temp_repo):
+        """测试流式输出时仓库不存在返回404"""
+        response = client.get(f"/api/repository/log?path={temp_repo}&stream=true")
+
+        assert response.status_code == 404
+
+
+class TestMaintenanceAPI:
+    """测试仓库维护API"""
+
+    def test_status_and_trigger(self, temp_repo):
+        """测试查询维护状态和手动触发"""
+        client.post("/api/repository/init", json={"path": temp_repo})
+        (Path(temp_repo) / "a.txt").write_text("a")
+        client.post("/api/repository/commit", json={"path": temp_repo, "message": "a"})
+
+        status = client.get(f"/api/repository/maintenance?path={temp_repo}").json()
+        assert status["data"]["stats"]["loose_objects"] > 0
+        assert "commit-graph" in status["data"]["planned_tasks"]
+
+        response = client.post(
+            "/api/repository/maintenance",
+            json={"path": temp_repo, "tasks": ["commit-graph", "repack"]},
+        )
+        data = response.json()
+        assert data["success"] is True
+        assert [t["task"] for t in data["data"]["tasks"]] == ["commit-graph", "repack"]
+
+        status = client.get(f"/api/repository/maintenance?path={temp_repo}").json()
+        assert status["data"]["stats"]["loose_objects"] == 0
+        assert status["data"]["last_run"]["trigger"] == "manual"
+
+    def test_invalid_task(self, temp_repo):
+        """测试未知任务返回400"""
+        client.post("/api/repository/init", json={"path": temp_repo})
+
+        response = client.post(
+            "/api/repository/maintenance", json={"path": temp_repo, "tasks": ["gc"]}
+        )
+
+        assert response.status_code == 400
+
+    def test_not_a_repo(self, temp_repo):
+        """测试非仓库返回404"""
+        response = client.get(f"/api/repository/maintenance?path={temp_repo}")
+
+        assert response.status_code == 404
+
+
+class TestEventsAPI:
+    """测试仓库变化事件流"""
+
+    def test_not_a_repo(self, temp_repo):
+        """测试非仓库返回404"""
+        response = client.get(f"/api/repository/events?path={temp_repo}")
+
+        assert response.status_code == 404
+
+    async def test_event_stream(self):
+        """测试事件流输出ready、变化事件和心跳"""
+        from api import repository
+
+        class FakeRequest:
+            async def is_disconnected(self):
+                return False
+
+        queue = asyncio.Queue()
+        unsubscribed = []
+
+        async def unsubscribe():
+            unsubscribed.append(True)
+
+        original = repository.SSE_KEEPALIVE_SECONDS
+        repository.SSE_KEEPALIVE_SECONDS = 0.01
+        try:
+            stream = repository._stream_events(
+                FakeRequest(), {"backend": "polling"}, queue, unsubscribe
+            )
+            first = await stream.__anext__()
+            await queue.put({"type": "head_moved", "paths": []})
+            second = await stream.__anext__()
+            third = await stream.__anext__()
+            await stream.aclose()
+        finally:
+            repository.SSE_KEEPALIVE_SECONDS = original
+
+        assert first.startswith(b"retry: 3000\n\nevent: ready\n")
+        assert second.startswith(b"event: head_moved\ndata: ")
+        assert third == b": keepalive\n\n"
+        assert unsubscribed == [True]
+
+
+class TestTreeAPI:
+    """测试目录树API"""
+
+    def test_get_tree(self, temp_repo):
+        """测试获取根目录和子目录"""
+        client.post("/api/repository/init", json={"path": temp_repo})
+        (Path(temp_repo) / "docs").mkdir()
+        (Path(temp_repo) / "docs" / "a.md").write_text("abc")
+        client.post("/api/repository/commit", json={"path": temp_repo, "message": "a"})
+
+        root = client.get(f"/api/repository/tree?path={temp_repo}").json()["data"]
+        assert root["children"][0]["name"] == "docs"
+        assert root["children"][0]["size"] == 3
+
+        sub = client.get(f"/api/repository/tree?path={temp_repo}&dir=docs").json()
+        assert sub["data"]["children"][0]["path"] == "docs/a.md"
+
+    def test_missing_dir(self, temp_repo):
+        """测试不存在的目录返回400"""
+        client.post("/api/repository/init", json={"path": temp_repo})
+
+        response = client.get(f"/api/repository/tree?path={temp_repo}&dir=nope")
+
+        assert response.status_code == 400
+
+
+class TestOverviewAPI:
+    """测试仓库概览API"""
+
+    def test_get_overview(self, temp_repo):
+        """测试一次返回状态、分支、文件、历史和耗时"""
+        client.post("/api/repository/init", json={"path": temp_repo})
+        (Path(temp_repo) / "a.txt").write_text("a")
+        client.post("/api/repository/commit", json={"path": temp_repo, "message": "a"})
+        (Path(temp_repo) / "b.txt").write_text("b")
+
+        response = client.get(f"/api/repository/overview?path={temp_repo}")
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["success"] is True
+        data = body["data"]
+        assert "a.txt" in data["files"]["files"]
+        assert data["log"]["total"] == len(data["log"]["logs"])
+        assert data["log"]["logs"][0]["message"] == "a"
+        assert data["branches"]["current"] in ("main", "master")
+        assert [c["file"] for c in data["status"]["changes"]] == ["b.txt"]
+        assert set(data["timings"]) == {"status", "branches", "files", "log", "total"}
+        assert data["errors"] == {}
+
+    def test_not_a_repository(self, temp_repo):
+        """测试非Git仓库返回404"""
+        response = client.get(f"/api/repository/overview?path={temp_repo}")
+
+        assert response.status_code == 404
+
+
+class TestMergePreviewAPI:
+    """测试合并预演和冲突详情API"""
+
+    @pytest.fixture
+    def conflict_repo(self, temp_repo):
+        """main和other修改了同一个文件，当前在other分支"""
+        file = Path(temp_repo) / "a.txt"
+        client.post("/api/repository/init", json={"path": temp_repo})
+        file.write_text("base")
+        client.post("/api/repository/commit", json={"path": temp_repo, "message": "a"})
+        client.post(
+            "/api/repository/branch", json={"path": temp_repo, "branch_name": "other"}
+        )
+        file.write_text("main")
+        client.post("/api/repository/commit", json={"path": temp_repo, "message": "b"})
+        client.post(
+            "/api/repository/switch", json={"path": temp_repo, "branch_name": "other"}
+        )
+        file.write_text("other")
+        client.post("/api/repository/commit", json={"path": temp_repo, "message": "c"})
+        return temp_repo
+
+    def test_preview_conflict(self, conflict_repo):
+        """测试返回冲突文件"""
+        response = client.get(
+            "/api/repository/merge/preview",
+            params={"path": conflict_repo, "source_branch": "main"},
+        )
+
+        assert response.status_code == 200
+        data = response.json()["data"]
+        assert data["clean"] is False
+        assert data["target"] == "other"
+        assert data["conflicts"] == ["a.txt"]
+        assert (Path(conflict_repo) / "a.txt").read_text() == "other"
+
+    def test_conflict_details(self, conflict_repo):
+        """测试一次返回冲突文件的三个版本"""
+        response = client.get(
+            "/api/repository/merge/conflicts",
+            params={"path": conflict_repo, "source_branch": "main"},
+        )
+
+        assert response.status_code == 200
+        data = response.json()["data"]
+        assert data["origin"] == "merge-tree"
+        stages = data["files"][0]["stages"]
+        assert [stages[name]["content"] for name in ("base", "ours", "theirs")] == [
+            "base",
+            "other",
+            "main",
+        ]
+
+    def test_unknown_branch(self, temp_repo):
+        """测试不存在的分支返回400"""
+        client.post("/api/repository/init", json={"path": temp_repo})
+
+        response = client.get(
+            "/api/repository/merge/preview",
+            params={"path": temp_repo, "source_branch": "missing"},
+        )
+
+        assert response.status_code == 400
+
+
+class TestBlobAPI:
+    """测试文件内容API"""
+
+    @pytest.fixture
+    def blob_repo(self, temp_repo):
+        """创建包含一个文本文件的仓库，返回提交ID"""
+        client.post("/api/repository/init", json={"path": temp_repo})
+        (Path(temp_repo) / "a.txt").write_bytes(b"0123456789")
+        client.post("/api/repository/commit", json={"path": temp_repo, "message": "a"})
+        log = client.get(f"/api/repository/log?path={temp_repo}").json()
+        return log["data"]["logs"][0]["id"]
+
+    def test_get_blob(self, temp_repo, blob_repo):
+        """测试按完整提交ID获取的内容可以长期缓存"""
+        params = {"path": temp_repo, "commit": blob_repo, "file": "a.txt"}
+        response = client.get("/api/repository/blob", params=params)
+
+        assert response.status_code == 200
+        assert response.content == b"0123456789"
+        assert response.headers["content-type"].startswith("text/plain")
+        assert response.headers["accept-ranges"] == "bytes"
+        assert "immutable" in response.headers["cache-control"]
+
+        etag = response.headers["etag"]
+        response = client.get(
+            "/api/repository/blob", params=params, headers={"If-None-Match": etag}
+        )
+        assert response.status_code == 304
+
+        params["commit"] = "main"
+        response = client.get("/api/repository/blob", params=params)
+        assert response.headers["etag"] == etag
+        assert response.headers["cache-control"] == "no-cache"
+
+    def test_range(self, temp_repo, blob_repo):
+        """测试字节范围、If-Range和无法满足的范围"""
+        params = {"path": temp_repo, "commit": blob_repo, "file": "a.txt"}
+        response = client.get(
+            "/api/repository/blob", params=params, headers={"Range": "bytes=2-4"}
+        )
+        assert response.status_code == 206
+        assert response.content == b"234"
+        assert response.headers["content-range"] == "bytes 2-4/10"
+
+        response = client.get(
+            "/api/repository/blob",
+            params=params,
+            headers={"Range": "bytes=2-4", "If-Range": '"stale"'},
+        )
+        assert response.status_code == 200
+        assert response.content == b"0123456789"
+
+        response = client.get(
+            "/api/repository/blob", params=params, headers={"Range": "bytes=20-"}
+        )
+        assert response.status_code == 416
+        assert response.headers["content-range"] == "bytes */10"
+
+    def test_streamed_range(self, temp_repo, blob_repo, monkeypatch):
+        """测试超过缓存上限的文件流式返回"""
+        monkeypatch.setattr(blob_cache, "max_blob_bytes", 4)
+        params = {"path": temp_repo, "commit": blob_repo, "file": "a.txt"}
+        response = client.get(
+            "/api/repository/blob", params=params, headers={"Range": "bytes=-3"}
+        )
+
+        assert response.status_code == 206
+        assert response.content == b"789"
+        assert response.headers["content-length"] == "3"
+
+    def test_missing_file(self, temp_repo, blob_repo):
+        """测试不存在的文件返回404"""
+        response = client.get(
+            "/api/repository/blob",
+            params={"path": temp_repo, "commit": blob_repo, "file": "b.txt"},
+        )
+
+        assert response.status_code == 404
+
+
+class TestConditionalAPI:
+    """测试ETag条件请求"""
+
+    @pytest.mark.parametrize("endpoint", ["log", "branches", "files"])
+    def test_not_modified(self, temp_repo, endpoint, monkeypatch):
+        """测试ETag有效时返回304且不执行git命令"""
+        client.post("/api/repository/init", json={"path": temp_repo})
+        url = f"/api/repository/{endpoint}?path={temp_repo}"
+        first = client.get(url)
+        etag = first.headers["etag"]
+
+        def fail(*args, **kwargs):
+            raise AssertionError("不应执行git命令")
+
+        monkeypatch.setattr(GitWrapper, "_run_git_command", fail)
+        response = client.get(url, headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.headers["etag"] == etag
+        assert response.content == b""
+
+    def test_modified_after_commit(self, temp_repo):
+        """测试提交后旧ETag失效"""
+        client.post("/api/repository/init", json={"path": temp_repo})
+        url = f"/api/repository/log?path={temp_repo}"
+        etag = client.get(url).headers["etag"]
+
+        (Path(temp_repo) / "a.txt").write_text("a")
+        client.post("/api/repository/commit", json={"path": temp_repo, "message": "a"})
+        response = client.get(url, headers={"If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
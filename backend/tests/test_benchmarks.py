@@ -0,0 +1,106 @@
+"""
+基准测试套件单元测试（只验证生成器和统计逻辑，不做性能断言）
+"""
+
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from benchmarks.repo_generator import (
+    MERGE_SOURCE_BRANCH,
+    PRESETS,
+    RepoSpec,
+    file_path,
+    generate_repo,
+)
+from benchmarks.startup import measure_startup, source_command
+from benchmarks.suite import compare_results, percentile, run_suite
+
+
+def git(repo: Path, *args: str) -> str:
+    return subprocess.run(
+        ["git", *args], cwd=repo, check=True, capture_output=True, text=True
+    ).stdout
+
+
+def test_generate_repo(temp_dir):
+    """测试生成的仓库规模与参数一致"""
+    spec = RepoSpec(files=40, commits=6, depth=3, untracked=7, branches=3)
+    repo = Path(temp_dir) / "repo"
+
+    generate_repo(repo, spec)
+
+    assert len(git(repo, "ls-files").splitlines()) == spec.files
+    assert git(repo, "rev-list", "--count", "main").strip() == str(spec.commits)
+    assert len(git(repo, "branch", "--list").splitlines()) == spec.branches + 2
+    untracked = git(repo, "ls-files", "--others").splitlines()
+    assert len(untracked) == spec.untracked
+    assert git(repo, "status", "--porcelain", "--untracked-files=no") == ""
+    assert file_path(100, 3).count("/") == 3
+
+
+def test_merge_source_merges_cleanly(temp_dir):
+    """测试合并源分支可以无冲突合并"""
+    repo = Path(temp_dir) / "repo"
+    generate_repo(repo, PRESETS["tiny"])
+
+    git(repo, "merge", "--no-edit", MERGE_SOURCE_BRANCH)
+
+    assert (repo / "merge" / "only-in-branch.txt").exists()
+
+
+def test_generate_repo_requires_empty_dir(temp_dir):
+    """测试目标目录不为空时报错"""
+    (Path(temp_dir) / "a.txt").write_text("a")
+
+    with pytest.raises(ValueError):
+        generate_repo(Path(temp_dir), PRESETS["tiny"])
+
+
+def test_percentile():
+    """测试百分位数插值"""
+    values = [float(v) for v in range(1, 11)]
+
+    assert percentile(values, 50) == 5.5
+    assert percentile(values, 95) == pytest.approx(9.55)
+    assert percentile([3.0], 95) == 3.0
+
+
+def test_compare_results():
+    """测试超过阈值和最小差值的指标才算回归"""
+    baseline = {
+        "a": {"p50_ms": 10.0, "p95_ms": 20.0, "peak_kib": 100.0},
+        "b": {"p50_ms": 0.1, "p95_ms": 0.2, "peak_kib": 1.0},
+    }
+    results = {
+        "a": {"p50_ms": 13.0, "p95_ms": 21.0, "peak_kib": 1000.0},
+        # 相对变化大但绝对差值小于1ms
+        "b": {"p50_ms": 0.5, "p95_ms": 0.9, "peak_kib": 2.0},
+        "new": {"p50_ms": 1.0, "p95_ms": 1.0, "peak_kib": 1.0},
+    }
+
+    regressions = compare_results(results, baseline, threshold=0.2)
+
+    assert [(r["case"], r["metric"]) for r in regressions] == [
+        ("a", "p50_ms"),
+        ("a", "peak_kib"),
+    ]
+
+
+def test_run_suite_smoke():
+    """测试套件可以在极小的仓库上执行（只运行部分用例）"""
+    report = run_suite(PRESETS["tiny"], iterations=2, name_filter="status")
+
+    assert {"get_status", "GET /status"} <= set(report["results"])
+    assert report["meta"]["repo"]["files"] == PRESETS["tiny"].files
+    stats = report["results"]["get_status"]
+    assert stats["p50_ms"] <= stats["p95_ms"] <= stats["max_ms"]
+
+
+def test_measure_startup():
+    """测试冷启动基准测试（启动源码后端一次）"""
+    results = measure_startup(source_command(), iterations=1, warmup=0)
+
+    assert set(results) == {"ready", "health"}
+    assert results["health"]["p50_ms"] >= results["ready"]["p50_ms"] > 0
@@ -0,0 +1,95 @@
+"""
+文件内容缓存单元测试
+"""
+
+import pytest
+
+from api.blob import (
+    IMMUTABLE_CACHE_CONTROL,
+    REVALIDATE_CACHE_CONTROL,
+    RangeNotSatisfiable,
+    cache_control,
+    media_type,
+    parse_range,
+)
+from services.blob_cache import BlobCache
+
+
+class TestBlobCache:
+    """测试按OID缓存的LRU"""
+
+    def test_get_put(self):
+        """测试命中和未命中统计"""
+        cache = BlobCache(max_bytes=100)
+        assert cache.get("a") is None
+        cache.put("a", b"abc")
+
+        assert cache.get("a") == b"abc"
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["bytes"] == 3
+
+    def test_evicts_by_bytes(self):
+        """测试超出字节预算时淘汰最久未使用的条目"""
+        cache = BlobCache(max_bytes=10)
+        cache.put("a", b"1234")
+        cache.put("b", b"1234")
+        cache.get("a")
+        cache.put("c", b"1234")
+
+        assert cache.get("b") is None
+        assert cache.get("a") == b"1234"
+        assert cache.stats()["bytes"] == 8
+        assert cache.stats()["evictions"] == 1
+
+    def test_skips_large_blob(self):
+        """测试超过单个上限的blob不缓存"""
+        cache = BlobCache(max_bytes=100, max_blob_bytes=4)
+        cache.put("a", b"12345")
+
+        assert not cache.cacheable(5)
+        assert cache.get("a") is None
+        assert cache.stats()["entries"] == 0
+
+
+class TestBlobResponse:
+    """测试Range解析和响应头"""
+
+    @pytest.mark.parametrize(
+        "header,expected",
+        [
+            (None, None),
+            ("bytes=0-3", (0, 4)),
+            ("bytes=5-", (5, 10)),
+            ("bytes=-3", (7, 10)),
+            ("bytes=-30", (0, 10)),
+            ("bytes=8-100", (8, 10)),
+            ("bytes=0-1,4-5", None),
+            ("items=0-1", None),
+            ("bytes=5-2", None),
+            ("bytes=abc", None),
+        ],
+    )
+    def test_parse_range(self, header, expected):
+        """测试单个范围、后缀范围和忽略的请求头"""
+        assert parse_range(header, 10) == expected
+
+    @pytest.mark.parametrize("header", ["bytes=10-", "bytes=-0"])
+    def test_unsatisfiable(self, header):
+        """测试超出文件大小的范围"""
+        with pytest.raises(RangeNotSatisfiable):
+            parse_range(header, 10)
+
+    def test_cache_control(self):
+        """测试只有完整提交ID的响应可以长期缓存"""
+        assert cache_control("a" * 40) == IMMUTABLE_CACHE_CONTROL
+        assert cache_control("main") == REVALIDATE_CACHE_CONTROL
+        assert cache_control("abc1234") == REVALIDATE_CACHE_CONTROL
+
+    def test_media_type(self):
+        """测试按扩展名和内容推断类型"""
+        assert media_type("a.png") == "image/png"
+        assert media_type("a.txt").startswith("text/plain")
+        assert media_type("Makefile", b"all:\n") == "text/plain; charset=utf-8"
+        assert media_type("data", b"\x00\x01") == "application/octet-stream"
@@ -0,0 +1,153 @@
+"""
+cat-file常驻进程单元测试
+"""
+
+from pathlib import Path
+
+import pytest
+
+from services.cat_file import CatFilePool, CatFileProcess
+from services.git_wrapper import GitWrapper
+
+
+@pytest.fixture
+def initialized_repo(temp_dir):
+    """创建已初始化的Git仓库"""
+    wrapper = GitWrapper(temp_dir)
+    wrapper.init_repository()
+    yield wrapper
+    wrapper.cat_file.close()
+
+
+@pytest.fixture
+def process(initialized_repo):
+    """创建独立的CatFileProcess"""
+    proc = CatFileProcess(initialized_repo.repo_path)
+    yield proc
+    proc.close()
+
+
+class TestCatFileProcess:
+    """测试cat-file常驻进程"""
+
+    def test_info_commit(self, process):
+        """测试查询提交对象信息"""
+        info = process.info("HEAD")
+
+        assert info is not None
+        oid, obj_type, size = info
+        assert len(oid) == 40
+        assert obj_type == "commit"
+        assert size > 0
+
+    def test_info_missing_object(self, process):
+        """测试查询不存在的对象"""
+        assert process.info("0" * 40) is None
+        assert process.info("no-such-ref") is None
+
+    def test_contents_blob(self, initialized_repo, process, temp_dir):
+        """测试读取文件内容"""
+        (Path(temp_dir) / "test.txt").write_text("hello chronos")
+        initialized_repo.create_commit("添加文件")
+
+        result = process.contents("HEAD:test.txt")
+
+        assert result is not None
+        assert result[1] == "blob"
+        assert result[2] == b"hello chronos"
+
+    def test_reuses_single_process(self, process):
+        """测试多次查询复用同一个进程"""
+        process.info("HEAD")
+        pid = next(iter(process._procs.values())).pid
+
+        for _ in range(5):
+            process.info("HEAD")
+
+        assert next(iter(process._procs.values())).pid == pid
+
+    def test_restart_after_crash(self, process):
+        """测试进程崩溃后自动重启"""
+        process.info("HEAD")
+        for proc in process._procs.values():
+            proc.kill()
+            proc.wait()
+
+        assert process.info("HEAD") is not None
+        assert process.restarts == 1
+
+    def test_health_check(self, process):
+        """测试健康检查"""
+        assert process.health_check() is True
+
+        process.close()
+        assert process.is_alive() is False
+
+    def test_sees_new_commits(self, initialized_repo, process, temp_dir):
+        """测试常驻进程能看到启动后新建的提交"""
+        before = process.info("HEAD")
+
+        (Path(temp_dir) / "new.txt").write_text("new")
+        initialized_repo.create_commit("新提交")
+
+        after = process.info("HEAD")
+        assert after[0] != before[0]
+
+
+class TestCatFilePool:
+    """测试cat-file进程池"""
+
+    def test_get_returns_same_process(self, initialized_repo):
+        """测试同一仓库共享进程"""
+        pool = CatFilePool()
+        try:
+            assert pool.get(initialized_repo.repo_path) is pool.get(
+                initialized_repo.repo_path
+            )
+        finally:
+            pool.close_all()
+
+    def test_reap_idle(self, initialized_repo):
+        """测试关闭空闲进程"""
+        pool = CatFilePool(idle_timeout=0)
+        try:
+            process = pool.get(initialized_repo.repo_path)
+            process.info("HEAD")
+            assert process.is_alive() is True
+
+            assert pool.reap_idle() == 1
+            assert process.is_alive() is False
+
+            # 关闭后仍可按需重新启动
+            assert process.info("HEAD") is not None
+        finally:
+            pool.close_all()
+
+
+class TestGitWrapperIntegration:
+    """测试GitWrapper通过常驻进程查询对象"""
+
+    def test_is_valid_commit(self, initialized_repo):
+        """测试提交ID验证"""
+        head = initialized_repo.get_log(limit=1)[0]["id"]
+
+        assert initialized_repo._is_valid_commit(head) is True
+        assert initialized_repo._is_valid_commit(head[:7]) is True
+        assert initialized_repo._is_valid_commit("invalid_commit_id") is False
+
+    def test_latest_commit_matches_git_log(self, initialized_repo, temp_dir):
+        """测试解析结果与git log格式一致"""
+        (Path(temp_dir) / "test.txt").write_text("content")
+        initialized_repo.create_commit("标题第一行\n标题第二行\n\n详细说明")
+
+        commit = initialized_repo._get_latest_commit()
+        result = initialized_repo._run_git_command(
+            ["log", "-1", "--pretty=format:%H|%an|%ae|%at|%s"]
+        )
+        parts = result.stdout.split("|")
+
+        assert commit["id"] == parts[0]
+        assert commit["author"] == parts[1]
+        assert commit["email"] == parts[2]
+        assert commit["timestamp"] == parts[3]
+        assert commit["message"] == parts[4]
@@ -0,0 +1,127 @@
+"""
+提交变更统计单元测试
+"""
+
+from pathlib import Path
+
+import pytest
+
+from services.commit_stats import CommitStatsCache, commit_stats_cache
+from services.git_wrapper import GitWrapper
+
+
+@pytest.fixture
+def repo(initialized_repo, temp_dir):
+    """创建包含修改、二进制文件、重命名和空提交的仓库"""
+    wrapper = initialized_repo
+    root = Path(temp_dir)
+    (root / "a.txt").write_text("".join(f"{i}\n" for i in range(50)))
+    (root / "bin").write_bytes(b"\x00\x01")
+    wrapper.create_commit("添加文件")
+    (root / "a.txt").rename(root / "b.txt")
+    (root / "b.txt").write_text("".join(f"{i}\n" for i in range(1, 52)))
+    wrapper.create_commit("重命名并修改")
+    wrapper._run_git_command(["commit", "--allow-empty", "-m", "空提交"])
+    commit_stats_cache.clear()
+    return wrapper
+
+
+class TestCommitStatsCache:
+    """测试按OID缓存的统计"""
+
+    def test_get_many(self):
+        """测试批量查询返回已缓存和未缓存的提交"""
+        cache = CommitStatsCache()
+        cache.put_many({"a": {"files": 1, "insertions": 2, "deletions": 3}})
+
+        found, missing = cache.get_many(["a", "b"])
+
+        assert found == {"a": {"files": 1, "insertions": 2, "deletions": 3}}
+        assert missing == ["b"]
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_evicts_oldest(self):
+        """测试超出条目数时淘汰最久未使用的提交"""
+        cache = CommitStatsCache(max_entries=2)
+        entry = {"files": 0, "insertions": 0, "deletions": 0}
+        cache.put_many({"a": entry, "b": entry})
+        cache.get_many(["a"])
+        cache.put_many({"c": entry})
+
+        _, missing = cache.get_many(["a", "b", "c"])
+
+        assert missing == ["b"]
+        assert cache.stats()["evictions"] == 1
+
+
+class TestGitWrapperCommitStats:
+    """测试get_log附带变更统计"""
+
+    def test_stats(self, repo):
+        """测试重命名、二进制文件和空提交的统计"""
+        logs = repo.get_log(with_stats=True)
+
+        # 最后一条是初始化仓库时的提交
+        assert [c["stats"] for c in logs[:3]] == [
+            {"files": 0, "insertions": 0, "deletions": 0},
+            {"files": 1, "insertions": 2, "deletions": 1},
+            {"files": 2, "insertions": 50, "deletions": 0},
+        ]
+        # 缓存中的提交字典不被修改
+        assert "stats" not in repo.get_log()[0]
+
+    def test_merge_has_no_stats(self, repo):
+        """测试合并提交的统计为None，与空提交区分"""
+        root = Path(repo.repo_path)
+        repo.create_branch("side")
+        repo.switch_branch("side")
+        (root / "side.txt").write_text("side\n")
+        repo.create_commit("分支提交")
+        repo.switch_branch("main")
+        (root / "main.txt").write_text("main\n")
+        repo.create_commit("主线提交")
+        assert repo.merge_branch("side")["success"] is True
+
+        logs = repo.get_log(with_stats=True)
+
+        assert logs[0]["is_merge"] is True
+        assert logs[0]["stats"] is None
+        empty = next(c for c in logs if c["message"] == "空提交")
+        assert empty["stats"] == {"files": 0, "insertions": 0, "deletions": 0}
+        assert commit_stats_cache.get_many([logs[0]["id"]])[1] == [logs[0]["id"]]
+
+    def test_only_new_commits_computed(self, repo, monkeypatch):
+        """测试再次加载时只为新提交计算统计"""
+        repo.get_log(with_stats=True)
+        (Path(repo.repo_path) / "c.txt").write_text("c\n")
+        repo.create_commit("新提交")
+
+        computed = []
+        original = GitWrapper._compute_commit_stats
+
+        def spy(self, commit_ids):
+            computed.append(list(commit_ids))
+            return original(self, commit_ids)
+
+        monkeypatch.setattr(GitWrapper, "_compute_commit_stats", spy)
+        logs = repo.get_log(with_stats=True)
+
+        assert computed == [[logs[0]["id"]]]
+        assert logs[0]["stats"] == {"files": 1, "insertions": 1, "deletions": 0}
+
+        repo.get_log(with_stats=True)
+        assert len(computed) == 1
+
+    def test_parse_stream(self):
+        """测试跨越数据块边界的输出解析"""
+        output = (
+            b"\x01" + b"1" * 40 + b"\x00\n3\t1\ta.txt\x00-\t-\tbin\x00"
+            b"\x01" + b"2" * 40 + b"\x00\n1\t0\t\x00old\x00new\x00"
+        )
+        chunks = [output[i : i + 5] for i in range(0, len(output), 5)]
+
+        assert dict(GitWrapper._iter_numstat(chunks)) == {
+            "1" * 40: {"files": 2, "insertions": 3, "deletions": 1},
+            "2" * 40: {"files": 1, "insertions": 1, "deletions": 0},
+        }
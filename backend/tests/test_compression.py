@@ -0,0 +1,129 @@
+"""
+响应压缩中间件单元测试
+"""
+
+import json
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from api.compression import CompressionMiddleware, CompressionStats, negotiate
+
+LARGE = {"logs": [{"author": "Chronos 用户", "email": "user@example.com"}] * 500}
+
+
+def create_client(stats: CompressionStats) -> TestClient:
+    """创建挂载压缩中间件的测试应用"""
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=1024, stats=stats)
+
+    @app.get("/large")
+    async def large():
+        return JSONResponse(LARGE)
+
+    @app.get("/small")
+    async def small():
+        return JSONResponse({"ok": True})
+
+    @app.get("/ndjson")
+    async def ndjson():
+        async def lines():
+            for i in range(3):
+                yield (json.dumps({"i": i, "pad": "x" * 2000}) + "\n").encode()
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    @app.get("/events")
+    async def events():
+        async def stream():
+            yield b"event: ready\ndata: {}\n\n" * 100
+
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    @app.get("/tagged")
+    async def tagged():
+        return PlainTextResponse("y" * 5000, headers={"ETag": '"abc"'})
+
+    return TestClient(app)
+
+
+class TestNegotiate:
+    """测试编码协商"""
+
+    def test_prefers_server_order(self):
+        """测试客户端权重相同时按服务端偏好选择"""
+        encoders = {"br": None, "gzip": None}
+
+        assert negotiate("gzip, br", encoders) == "br"
+        assert negotiate("gzip;q=1, br;q=0.5", encoders) == "gzip"
+        assert negotiate("br;q=0, gzip;q=0", encoders) is None
+        assert negotiate("*", encoders) == "br"
+        assert negotiate("identity", encoders) is None
+
+
+class TestCompressionMiddleware:
+    """测试压缩中间件"""
+
+    def test_large_response_compressed(self):
+        """测试大响应被压缩并记录统计"""
+        stats = CompressionStats()
+        client = create_client(stats)
+
+        response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert response.json() == LARGE
+        gzip_stats = stats.stats()["encodings"]["gzip"]
+        assert gzip_stats["responses"] == 1
+        assert gzip_stats["bytes_saved"] > 0
+        assert int(response.headers["content-length"]) == gzip_stats["bytes_out"]
+
+    def test_small_response_not_compressed(self):
+        """测试小于阈值的响应不压缩"""
+        stats = CompressionStats()
+        client = create_client(stats)
+
+        response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+
+        assert "content-encoding" not in response.headers
+        assert response.json() == {"ok": True}
+        assert stats.stats()["skipped_small"] == 1
+
+    def test_identity(self):
+        """测试客户端不接受压缩"""
+        client = create_client(CompressionStats())
+
+        response = client.get("/large", headers={"Accept-Encoding": "identity"})
+
+        assert "content-encoding" not in response.headers
+
+    def test_streaming_compressed(self):
+        """测试NDJSON流式响应逐块压缩"""
+        stats = CompressionStats()
+        client = create_client(stats)
+
+        response = client.get("/ndjson", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [line["i"] for line in lines] == [0, 1, 2]
+        assert stats.stats()["encodings"]["gzip"]["bytes_in"] == len(response.content)
+
+    def test_event_stream_not_compressed(self):
+        """测试SSE事件流不压缩"""
+        client = create_client(CompressionStats())
+
+        response = client.get("/events", headers={"Accept-Encoding": "gzip"})
+
+        assert "content-encoding" not in response.headers
+
+    def test_etag_becomes_weak(self):
+        """测试压缩后的强ETag改为弱ETag"""
+        client = create_client(CompressionStats())
+
+        response = client.get("/tagged", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["etag"] == 'W/"abc"'
@@ -0,0 +1,64 @@
+"""
+条件请求单元测试
+"""
+
+import subprocess
+
+from api.conditional import compute_etag, etag_matches
+from services.git_wrapper import GitWrapper
+
+
+def test_etag_matches():
+    """测试弱比较、多个ETag和通配符"""
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('W/"abc"', '"abc"')
+    assert etag_matches('"x", W/"abc"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches('"abd"', '"abc"')
+    assert not etag_matches(None, '"abc"')
+
+
+def test_etag_stable_and_distinct(repo):
+    """测试状态不变时ETag不变，不同接口的ETag不同"""
+    assert compute_etag(repo, "log") == compute_etag(repo, "log")
+    assert compute_etag(repo, "log") != compute_etag(repo, "files")
+    assert compute_etag(repo, "log", 10) != compute_etag(repo, "log", 20)
+
+
+def test_etag_changes_with_refs(repo):
+    """测试提交、创建分支和切换分支后ETag改变"""
+    etags = {compute_etag(repo, "log")}
+
+    (repo.repo_path / "b.txt").write_text("b")
+    repo.create_commit("第二个提交")
+    etags.add(compute_etag(repo, "log"))
+
+    repo.create_branch("feature")
+    etags.add(compute_etag(repo, "log"))
+
+    repo.switch_branch("feature")
+    etags.add(compute_etag(repo, "log"))
+
+    assert len(etags) == 4
+
+
+def test_etag_changes_with_packed_refs(repo):
+    """测试引用被打包后ETag改变（内容相同但存储位置变化）"""
+    before = compute_etag(repo, "branches")
+    subprocess.run(["git", "pack-refs", "--all"], cwd=repo.repo_path, check=True)
+
+    assert compute_etag(repo, "branches") != before
+
+
+def test_etag_changes_with_index(repo):
+    """测试暂存文件后ETag改变"""
+    before = compute_etag(repo, "files")
+    (repo.repo_path / "c.txt").write_text("c")
+    subprocess.run(["git", "add", "c.txt"], cwd=repo.repo_path, check=True)
+
+    assert compute_etag(repo, "files") != before
+
+
+def test_not_a_repository(temp_dir):
+    """测试非Git仓库没有ETag"""
+    assert compute_etag(GitWrapper(temp_dir), "log") is None
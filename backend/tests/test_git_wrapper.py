@@ -3,6 +3,7 @@ GitWrapper单元测试
 测试Git命令封装服务的核心功能
 """
 
+import asyncio
 import os
 import shutil
 import tempfile
@@ -14,32 +15,17 @@ from services.git_wrapper import (
     GitError,
     GitWrapper,
     InvalidPathError,
+    MergeConflictError,
     RepositoryNotFoundError,
 )
 
 
-@pytest.fixture
-def temp_dir():
-    """创建临时目录用于测试"""
-    temp_path = tempfile.mkdtemp()
-    yield temp_path
-    shutil.rmtree(temp_path, ignore_errors=True)
-
-
 @pytest.fixture
 def git_wrapper(temp_dir):
     """创建GitWrapper实例"""
     return GitWrapper(temp_dir)
 
 
-@pytest.fixture
-def initialized_repo(temp_dir):
-    """创建已初始化的Git仓库"""
-    wrapper = GitWrapper(temp_dir)
-    wrapper.init_repository()
-    return wrapper
-
-
 class TestGitWrapperInit:
     """测试GitWrapper初始化"""
 
@@ -266,6 +252,28 @@ class TestCheckout:
         assert result["success"] is False
         assert "未保存的变更" in result["message"]
 
+    @pytest.mark.parametrize("operation", ["switch_branch", "checkout_commit"])
+    def test_in_place_edit_after_cached_status(
+        self, initialized_repo, temp_dir, operation
+    ):
+        """测试状态缓存仍认为干净时，原地修改的文件也会阻止切换"""
+        file = Path(temp_dir) / "a.txt"
+        file.write_text("a")
+        initialized_repo.create_commit("添加a")
+        initialized_repo.create_branch("other")
+        target = "other" if operation == "switch_branch" else "HEAD~1"
+
+        assert initialized_repo.get_status()["is_clean"] is True
+        # 原地修改不改变目录的修改时间
+        with open(file, "r+") as f:
+            f.write("b")
+
+        result = getattr(initialized_repo, operation)(target)
+
+        assert result["success"] is False
+        assert result["has_changes"] is True
+        assert file.read_text() == "b"
+
 
 class TestBranchManagement:
     """测试分支管理功能"""
@@ -372,3 +380,518 @@ class TestErrorHandling:
         assert git_wrapper._is_valid_branch_name("invalid~branch") is False
         assert git_wrapper._is_valid_branch_name(".invalid") is False
         assert git_wrapper._is_valid_branch_name("invalid..name") is False
+
+
+class TestAsyncExecution:
+    """测试异步执行路径"""
+
+    async def test_run_git_command_async(self, initialized_repo):
+        """测试异步执行Git命令"""
+        result = await initialized_repo._run_git_command_async(["rev-parse", "HEAD"])
+
+        assert result.returncode == 0
+        assert len(result.stdout.strip()) == 40
+
+    async def test_run_git_command_async_failure(self, initialized_repo):
+        """测试异步命令失败时抛出GitError"""
+        with pytest.raises(GitError, match="Git命令执行失败"):
+            await initialized_repo._run_git_command_async(["checkout", "no-such"])
+
+        result = await initialized_repo._run_git_command_async(
+            ["checkout", "no-such"], check=False
+        )
+        assert result.returncode != 0
+
+    async def test_async_reads_match_sync(self, initialized_repo, temp_dir):
+        """测试异步读取方法与同步版本结果一致"""
+        (Path(temp_dir) / "committed.txt").write_text("content")
+        initialized_repo.create_commit("提交")
+        (Path(temp_dir) / "pending.txt").write_text("pending")
+
+        assert await initialized_repo.get_status_async() == (
+            initialized_repo.get_status()
+        )
+        assert await initialized_repo.get_tracked_files_async() == (
+            initialized_repo.get_tracked_files()
+        )
+        assert await initialized_repo.get_log_async() == initialized_repo.get_log()
+        assert await initialized_repo.get_branches_async() == (
+            initialized_repo.get_branches()
+        )
+
+    async def test_async_mutation(self, initialized_repo, temp_dir):
+        """测试异步写操作"""
+        (Path(temp_dir) / "test.txt").write_text("content")
+
+        result = await initialized_repo.create_commit_async("异步提交")
+
+        assert result["success"] is True
+        assert initialized_repo.get_status()["is_clean"] is True
+
+    async def test_concurrent_repositories(self):
+        """测试不同仓库的请求并发执行"""
+        paths = [tempfile.mkdtemp() for _ in range(3)]
+        try:
+            wrappers = [GitWrapper(p) for p in paths]
+            for wrapper in wrappers:
+                wrapper.init_repository()
+
+            results = await asyncio.gather(*(w.get_log_async() for w in wrappers))
+
+            assert all(len(log) == 1 for log in results)
+        finally:
+            for p in paths:
+                shutil.rmtree(p, ignore_errors=True)
+
+    async def test_get_status_async_not_a_repo(self, git_wrapper):
+        """测试在非Git仓库中异步获取状态"""
+        with pytest.raises(RepositoryNotFoundError):
+            await git_wrapper.get_status_async()
+
+
+class TestPathspecBatch:
+    """测试批量路径执行"""
+
+    def _count_git_calls(self, wrapper, monkeypatch):
+        calls = []
+        original = wrapper._run_git_command
+
+        def counting(args, *a, **kw):
+            calls.append(args[0])
+            return original(args, *a, **kw)
+
+        monkeypatch.setattr(wrapper, "_run_git_command", counting)
+        return calls
+
+    def test_add_many_files_single_process(
+        self, initialized_repo, temp_dir, monkeypatch
+    ):
+        """测试大量文件只启动一个git add进程"""
+        files = [f"dir{i % 5}/file {i}.txt" for i in range(300)]
+        for name in files:
+            path = Path(temp_dir) / name
+            path.parent.mkdir(exist_ok=True)
+            path.write_text(name)
+
+        calls = self._count_git_calls(initialized_repo, monkeypatch)
+        result = initialized_repo._run_pathspec_batch(["add"], files)
+
+        assert calls == ["add"]
+        assert sorted(result["succeeded"]) == sorted(files)
+        assert result["failed"] == []
+
+    def test_chunking(self, initialized_repo, temp_dir, monkeypatch):
+        """测试按分块大小拆分进程"""
+        files = [f"file{i}.txt" for i in range(10)]
+        for name in files:
+            (Path(temp_dir) / name).write_text(name)
+
+        calls = self._count_git_calls(initialized_repo, monkeypatch)
+        result = initialized_repo._run_pathspec_batch(["add"], files, chunk_size=4)
+
+        assert calls == ["add", "add", "add"]
+        assert len(result["succeeded"]) == 10
+
+    def test_reports_per_file_failures(self, initialized_repo, temp_dir, monkeypatch):
+        """测试报告无法匹配的文件且不退化为逐个执行"""
+        (Path(temp_dir) / "ok1.txt").write_text("1")
+        (Path(temp_dir) / "ok2.txt").write_text("2")
+        files = ["ok1.txt", "missing1.txt", "ok2.txt", "missing2.txt"]
+
+        calls = self._count_git_calls(initialized_repo, monkeypatch)
+        result = initialized_repo._run_pathspec_batch(["add"], files)
+
+        assert sorted(result["succeeded"]) == ["ok1.txt", "ok2.txt"]
+        assert sorted(f["file"] for f in result["failed"]) == [
+            "missing1.txt",
+            "missing2.txt",
+        ]
+        assert calls.count("add") == 2
+
+    def test_add_deleted_tracked_file(self, initialized_repo, temp_dir):
+        """测试已删除的追踪文件可以被暂存"""
+        file = Path(temp_dir) / "gone.txt"
+        file.write_text("content")
+        initialized_repo.create_commit("添加文件")
+        file.unlink()
+
+        result = initialized_repo._run_pathspec_batch(["add"], ["gone.txt"])
+
+        assert result["succeeded"] == ["gone.txt"]
+
+    def test_rm_cached_and_restore(self, initialized_repo, temp_dir):
+        """测试批量rm --cached和restore --staged"""
+        for name in ["a.txt", "b.txt"]:
+            (Path(temp_dir) / name).write_text(name)
+        initialized_repo.create_commit("添加文件")
+
+        result = initialized_repo._run_pathspec_batch(
+            ["rm", "--cached", "-q"], ["a.txt", "b.txt", "nope.txt"], worktree=False
+        )
+        assert sorted(result["succeeded"]) == ["a.txt", "b.txt"]
+        assert [f["file"] for f in result["failed"]] == ["nope.txt"]
+
+        result = initialized_repo._run_pathspec_batch(
+            ["restore", "--staged"], ["a.txt", "b.txt"], worktree=False
+        )
+        assert sorted(result["succeeded"]) == ["a.txt", "b.txt"]
+        assert initialized_repo.get_status()["is_clean"] is True
+
+    def test_create_commit_missing_file(self, initialized_repo, temp_dir):
+        """测试选择的文件不存在时报告失败文件"""
+        (Path(temp_dir) / "exists.txt").write_text("content")
+
+        with pytest.raises(GitError, match="missing.txt"):
+            initialized_repo.create_commit("提交", files=["exists.txt", "missing.txt"])
+
+
+class TestStatusPorcelainV2:
+    """测试基于porcelain v2的状态解析"""
+
+    def test_single_git_process(self, initialized_repo, temp_dir, monkeypatch):
+        """测试获取状态只启动一个git进程"""
+        (Path(temp_dir) / "test.txt").write_text("content")
+        # 被忽略目录列表按.gitignore签名缓存，不属于每次获取状态的开销
+        initialized_repo.get_ignored_dirs()
+        calls = []
+        original = initialized_repo._run_git_command
+
+        def counting(args, *a, **kw):
+            calls.append(args)
+            return original(args, *a, **kw)
+
+        monkeypatch.setattr(initialized_repo, "_run_git_command", counting)
+        status = initialized_repo.get_status()
+
+        assert len(calls) == 1
+        assert status["branch"] == "main"
+        assert len(status["head"]) == 40
+
+    def test_special_file_names(self, initialized_repo, temp_dir):
+        """测试包含空格、引号、中文和换行的文件名"""
+        names = ["with space.txt", 'quote"d.txt', "中文 文件.txt", "new\nline.txt"]
+        for name in names:
+            (Path(temp_dir) / name).write_text("content")
+
+        status = initialized_repo.get_status()
+
+        assert sorted(c["file"] for c in status["changes"]) == sorted(names)
+        assert all(c["status"] == "added" for c in status["changes"])
+
+    def test_rename(self, initialized_repo, temp_dir):
+        """测试重命名记录新旧路径"""
+        (Path(temp_dir) / "old name.txt").write_text("content " * 20)
+        initialized_repo.create_commit("添加文件")
+        initialized_repo._run_git_command(["mv", "old name.txt", "new name.txt"])
+
+        status = initialized_repo.get_status()
+
+        assert status["changes"] == [
+            {"status": "renamed", "file": "new name.txt", "old_file": "old name.txt"}
+        ]
+
+    def test_detached_head(self, initialized_repo, temp_dir):
+        """测试分离HEAD状态"""
+        (Path(temp_dir) / "test.txt").write_text("v1")
+        initialized_repo.create_commit("版本1")
+        commit_id = initialized_repo.get_log(limit=1)[0]["id"]
+        initialized_repo.checkout_commit(commit_id)
+
+        status = initialized_repo.get_status()
+
+        assert status["detached"] is True
+        assert status["head"] == commit_id
+        assert status["branch"] == "main"
+
+    def test_unmerged_paths(self, initialized_repo, temp_dir):
+        """测试未合并的冲突文件"""
+        file = Path(temp_dir) / "conflict.txt"
+        file.write_text("base")
+        initialized_repo.create_commit("基础")
+        initialized_repo.create_branch("other")
+
+        file.write_text("main side")
+        initialized_repo.create_commit("主分支修改")
+        initialized_repo.switch_branch("other")
+        file.write_text("other side")
+        initialized_repo.create_commit("其他分支修改")
+        initialized_repo.switch_branch("main")
+        initialized_repo._run_git_command(["merge", "other"], check=False)
+
+        status = initialized_repo.get_status()
+
+        assert status["conflicts"] == ["conflict.txt"]
+        assert status["changes"] == [{"status": "modified", "file": "conflict.txt"}]
+
+    def test_upstream_tracking(self, initialized_repo, temp_dir):
+        """测试上游分支和领先/落后计数"""
+        (Path(temp_dir) / "test.txt").write_text("v1")
+        initialized_repo.create_commit("版本1")
+        initialized_repo.create_branch("base")
+        initialized_repo._run_git_command(["branch", "--set-upstream-to=base"])
+        (Path(temp_dir) / "test.txt").write_text("v2")
+        initialized_repo.create_commit("版本2")
+
+        status = initialized_repo.get_status()
+
+        assert status["upstream"] == "base"
+        assert status["ahead"] == 1
+        assert status["behind"] == 0
+
+
+class TestLogPagination:
+    """测试提交历史分页和流式读取"""
+
+    @pytest.fixture
+    def repo_with_history(self, initialized_repo, temp_dir):
+        for i in range(5):
+            (Path(temp_dir) / f"file{i}.txt").write_text(str(i))
+            initialized_repo.create_commit(f"提交 {i}")
+        return initialized_repo
+
+    def test_after_cursor(self, repo_with_history):
+        """测试游标之后的记录"""
+        full = repo_with_history.get_log()
+
+        page = repo_with_history.get_log(limit=2, after=full[1]["id"])
+
+        assert [c["id"] for c in page] == [full[2]["id"], full[3]["id"]]
+
+    def test_after_short_id(self, repo_with_history):
+        """测试游标可以使用短ID"""
+        full = repo_with_history.get_log()
+
+        page = repo_with_history.get_log(after=full[0]["short_id"])
+
+        assert [c["id"] for c in page] == [c["id"] for c in full[1:]]
+
+    def test_invalid_cursor(self, repo_with_history):
+        """测试无效游标"""
+        with pytest.raises(ValueError):
+            repo_with_history.get_log(after="0" * 40)
+
+    def test_count_commits(self, repo_with_history):
+        """测试统计提交总数"""
+        assert repo_with_history.count_commits() == 6
+
+    async def test_iter_log_async(self, repo_with_history):
+        """测试流式读取与一次性读取结果一致"""
+        streamed = [c async for c in repo_with_history.iter_log_async()]
+
+        assert streamed == repo_with_history.get_log()
+
+    async def test_iter_log_async_early_exit(self, repo_with_history):
+        """测试提前结束时终止git进程"""
+        commits = repo_with_history.iter_log_async()
+        first = await commits.__anext__()
+        await commits.aclose()
+
+        assert first["message"] == "提交 4"
+
+
+@pytest.fixture
+def conflicting_repo(initialized_repo, temp_dir):
+    """main和other两个分支修改了同一个文件，当前在main分支"""
+    file = Path(temp_dir) / "conflict.txt"
+    file.write_text("base")
+    initialized_repo.create_commit("基础")
+    initialized_repo.create_branch("other")
+    initialized_repo.create_branch("ahead")
+
+    file.write_text("main side")
+    initialized_repo.create_commit("主分支修改")
+    initialized_repo.switch_branch("other")
+    file.write_text("other side")
+    initialized_repo.create_commit("其他分支修改")
+    initialized_repo.switch_branch("main")
+    return initialized_repo
+
+
+class TestBlob:
+    """测试读取快照中的文件内容"""
+
+    @pytest.fixture
+    def blob_repo(self, initialized_repo, temp_dir):
+        """创建包含文本文件和目录的仓库"""
+        (Path(temp_dir) / "docs").mkdir()
+        (Path(temp_dir) / "docs" / "a.txt").write_bytes(b"0123456789" * 100)
+        initialized_repo.create_commit("添加文件")
+        return initialized_repo
+
+    def test_resolve_and_read(self, blob_repo):
+        """测试按提交和路径找到blob并读取"""
+        commit = blob_repo.get_log()[0]["id"]
+        oid, size = blob_repo.resolve_blob(commit, "docs/a.txt")
+
+        assert size == 1000
+        assert blob_repo.resolve_blob("HEAD", "/docs/a.txt") == (oid, size)
+        assert blob_repo.read_blob(oid) == b"0123456789" * 100
+
+    def test_resolve_errors(self, blob_repo):
+        """测试不存在的文件、目录和无效的提交"""
+        with pytest.raises(ValueError):
+            blob_repo.resolve_blob("HEAD", "missing.txt")
+        with pytest.raises(ValueError):
+            blob_repo.resolve_blob("HEAD", "docs")
+        with pytest.raises(ValueError):
+            blob_repo.resolve_blob("--all", "docs/a.txt")
+
+    def test_iter_range(self, blob_repo, monkeypatch):
+        """测试流式读取跨越多个数据块的字节范围"""
+        monkeypatch.setattr("services.git_wrapper.BLOB_STREAM_CHUNK_SIZE", 7)
+        oid, _ = blob_repo.resolve_blob("HEAD", "docs/a.txt")
+
+        async def collect(start, end):
+            chunks = [
+                chunk async for chunk in blob_repo.iter_blob_async(oid, start, end)
+            ]
+            return b"".join(chunks)
+
+        assert asyncio.run(collect(0, None)) == b"0123456789" * 100
+        assert asyncio.run(collect(15, 23)) == b"56789012"
+        assert asyncio.run(collect(995, 1000)) == b"56789"
+
+
+class TestMergePreview:
+    """测试合并预演"""
+
+    def test_conflict(self, conflicting_repo, temp_dir):
+        """测试预演发现冲突，且不修改工作区和HEAD"""
+        head = conflicting_repo._run_git_command(["rev-parse", "HEAD"]).stdout
+
+        preview = conflicting_repo.preview_merge("other")
+
+        assert preview["clean"] is False
+        assert preview["target"] == "main"
+        assert preview["conflicts"] == ["conflict.txt"]
+        assert preview["messages"][0]["paths"] == ["conflict.txt"]
+        assert preview["messages"][0]["type"].startswith("CONFLICT")
+        assert (Path(temp_dir) / "conflict.txt").read_text() == "main side"
+        assert conflicting_repo._run_git_command(["rev-parse", "HEAD"]).stdout == head
+        assert conflicting_repo.get_status()["changes"] == []
+
+    def test_clean_and_fast_forward(self, conflicting_repo):
+        """测试无冲突的预演和快进、已包含的判断"""
+        preview = conflicting_repo.preview_merge("main", target_branch="ahead")
+        assert preview["clean"] is True
+        assert preview["fast_forward"] is True
+        assert preview["conflicts"] == []
+
+        preview = conflicting_repo.preview_merge("ahead")
+        assert preview["up_to_date"] is True
+
+    def test_unknown_branch(self, conflicting_repo):
+        """测试不存在的分支"""
+        with pytest.raises(ValueError):
+            conflicting_repo.preview_merge("missing")
+        with pytest.raises(ValueError):
+            conflicting_repo.preview_merge("--all")
+
+    def test_merge_fails_fast(self, conflicting_repo, temp_dir):
+        """测试合并前预演到冲突时不切换分支、不留下合并状态"""
+        with pytest.raises(MergeConflictError) as exc_info:
+            conflicting_repo.merge_branch("main", target_branch="other")
+
+        assert exc_info.value.conflicts == ["conflict.txt"]
+        assert conflicting_repo.get_current_branch() == "main"
+        assert not (Path(temp_dir) / ".git" / "MERGE_HEAD").exists()
+
+    def test_parse_merge_tree_output(self):
+        """测试解析merge-tree -z输出"""
+        output = (
+            "tree\x00"
+            "100644 aaa 1\ta b.txt\x00"
+            "100644 bbb 2\ta b.txt\x00"
+            "100644 ccc 3\ta b.txt\x00"
+            "\x00"
+            "1\x00a b.txt\x00Auto-merging\x00Auto-merging a b.txt\n\x00"
+            "1\x00a b.txt\x00CONFLICT (contents)\x00CONFLICT (content): a b.txt\n\x00"
+        )
+
+        tree, stages, messages = GitWrapper._parse_merge_tree_output(output)
+
+        assert tree == "tree"
+        assert [stage for _, _, stage, _ in stages] == [1, 2, 3]
+        assert stages[0] == ("100644", "aaa", 1, "a b.txt")
+        assert messages[1] == {
+            "paths": ["a b.txt"],
+            "type": "CONFLICT (contents)",
+            "message": "CONFLICT (content): a b.txt",
+        }
+
+
+class TestConflictDetails:
+    """测试冲突详情"""
+
+    def test_from_merge_tree(self, conflicting_repo):
+        """测试预演合并得到三个版本的内容"""
+        details = conflicting_repo.get_conflict_details("other")
+
+        assert details["origin"] == "merge-tree"
+        [entry] = details["files"]
+        assert entry["path"] == "conflict.txt"
+        stages = entry["stages"]
+        assert stages["base"]["content"] == "base"
+        assert stages["ours"]["content"] == "main side"
+        assert stages["theirs"]["content"] == "other side"
+        assert stages["ours"]["binary"] is False
+
+    def test_from_index(self, conflicting_repo):
+        """测试读取进行中的合并冲突"""
+        conflicting_repo._run_git_command(["merge", "other"], check=False)
+
+        details = conflicting_repo.get_conflict_details()
+
+        assert details["origin"] == "index"
+        assert details["files"][0]["stages"]["theirs"]["content"] == "other side"
+
+    def test_size_cap_and_binary(self, conflicting_repo, temp_dir):
+        """测试超过大小上限不返回内容，二进制内容不返回文本"""
+        (Path(temp_dir) / "data.bin").write_bytes(b"\0main")
+        conflicting_repo.create_commit("二进制")
+        conflicting_repo.switch_branch("other")
+        (Path(temp_dir) / "data.bin").write_bytes(b"\0other")
+        conflicting_repo.create_commit("二进制")
+        conflicting_repo.switch_branch("main")
+
+        details = conflicting_repo.get_conflict_details("other", max_bytes=5)
+
+        files = {entry["path"]: entry["stages"] for entry in details["files"]}
+        assert files["data.bin"]["base"] is None
+        assert files["data.bin"]["ours"]["binary"] is True
+        assert files["data.bin"]["ours"]["content"] is None
+        assert files["data.bin"]["theirs"]["truncated"] is True
+        assert files["conflict.txt"]["ours"]["truncated"] is True
+        assert files["conflict.txt"]["ours"]["size"] == len("main side")
+        # conflict.txt的ours、theirs和data.bin的theirs超过5字节
+        assert details["omitted"] == 3
+
+    def test_command_count_independent_of_files(
+        self, conflicting_repo, temp_dir, monkeypatch
+    ):
+        """测试冲突文件数量增加时不增加git进程"""
+        for index in range(20):
+            (Path(temp_dir) / f"f{index}.txt").write_text("base")
+        conflicting_repo.create_commit("更多文件")
+        conflicting_repo._run_git_command(["branch", "-f", "other2"])
+        for index in range(20):
+            (Path(temp_dir) / f"f{index}.txt").write_text("main")
+        conflicting_repo.create_commit("主分支")
+        conflicting_repo.switch_branch("other2")
+        for index in range(20):
+            (Path(temp_dir) / f"f{index}.txt").write_text("other")
+        conflicting_repo.create_commit("其他分支")
+        conflicting_repo.switch_branch("main")
+
+        calls = []
+        original = GitWrapper._run_git_command
+
+        def counting(self, args, *rest, **kwargs):
+            calls.append(args[0])
+            return original(self, args, *rest, **kwargs)
+
+        monkeypatch.setattr(GitWrapper, "_run_git_command", counting)
+        details = conflicting_repo.get_conflict_details("other2")
+
+        assert len(details["files"]) == 20
+        assert calls == ["rev-parse", "merge-tree"]
@@ -0,0 +1,168 @@
+"""
+提交历史缓存单元测试
+"""
+
+import time
+from pathlib import Path
+
+import pytest
+
+from services.log_cache import LogCache, log_cache
+
+
+@pytest.fixture
+def repo_commits():
+    """三个提交，各新增一个文件"""
+    return [{f"file{i}.txt": str(i)} for i in range(3)]
+
+
+@pytest.fixture
+def repo(repo):
+    """清除建库过程中写入的提交历史缓存"""
+    log_cache.invalidate(repo.repo_path)
+    return repo
+
+
+def uncached_log(wrapper, branch=None):
+    """直接执行git log作为对照"""
+    result = wrapper._run_git_command(wrapper._build_log_args(None, branch))
+    return wrapper._parse_log_output(result)
+
+
+class TestLogCache:
+    """测试缓存存储"""
+
+    def test_lru_bounded_by_commit_count(self):
+        """测试按提交总数淘汰"""
+        cache = LogCache(max_commits=5)
+        cache.put(Path("/a"), "HEAD", "t1", [{"id": "1"}] * 3)
+        cache.put(Path("/b"), "HEAD", "t2", [{"id": "2"}] * 2)
+        cache.get(Path("/a"), "HEAD")
+        cache.put(Path("/c"), "HEAD", "t3", [{"id": "3"}] * 2)
+
+        assert cache.get(Path("/b"), "HEAD") is None
+        assert cache.get(Path("/a"), "HEAD") is not None
+        assert cache.stats()["cached_commits"] == 5
+
+    def test_oversized_entry_not_cached(self):
+        """测试超出容量的条目不缓存"""
+        cache = LogCache(max_commits=2)
+        cache.put(Path("/a"), "HEAD", "t1", [{"id": "1"}] * 3)
+
+        assert cache.get(Path("/a"), "HEAD") is None
+
+
+class TestGitWrapperLogCache:
+    """测试GitWrapper使用提交历史缓存"""
+
+    def test_hit_when_tip_unchanged(self, repo, monkeypatch):
+        """测试引用未变化时不再执行git log"""
+        first = repo.get_log()
+        hits = log_cache.hits
+
+        calls = []
+        original = repo._run_git_command
+        monkeypatch.setattr(
+            repo,
+            "_run_git_command",
+            lambda a, *x, **k: calls.append(a) or original(a, *x, **k),
+        )
+        second = repo.get_log()
+
+        assert second == first
+        assert log_cache.hits == hits + 1
+        assert calls == []
+
+    def test_incremental_update(self, repo, temp_dir):
+        """测试引用快进时只读取新增提交"""
+        repo.get_log()
+        updates = log_cache.incremental_updates
+
+        (Path(temp_dir) / "new.txt").write_text("new")
+        repo.create_commit("新提交")
+        log = repo.get_log()
+
+        assert log_cache.incremental_updates == updates + 1
+        assert log[0]["message"] == "新提交"
+        assert log == uncached_log(repo)
+
+    def test_merge_keeps_git_order(self, repo, temp_dir, monkeypatch):
+        """测试快进范围内有合并提交时，缓存顺序与git log一致"""
+        now = int(time.time())
+
+        def commit_at(offset, name):
+            date = f"@{now + offset} +0000"
+            monkeypatch.setenv("GIT_AUTHOR_DATE", date)
+            monkeypatch.setenv("GIT_COMMITTER_DATE", date)
+            (Path(temp_dir) / f"{name}.txt").write_text(name)
+            repo.create_commit(name)
+
+        repo.create_branch("side")
+        repo.switch_branch("side")
+        commit_at(100, "F1")
+        repo.switch_branch("main")
+        commit_at(200, "M1")
+        repo.get_log()
+
+        monkeypatch.setenv("GIT_COMMITTER_DATE", f"@{now + 300} +0000")
+        assert repo.merge_branch("side")["success"] is True
+        log = repo.get_log()
+
+        assert [c["message"] for c in log[1:3]] == ["M1", "F1"]
+        assert log == uncached_log(repo)
+        assert repo.get_log(limit=2, after=log[1]["id"]) == log[2:4]
+
+    def test_rebuild_after_checkout(self, repo):
+        """测试回滚到旧提交后完整重建"""
+        full = repo.get_log()
+        rebuilds = log_cache.rebuilds
+
+        repo.checkout_commit(full[1]["id"])
+        log = repo.get_log()
+
+        assert log_cache.rebuilds == rebuilds + 1
+        assert log == full[1:]
+
+    def test_pages_served_from_cache(self, repo):
+        """测试缓存建立后分页请求直接使用缓存"""
+        full = repo.get_log()
+
+        assert repo.get_log(limit=2) == full[:2]
+        assert repo.get_log(limit=2, after=full[1]["short_id"]) == full[2:4]
+
+    def test_count_from_cache(self, repo, temp_dir, monkeypatch):
+        """测试缓存与引用一致时提交数直接来自缓存"""
+        full = repo.get_log()
+        calls = []
+        original = repo._run_git_command
+        monkeypatch.setattr(
+            repo,
+            "_run_git_command",
+            lambda a, *x, **k: calls.append(a[0]) or original(a, *x, **k),
+        )
+
+        assert repo.count_commits() == len(full)
+        assert calls == []
+
+        (Path(temp_dir) / "new.txt").write_text("new")
+        repo.create_commit("新提交")
+
+        assert repo.count_commits() == len(full) + 1
+        assert "rev-list" in calls
+
+    def test_partial_request_does_not_populate(self, repo):
+        """测试缓存为空时分页请求不建立完整缓存"""
+        repo.get_log(limit=1)
+
+        assert log_cache.get(repo.repo_path, "HEAD") is None
+
+    def test_per_branch_entries(self, repo, temp_dir):
+        """测试不同分支分别缓存"""
+        repo.create_branch("feature")
+        repo.switch_branch("feature")
+        (Path(temp_dir) / "feature.txt").write_text("f")
+        repo.create_commit("功能提交")
+
+        assert repo.get_log(branch="main") == uncached_log(repo, "main")
+        assert repo.get_log(branch="feature") == uncached_log(repo, "feature")
+        assert repo.get_log(branch="main")[0]["message"] == "提交 2"
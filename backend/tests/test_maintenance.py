@@ -0,0 +1,103 @@
+"""
+仓库后台维护服务单元测试
+"""
+
+import threading
+
+import pytest
+
+from services import maintenance
+from services.maintenance import MaintenanceScheduler, collect_stats, plan_tasks
+
+
+@pytest.fixture
+def repo_commits():
+    """三个提交，各新增一个文件"""
+    return [{f"file{i}.txt": str(i)} for i in range(3)]
+
+
+class TestStats:
+    """测试统计和任务规划"""
+
+    def test_collect_stats(self, repo):
+        """测试统计松散对象和commit-graph"""
+        stats = collect_stats(repo)
+
+        assert stats["loose_objects"] > 0
+        assert stats["packs"] == 0
+        assert stats["commit_graph"] is False
+        assert stats["commit_graph_stale"] is True
+
+    def test_plan_tasks_thresholds(self, repo, monkeypatch):
+        """测试达到阈值才安排repack和prune"""
+        stats = collect_stats(repo)
+        assert plan_tasks(stats) == ["commit-graph"]
+
+        monkeypatch.setattr(maintenance, "LOOSE_OBJECTS_THRESHOLD", 1)
+        assert plan_tasks(stats) == ["commit-graph", "repack", "prune"]
+
+
+class TestMaintenanceScheduler:
+    """测试维护调度"""
+
+    def test_run_packs_and_writes_graph(self, repo):
+        """测试执行全部任务后对象被打包、commit-graph最新"""
+        scheduler = MaintenanceScheduler(interval=0)
+
+        result = scheduler.run(repo)
+
+        assert [t["task"] for t in result["tasks"]] == [
+            "commit-graph",
+            "repack",
+            "prune",
+        ]
+        assert all(t["success"] for t in result["tasks"])
+        stats = collect_stats(repo)
+        assert stats["loose_objects"] == 0
+        assert stats["packs"] == 1
+        assert stats["commit_graph"] is True
+        assert stats["commit_graph_stale"] is False
+        assert scheduler.last_run(repo.repo_path) is result
+        assert len(repo.get_log()) == 4
+
+    def test_invalid_task(self, repo):
+        """测试未知任务名称"""
+        with pytest.raises(ValueError):
+            MaintenanceScheduler(interval=0).run(repo, ["gc"])
+
+    def test_yields_to_writer(self, repo):
+        """测试后台维护遇到写操作时让出，不与写操作重叠"""
+        scheduler = MaintenanceScheduler(interval=0)
+        acquired = threading.Event()
+        done = threading.Event()
+
+        def writer():
+            with repo.lock.write():
+                acquired.set()
+                done.wait(5)
+
+        t = threading.Thread(target=writer)
+        t.start()
+        acquired.wait(5)
+        try:
+            result = scheduler.run(repo, trigger="scheduled", wait=False)
+        finally:
+            done.set()
+            t.join()
+
+        assert all(t.get("skipped") for t in result["tasks"])
+        assert collect_stats(repo)["commit_graph"] is False
+
+    def test_run_pending_only_idle_repos(self, repo, monkeypatch):
+        """测试只维护空闲的仓库"""
+        monkeypatch.setattr(maintenance.git_wrappers, "wrappers", lambda: [repo])
+        repo.get_status()
+
+        busy = MaintenanceScheduler(idle_seconds=3600, interval=0)
+        assert busy.run_pending() == 0
+
+        idle = MaintenanceScheduler(idle_seconds=0, interval=0)
+        assert idle.run_pending() == 1
+        assert idle.last_run(repo.repo_path)["trigger"] == "scheduled"
+        # 维护完成后不再需要维护
+        assert idle.run_pending() == 0
@@ -0,0 +1,121 @@
+"""
+运行指标单元测试
+"""
+
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from services.git_wrapper import GitWrapper
+from services.metrics import (
+    MetricsRegistry,
+    git_command_duration,
+    git_command_exits,
+    git_commands_in_flight,
+    git_subcommand,
+    http_request_duration,
+)
+
+
+def test_histogram_render():
+    """测试直方图输出累计分桶、总和与总数"""
+    registry = MetricsRegistry()
+    histogram = registry.histogram("t_seconds", "测试", ("op",), buckets=(0.1, 1.0))
+    histogram.observe("a", value=0.05)
+    histogram.observe("a", value=0.5)
+    histogram.observe("a", value=5)
+
+    text = registry.render()
+
+    assert "# TYPE t_seconds histogram" in text
+    assert 't_seconds_bucket{op="a",le="0.1"} 1' in text
+    assert 't_seconds_bucket{op="a",le="1"} 2' in text
+    assert 't_seconds_bucket{op="a",le="+Inf"} 3' in text
+    assert 't_seconds_sum{op="a"} 5.55' in text
+    assert 't_seconds_count{op="a"} 3' in text
+
+
+def test_counter_gauge_and_collector():
+    """测试计数器、仪表、标签转义和collector输出"""
+    registry = MetricsRegistry()
+    counter = registry.counter("t_total", "测试", ("path",))
+    gauge = registry.gauge("t_running", "测试")
+    counter.inc('a"b')
+    counter.inc('a"b', amount=2)
+    gauge.inc()
+    gauge.dec()
+    registry.add_collector(lambda: [("t_cache", "缓存", {"stat": "hits"}, 7)])
+
+    text = registry.render()
+
+    assert 't_total{path="a\\"b"} 3' in text
+    assert "t_running 0" in text
+    assert "# TYPE t_cache gauge" in text
+    assert 't_cache{stat="hits"} 7' in text
+
+
+def test_labels_must_match():
+    """测试标签数量不一致时报错"""
+    counter = MetricsRegistry().counter("t_total", "测试", ("a", "b"))
+
+    with pytest.raises(ValueError):
+        counter.inc("x")
+
+
+def test_git_subcommand():
+    """测试跳过全局选项取子命令"""
+    assert git_subcommand(["log", "--oneline"]) == "log"
+    assert git_subcommand(["--no-optional-locks", "status"]) == "status"
+    assert git_subcommand(["-c", "core.quotepath=false", "diff"]) == "diff"
+    assert git_subcommand([]) == "unknown"
+
+
+def test_git_commands_recorded(temp_dir):
+    """测试同步和异步执行的git命令都被记录"""
+    wrapper = GitWrapper(temp_dir)
+    wrapper.init_repository()
+    before = git_command_duration.count("rev-parse")
+    failures = git_command_exits.value("rev-parse", "128")
+
+    wrapper._run_git_command(["rev-parse", "no-such-ref"], check=False)
+    wrapper._run_git_command(["rev-parse", "--show-toplevel"])
+
+    assert git_command_duration.count("rev-parse") == before + 2
+    assert git_command_exits.value("rev-parse", "128") == failures + 1
+    assert git_commands_in_flight.value("rev-parse") == 0
+
+
+async def test_async_git_commands_recorded(temp_dir):
+    """测试异步执行的git命令被记录"""
+    wrapper = GitWrapper(temp_dir)
+    wrapper.init_repository()
+    (Path(temp_dir) / "a.txt").write_text("a")
+    wrapper.create_commit("a")
+    before = git_command_duration.count("log")
+
+    commits = [c async for c in wrapper.iter_log_async()]
+
+    assert commits
+    assert git_command_duration.count("log") == before + 1
+    assert git_commands_in_flight.value("log") == 0
+
+
+def test_metrics_endpoint(temp_dir):
+    """测试/metrics输出HTTP和缓存指标"""
+    client = TestClient(app)
+    client.post("/api/repository/init", json={"path": temp_dir})
+    before = http_request_duration.count("GET", "/api/repository/status", 200)
+    client.get(f"/api/repository/status?path={temp_dir}")
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert http_request_duration.count("GET", "/api/repository/status", 200) == (
+        before + 1
+    )
+    assert "chronos_git_command_duration_seconds_bucket" in response.text
+    assert 'chronos_cache{cache="status",stat="hits"}' in response.text
+    assert 'route="/api/repository/status"' in response.text
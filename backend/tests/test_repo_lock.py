@@ -0,0 +1,185 @@
+"""
+仓库读写锁单元测试
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from services.git_wrapper import GitWrapper
+from services.repo_lock import ReadWriteLock
+
+
+class TestReadWriteLock:
+    """测试读写锁语义"""
+
+    def test_readers_share_lock(self):
+        """测试多个读者可以同时持有锁"""
+        lock = ReadWriteLock()
+        inside = []
+        barrier = threading.Barrier(3, timeout=2)
+
+        def reader():
+            with lock.read():
+                inside.append(1)
+                # 三个读者必须同时在锁内才能通过屏障
+                barrier.wait()
+
+        threads = [threading.Thread(target=reader) for _ in range(3)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(inside) == 3
+
+    def test_writer_excludes_readers(self):
+        """测试写锁期间读者需要等待"""
+        lock = ReadWriteLock()
+        events = []
+
+        lock.acquire_write()
+
+        def reader():
+            with lock.read():
+                events.append("read")
+
+        t = threading.Thread(target=reader)
+        t.start()
+        time.sleep(0.05)
+        events.append("write-done")
+        lock.release_write()
+        t.join()
+
+        assert events == ["write-done", "read"]
+
+    def test_writer_is_reentrant(self):
+        """测试写者线程可以再次获取读锁和写锁"""
+        lock = ReadWriteLock()
+
+        with lock.write():
+            with lock.read():
+                with lock.write():
+                    pass
+
+        # 完全释放后其他线程可以获取写锁
+        result = []
+        t = threading.Thread(target=lambda: result.append(lock.acquire_write(False)))
+        t.start()
+        t.join()
+        assert result == [True]
+
+    def test_non_blocking_write(self):
+        """测试非阻塞获取写锁"""
+        lock = ReadWriteLock()
+        lock.acquire_read()
+
+        result = []
+        t = threading.Thread(target=lambda: result.append(lock.acquire_write(False)))
+        t.start()
+        t.join()
+
+        lock.release_read()
+        assert result == [False]
+
+    def test_non_blocking_read(self):
+        """测试非阻塞读锁在写者持有时立即失败"""
+        lock = ReadWriteLock()
+        lock.acquire_write()
+        result = []
+        t = threading.Thread(
+            target=lambda: result.append(lock.acquire_read(blocking=False))
+        )
+        t.start()
+        t.join()
+        lock.release_write()
+
+        assert result == [False]
+        assert lock.acquire_read(blocking=False) is True
+        lock.release_read()
+
+    def test_idle_seconds(self):
+        """测试空闲时间在持有锁时为0，释放后开始计时"""
+        lock = ReadWriteLock()
+        with lock.read():
+            assert lock.idle_seconds == 0
+        time.sleep(0.05)
+
+        assert lock.idle_seconds >= 0.05
+
+    def test_upgrade_not_supported(self):
+        """测试读锁不能升级为写锁"""
+        lock = ReadWriteLock()
+
+        with lock.read():
+            with pytest.raises(RuntimeError):
+                lock.acquire_write()
+
+    async def test_async_read_waits_for_writer(self):
+        """测试异步读锁不阻塞事件循环并等待写者"""
+        lock = ReadWriteLock()
+        lock.acquire_write()
+        events = []
+
+        async def reader():
+            async with lock.read_async():
+                events.append("read")
+
+        task = asyncio.ensure_future(reader())
+        await asyncio.sleep(0.05)
+        events.append("loop-alive")
+        lock.release_write()
+        await task
+
+        assert events == ["loop-alive", "read"]
+        assert lock.is_busy is False
+
+
+class TestGitWrapperLocking:
+    """测试GitWrapper的锁接入"""
+
+    def test_same_repo_shares_lock(self, temp_dir):
+        """测试同一仓库的实例共享锁"""
+        assert GitWrapper(temp_dir).lock is GitWrapper(temp_dir).lock
+
+    def test_init_holds_write_lock(self, temp_dir, monkeypatch):
+        """测试初始化仓库的每条git命令都在写锁内执行"""
+        wrapper = GitWrapper(temp_dir)
+        holders = []
+        original = GitWrapper._run_git_command
+
+        def spy(self, args, *rest, **kwargs):
+            holders.append(self.lock._writer == threading.get_ident())
+            return original(self, args, *rest, **kwargs)
+
+        monkeypatch.setattr(GitWrapper, "_run_git_command", spy)
+        wrapper.init_repository()
+
+        assert holders and all(holders)
+
+    def test_concurrent_reads_and_writes(self, temp_dir):
+        """测试并发读写不会出现index.lock冲突"""
+        wrapper = GitWrapper(temp_dir)
+        wrapper.init_repository()
+
+        def write(i):
+            (Path(temp_dir) / f"file{i}.txt").write_text(str(i))
+            return GitWrapper(temp_dir).create_commit(f"提交 {i}")
+
+        def read(_):
+            return GitWrapper(temp_dir).get_status()
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            writes = [pool.submit(write, i) for i in range(5)]
+            reads = [pool.submit(read, i) for i in range(20)]
+            for future in reads:
+                future.result()
+            # 文件在获取锁之前写入，先提交的快照可能已经包含了后面的文件
+            committed = sum(1 for f in writes if f.result()["success"])
+
+        assert wrapper.get_status()["is_clean"] is True
+        assert len(wrapper.get_log()) == committed + 1
@@ -0,0 +1,146 @@
+"""
+GitWrapper注册表和仓库元数据缓存单元测试
+"""
+
+import os
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from services.git_wrapper import GitWrapper, RepositoryNotFoundError
+from services.repo_registry import GitWrapperRegistry
+
+
+@pytest.fixture
+def registry():
+    """创建独立的注册表"""
+    reg = GitWrapperRegistry(max_size=2)
+    yield reg
+    reg.clear()
+
+
+def git_init(path):
+    """创建空的Git仓库"""
+    subprocess.run(["git", "init", "-q", path], check=True)
+
+
+class TestGitWrapperRegistry:
+    """测试GitWrapper注册表"""
+
+    def test_returns_same_wrapper(self, registry, temp_dir):
+        """测试同一路径返回同一实例"""
+        git_init(temp_dir)
+        assert registry.get(temp_dir) is registry.get(temp_dir)
+
+    def test_canonical_path(self, registry, temp_dir):
+        """测试不同写法的同一路径共享实例"""
+        git_init(temp_dir)
+        link = temp_dir + "-link"
+        os.symlink(temp_dir, link)
+        try:
+            assert registry.get(link) is registry.get(temp_dir)
+            assert registry.get(temp_dir + "/.") is registry.get(temp_dir)
+        finally:
+            os.unlink(link)
+
+    def test_lru_eviction(self, registry):
+        """测试超出容量时淘汰最久未使用的仓库"""
+        paths = [tempfile.mkdtemp() for _ in range(3)]
+        try:
+            for path in paths:
+                git_init(path)
+            first = registry.get(paths[0])
+            registry.get(paths[1])
+            # 访问第一个仓库，使第二个成为最久未使用
+            registry.get(paths[0])
+            registry.get(paths[2])
+
+            assert len(registry) == 2
+            assert Path(paths[1]).resolve() not in registry
+            assert registry.get(paths[0]) is first
+        finally:
+            for p in paths:
+                shutil.rmtree(p, ignore_errors=True)
+
+    def test_non_repo_paths_not_registered(self, registry, temp_dir):
+        """测试不是仓库的路径不会淘汰已注册的仓库"""
+        git_init(temp_dir)
+        repo = registry.get(temp_dir)
+
+        for i in range(10):
+            wrapper = registry.get(f"/nonexistent/p{i}")
+            assert wrapper.metadata.git_dir is None
+
+        assert len(registry) == 1
+        assert registry.get(temp_dir) is repo
+
+    def test_registered_after_init(self, registry, temp_dir):
+        """测试初始化后的路径进入注册表"""
+        registry.get(temp_dir).init_repository()
+
+        assert registry.get(temp_dir) is registry.get(temp_dir)
+        assert len(registry) == 1
+
+
+class TestRepoMetadata:
+    """测试仓库元数据缓存"""
+
+    def test_config_is_cached(self, temp_dir, monkeypatch):
+        """测试配置值被缓存，不重复启动git config"""
+        wrapper = GitWrapper(temp_dir)
+        wrapper.init_repository()
+        wrapper._run_git_command(["config", "user.name", "缓存用户"])
+
+        calls = []
+        original = wrapper._load_git_config
+
+        def counting_loader(key):
+            calls.append(key)
+            return original(key)
+
+        monkeypatch.setattr(wrapper, "_load_git_config", counting_loader)
+
+        assert wrapper._get_git_config("user.name") == "缓存用户"
+        assert wrapper._get_git_config("user.name") == "缓存用户"
+        assert calls == ["user.name"]
+
+    def test_config_invalidated_on_change(self, temp_dir):
+        """测试.git/config变化后缓存失效"""
+        wrapper = GitWrapper(temp_dir)
+        wrapper.init_repository()
+        wrapper._run_git_command(["config", "user.name", "旧名字"])
+        assert wrapper._get_git_config("user.name") == "旧名字"
+
+        wrapper._run_git_command(["config", "user.name", "新名字-更长"])
+
+        assert wrapper._get_git_config("user.name") == "新名字-更长"
+
+    def test_verify_detects_new_and_removed_repo(self, temp_dir):
+        """测试仓库创建和删除都能被检测到"""
+        wrapper = GitWrapper(temp_dir)
+        with pytest.raises(RepositoryNotFoundError):
+            wrapper.get_status()
+
+        wrapper.init_repository()
+        wrapper.get_status()
+
+        shutil.rmtree(Path(temp_dir) / ".git")
+        with pytest.raises(RepositoryNotFoundError):
+            wrapper.get_status()
+
+    def test_gitdir_file(self, temp_dir):
+        """测试.git为gitdir文件的仓库（工作树）"""
+        main = Path(temp_dir) / "main"
+        main.mkdir()
+        wrapper = GitWrapper(str(main))
+        wrapper.init_repository()
+        wrapper._run_git_command(["worktree", "add", "-b", "wt", "../wt"])
+
+        worktree = GitWrapper(str(Path(temp_dir) / "wt"))
+
+        assert worktree.metadata.git_dir is not None
+        assert (worktree.metadata.git_dir / "HEAD").exists()
+        assert worktree.get_current_branch() == "wt"
@@ -0,0 +1,54 @@
+"""
+快速序列化单元测试
+"""
+
+import json
+
+from api import serialization
+from api.serialization import api_response, dumps, project, project_list
+from models.schemas import ApiResponse, CommitInfo, FileChange, RepositoryStatus
+
+
+class TestProject:
+    """测试按模型字段挑选"""
+
+    def test_matches_model_dump(self):
+        """测试结果与model_dump一致（多余的键被丢弃，缺少的键使用默认值）"""
+        commit = {"id": "abc", "message": "提交", "author": "我", "extra": 1}
+
+        assert project(commit, CommitInfo) == CommitInfo(**commit).model_dump()
+
+    def test_default_factory(self):
+        """测试default_factory字段"""
+        status = {"branch": "main", "changes": [], "is_clean": True}
+
+        result = project(status, RepositoryStatus)
+
+        assert result == RepositoryStatus(**status).model_dump()
+        assert result["conflicts"] == []
+        assert project(status, RepositoryStatus)["conflicts"] is not result["conflicts"]
+
+    def test_project_list(self):
+        """测试列表"""
+        changes = [{"status": "added", "file": "a.txt"}]
+
+        assert project_list(changes, FileChange) == [
+            {"status": "added", "file": "a.txt", "old_file": None}
+        ]
+
+
+class TestDumps:
+    """测试JSON编码"""
+
+    def test_response_matches_api_response(self):
+        """测试响应体与ApiResponse结构一致"""
+        body = api_response({"logs": []}, "消息").body
+
+        expected = ApiResponse(success=True, message="消息", data={"logs": []})
+        assert json.loads(body) == expected.model_dump()
+
+    def test_stdlib_fallback(self, monkeypatch):
+        """测试未安装orjson时使用标准库，非ASCII字符不转义"""
+        monkeypatch.setattr(serialization, "orjson", None)
+
+        assert dumps({"message": "中文"}) == '{"message":"中文"}'.encode("utf-8")
@@ -0,0 +1,72 @@
+"""
+启动就绪信号单元测试
+"""
+
+import json
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+from services.startup import (
+    READY_PREFIX,
+    format_ready_line,
+    parse_ready_line,
+    write_ready_file,
+)
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def test_ready_line_round_trip():
+    """测试就绪行的生成和解析"""
+    info = {"pid": 1, "host": "127.0.0.1", "port": 8765, "url": "http://x"}
+
+    line = format_ready_line(info)
+
+    assert line.startswith(READY_PREFIX + " ")
+    assert parse_ready_line(line + "\n") == info
+    assert parse_ready_line("INFO: Uvicorn running") is None
+    assert parse_ready_line(READY_PREFIX + " not-json") is None
+
+
+def test_write_ready_file(tmp_path):
+    """测试就绪文件写入（自动创建目录，不留下临时文件）"""
+    target = tmp_path / "run" / "ready.json"
+
+    write_ready_file(target, {"port": 1234})
+
+    assert json.loads(target.read_text(encoding="utf-8")) == {"port": 1234}
+    assert [p.name for p in target.parent.iterdir()] == ["ready.json"]
+
+
+def test_server_announces_ready(tmp_path):
+    """测试后端监听端口后输出就绪行、写入就绪文件，退出时删除就绪文件"""
+    ready_file = tmp_path / "ready.json"
+    process = subprocess.Popen(
+        [sys.executable, "main.py", "--port", "0", "--ready-file", str(ready_file)],
+        cwd=str(BACKEND_DIR),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+    )
+    try:
+        info = None
+        deadline = time.monotonic() + 30
+        while info is None and time.monotonic() < deadline:
+            line = process.stdout.readline()
+            if not line:
+                break
+            info = parse_ready_line(line)
+
+        assert info is not None
+        assert info["port"] > 0
+        assert json.loads(ready_file.read_text(encoding="utf-8")) == info
+        with urllib.request.urlopen(info["url"] + "/health", timeout=5) as response:
+            assert response.status == 200
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+    assert not ready_file.exists()
@@ -0,0 +1,164 @@
+"""
+仓库状态缓存单元测试
+"""
+
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from services.repo_state import read_head, sample_directories, worktree_monitors
+from services.status_cache import StatusCache, status_cache
+
+
+@pytest.fixture
+def repo(repo):
+    """预热被忽略目录缓存，并清除建库过程中写入的状态缓存"""
+    repo.get_ignored_dirs()
+    status_cache.invalidate(repo.repo_path)
+    return repo
+
+
+@pytest.fixture
+def git_calls(repo, monkeypatch):
+    """记录GitWrapper启动的git命令"""
+    calls = []
+    original = repo._run_git_command
+
+    def counting(args, *a, **kw):
+        calls.append("status" if "status" in args else args[0])
+        return original(args, *a, **kw)
+
+    monkeypatch.setattr(repo, "_run_git_command", counting)
+    return calls
+
+
+class FakeMonitor:
+    """模拟文件监听器"""
+
+    instance = 1
+    generation = 0
+    settling = False
+
+
+class TestRepoState:
+    """测试不启动git进程的状态读取"""
+
+    def test_read_head(self, repo):
+        """测试读取分支和提交ID（松散引用和packed-refs）"""
+        head = repo._run_git_command(["rev-parse", "HEAD"]).stdout.strip()
+        git_dir = repo.metadata.git_dir
+
+        assert read_head(git_dir) == ("refs/heads/main", head)
+
+        repo._run_git_command(["pack-refs", "--all"])
+        assert read_head(git_dir) == ("refs/heads/main", head)
+
+    def test_sample_directories(self, repo):
+        """测试目录签名在新增文件时变化，跳过被忽略目录"""
+        root = repo.repo_path
+        (root / "ignored").mkdir()
+        before = sample_directories(root, {"ignored"})
+
+        (root / "ignored" / "x.tmp").write_text("x")
+        assert sample_directories(root, {"ignored"}) == before
+
+        (root / "b.txt").write_text("b")
+        assert sample_directories(root, {"ignored"}) != before
+
+
+class TestStatusCache:
+    """测试状态缓存命中和失效"""
+
+    def test_hit_when_unchanged(self, repo, git_calls):
+        """测试仓库未变化时不再执行git status"""
+        hits = status_cache.hits
+        first = repo.get_status()
+        second = repo.get_status()
+
+        assert second == first
+        assert git_calls == ["status"]
+        assert status_cache.hits == hits + 1
+
+    def test_new_file_misses(self, repo):
+        """测试新增文件后重新获取状态"""
+        assert repo.get_status()["is_clean"]
+
+        (repo.repo_path / "b.txt").write_text("b")
+
+        assert [c["file"] for c in repo.get_status()["changes"]] == ["b.txt"]
+
+    def test_external_index_change_misses(self, repo):
+        """测试外部修改索引后重新获取状态"""
+        (repo.repo_path / "a.txt").write_text("changed")
+        assert repo.get_status()["changes"][0]["status"] == "modified"
+
+        subprocess.run(["git", "add", "a.txt"], cwd=repo.repo_path, check=True)
+        subprocess.run(
+            ["git", "commit", "-q", "-m", "外部提交"], cwd=repo.repo_path, check=True
+        )
+
+        assert repo.get_status()["is_clean"]
+
+    def test_mutation_invalidates(self, repo):
+        """测试GitWrapper的写操作清除缓存"""
+        repo.get_status()
+        invalidations = status_cache.invalidations
+
+        repo.create_branch("feature")
+
+        assert status_cache.invalidations == invalidations + 1
+
+    def test_sampled_entries_expire(self, repo, monkeypatch):
+        """测试没有文件监听时原地修改内容在有效期后可见"""
+        monkeypatch.setattr(status_cache, "sampled_ttl", 0)
+        assert repo.get_status()["is_clean"]
+
+        (repo.repo_path / "a.txt").write_text("b")
+
+        assert not repo.get_status()["is_clean"]
+
+    def test_watcher_generation(self, repo, git_calls):
+        """测试有文件监听时按变化计数判断，监听器有未推送的变化时不使用缓存"""
+        monitor = FakeMonitor()
+        worktree_monitors.register(repo.repo_path, monitor)
+        try:
+            repo.get_status()
+            repo.get_status()
+            assert git_calls == ["status"]
+
+            monitor.generation = 1
+            repo.get_status()
+            assert git_calls == ["status", "status"]
+
+            monitor.settling = True
+            repo.get_status()
+            repo.get_status()
+            assert git_calls == ["status"] * 4
+        finally:
+            worktree_monitors.unregister(repo.repo_path, monitor)
+
+    async def test_async_shares_cache(self, repo, git_calls):
+        """测试异步版本使用同一份缓存"""
+        status = repo.get_status()
+
+        assert await repo.get_status_async() == status
+        assert git_calls == ["status"]
+
+
+class TestStatusCacheStats:
+    """测试统计信息"""
+
+    def test_hit_rate_and_time_saved(self):
+        """测试命中率和节省时间"""
+        cache = StatusCache()
+        path = Path("/repo")
+        assert cache.get(path, "fp") is None
+        cache.put(path, "fp", {"is_clean": True}, cost=0.05, watched=True)
+        assert cache.get(path, "fp", fingerprint_cost=0.01) == {"is_clean": True}
+
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+        assert stats["time_saved_ms"] == 40.0
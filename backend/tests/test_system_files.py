@@ -0,0 +1,104 @@
+"""
+系统文件匹配器单元测试
+"""
+
+import random
+import re
+
+import pytest
+
+from services.git_wrapper import (
+    SYSTEM_FILE_PATTERNS,
+    GitWrapper,
+    filter_system_files,
+)
+from services.system_files import SystemFileMatcher
+
+
+def legacy_is_system_file(filename: str) -> bool:
+    """原来的逐条正则匹配实现，作为对照"""
+    if not filename:
+        return False
+    filename = filename.replace("\\", "/")
+    for pattern in SYSTEM_FILE_PATTERNS:
+        if re.match(pattern, filename):
+            return True
+        basename = filename.split("/")[-1]
+        if basename and re.match(pattern, basename):
+            return True
+    return False
+
+
+SAMPLE_PATHS = [
+    "",
+    ".DS_Store",
+    "docs/.DS_Store",
+    "docs/.DS_Store.bak",
+    "._resource",
+    "photos/._IMG_0001.jpg",
+    "Thumbs.db",
+    "a/b/Thumbs.db:encryptable",
+    "Desktop.ini",
+    "sub/desktop.ini",
+    "DESKTOP.ini",
+    "$RECYCLE.BIN/file",
+    "a/$RECYCLE.BIN/file",
+    "shortcut.lnk",
+    "dir\\\\shortcut.lnk",
+    "notes.txt~",
+    "core.stackdump",
+    ".vscode/settings.json",
+    "project/.vscode/settings.json",
+    ".idea/workspace.xml",
+    ".settings/prefs",
+    "main.swp",
+    ".nfs000123",
+    "x/.Trash-1000",
+    ".fuse_hidden0001",
+    ".project",
+    "src/.classpath",
+    "README.md",
+    "src/main.py",
+    "dir/",
+    "line\nbreak.lnk",
+    "trailing.lnk\n",
+    "中文/文件.txt",
+]
+
+
+class TestSystemFileMatcher:
+    """测试系统文件匹配器"""
+
+    @pytest.mark.parametrize("path", SAMPLE_PATHS)
+    def test_matches_legacy_behavior(self, path):
+        """测试与原实现结果一致"""
+        assert GitWrapper._is_system_file(path) == legacy_is_system_file(path)
+
+    def test_random_paths_match_legacy(self):
+        """测试随机路径与原实现结果一致"""
+        rng = random.Random(42)
+        parts = ["a", "src", ".vscode", "._x", ".DS_Store", "$RECYCLE.BIN"]
+        names = ["f.txt", "x.lnk", "y~", "Desktop.ini", ".nfs1", "Thumbs.db", "z"]
+        for _ in range(2000):
+            depth = rng.randint(0, 3)
+            path = "/".join(
+                [rng.choice(parts) for _ in range(depth)] + [rng.choice(names)]
+            )
+            assert GitWrapper._is_system_file(path) == legacy_is_system_file(path), path
+
+    def test_patterns_are_classified(self):
+        """测试大部分模式走快速路径，只有少数需要正则"""
+        matcher = SystemFileMatcher(SYSTEM_FILE_PATTERNS)
+
+        assert ".DS_Store" in matcher._literal_names
+        assert "._" in matcher._prefixes
+        assert ".lnk" in matcher._suffixes
+        assert ".vscode/" in matcher._path_prefixes
+        assert matcher._fallback.pattern == r"(?:^[Dd]esktop\.ini$)"
+
+    def test_filter_system_files(self):
+        """测试批量过滤"""
+        paths = ["a.txt", ".DS_Store", "b/c.txt", "b/Thumbs.db", "d.lnk"]
+
+        assert filter_system_files(paths) == ["a.txt", "b/c.txt"]
+        assert filter_system_files(iter(paths)) == ["a.txt", "b/c.txt"]
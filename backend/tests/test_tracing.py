@@ -0,0 +1,132 @@
+"""
+请求追踪和慢请求日志单元测试
+"""
+
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.tracing import (
+    SlowRequestLog,
+    TracingMiddleware,
+    format_server_timing,
+    repo_characteristics,
+)
+from main import app
+from services.git_wrapper import GitWrapper
+from services.repo_registry import get_git_wrapper, git_wrappers
+from services.repo_state import index_entry_count
+from services.tracing import current_trace, end_trace, record_span, start_trace
+
+client = TestClient(app)
+
+
+def tracing_middleware() -> TracingMiddleware:
+    """应用中间件栈里的TracingMiddleware实例"""
+    client.get("/health")
+    layer = app.middleware_stack
+    while not isinstance(layer, TracingMiddleware):
+        layer = layer.app
+    return layer
+
+
+def test_trace_collects_spans():
+    """测试追踪按名称汇总步骤，结束后不再记录"""
+    trace, token = start_trace()
+    record_span("git-log", 0.002)
+    record_span("git-log", 0.003)
+    record_span("parse-log", 0.001)
+    end_trace(token)
+    record_span("git-status", 1.0)
+
+    assert current_trace() is None
+    assert trace.summary() == {
+        "git-log": {"count": 2, "ms": 5.0},
+        "parse-log": {"count": 1, "ms": 1.0},
+    }
+    header = format_server_timing(trace)
+    assert header.startswith('git-log;dur=5.0;desc="2x", parse-log;dur=1.0, total;dur=')
+
+
+async def test_trace_visible_in_threads():
+    """测试asyncio.to_thread中的git命令记入同一个追踪"""
+    trace, token = start_trace()
+    try:
+        await asyncio.to_thread(record_span, "git-status", 0.001)
+    finally:
+        end_trace(token)
+
+    assert "git-status" in trace.summary()
+
+
+def test_server_timing_header(temp_dir):
+    """测试响应头包含git命令和解析步骤的耗时"""
+    client.post("/api/repository/init", json={"path": temp_dir})
+
+    response = client.get(f"/api/repository/branches?path={temp_dir}")
+
+    timing = response.headers["server-timing"]
+    assert "git-branch;dur=" in timing
+    assert "parse-branches;dur=" in timing
+    assert "total;dur=" in timing
+
+
+def test_slow_request_log(repo, temp_dir, monkeypatch):
+    """测试超过阈值的请求写入慢请求日志（包含步骤耗时和仓库规模）"""
+    wrapper = repo
+
+    log_path = Path(temp_dir) / "logs" / "slow.jsonl"
+    slow_log = SlowRequestLog(threshold_ms=0.001, path=log_path)
+    monkeypatch.setattr(tracing_middleware(), "slow_log", slow_log)
+    try:
+        client.get(f"/api/repository/status?path={temp_dir}")
+        client.post("/api/repository/commit", json={"path": temp_dir})
+    finally:
+        slow_log.close()
+
+    entries = [json.loads(line) for line in log_path.read_text().splitlines()]
+    assert entries[0]["route"] == "/api/repository/status"
+    assert "git-status" in entries[0]["spans"]
+    assert entries[0]["repo"]["tracked_files"] == index_entry_count(
+        wrapper.metadata.git_dir
+    )
+    assert entries[0]["repo"]["commits"] == wrapper.count_commits()
+    # POST请求从请求体中取出仓库路径
+    assert entries[1]["repo"]["path"] == str(wrapper.repo_path)
+
+
+def test_repo_characteristics_does_not_register(temp_dir):
+    """测试统计仓库规模不会为请求路径创建注册表条目"""
+    before = len(git_wrappers)
+
+    assert repo_characteristics(str(Path(temp_dir) / "missing")) == {}
+    assert repo_characteristics(temp_dir) == {}
+    assert len(git_wrappers) == before
+
+    GitWrapper(temp_dir).init_repository()
+    get_git_wrapper(temp_dir)
+
+    assert repo_characteristics(temp_dir)["commits"] == 1
+
+
+def test_slow_log_disabled(temp_dir):
+    """测试阈值为0时不记录"""
+    slow_log = SlowRequestLog(threshold_ms=0, path=Path(temp_dir) / "slow.jsonl")
+
+    assert not slow_log.is_slow(10_000)
+
+
+@pytest.mark.parametrize(
+    "repo", [[{"a.txt": "a", "b.txt": "b"}]], indirect=True, ids=["two-files"]
+)
+def test_index_entry_count(repo, temp_dir):
+    """测试从索引文件头读取条目数"""
+    wrapper = repo
+
+    assert index_entry_count(wrapper.metadata.git_dir) == len(
+        wrapper._run_git_command(["ls-files"]).stdout.splitlines()
+    )
+    assert index_entry_count(Path(temp_dir)) is None
@@ -0,0 +1,98 @@
+"""
+目录树索引单元测试
+"""
+
+import pytest
+
+from services.tree_index import TreeIndex, tree_index_cache
+
+
+@pytest.fixture
+def repo_commits():
+    """带嵌套目录的一个提交"""
+    return [
+        {
+            "src/main.py": "x" * 10,
+            "src/utils/a.py": "y" * 20,
+            "README.md": "z" * 5,
+        }
+    ]
+
+
+class TestTreeIndex:
+    """测试目录树构建和查询"""
+
+    def test_counts_and_sizes(self):
+        """测试目录的递归文件数量和大小"""
+        tree = TreeIndex([("a/b/c.txt", 3), ("a/d.txt", 4), ("e.txt", 5)])
+
+        root = tree.list()
+        assert root["file_count"] == 3
+        assert root["size"] == 12
+        assert [(c["name"], c["type"]) for c in root["children"]] == [
+            ("a", "folder"),
+            ("e.txt", "file"),
+        ]
+        folder = root["children"][0]
+        assert (folder["file_count"], folder["size"]) == (2, 7)
+        assert "children" not in folder
+
+    def test_subdirectory_and_depth(self):
+        """测试查询子目录和多层展开"""
+        tree = TreeIndex([("a/b/c.txt", 3), ("a/d.txt", 4)])
+
+        sub = tree.list("a")
+        assert [c["path"] for c in sub["children"]] == ["a/b", "a/d.txt"]
+
+        nested = tree.list("", depth=3)
+        assert nested["children"][0]["children"][0]["children"][0]["path"] == (
+            "a/b/c.txt"
+        )
+
+    def test_missing_directory(self):
+        """测试不存在的目录"""
+        tree = TreeIndex([("a/b.txt", 1)])
+
+        with pytest.raises(ValueError):
+            tree.list("a/b.txt")
+        assert "a" in tree
+
+
+class TestGitWrapperTree:
+    """测试GitWrapper目录树"""
+
+    def test_tree_from_index(self, repo):
+        """测试从索引读取文件和大小，过滤Git管理文件"""
+        tree = repo.get_tree()
+
+        names = [c["name"] for c in tree["children"]]
+        assert names == ["src", "README.md"]
+        assert tree["file_count"] == 3
+        assert tree["size"] == 35
+        assert repo.get_tree("src/")["children"][0] == {
+            "name": "utils",
+            "path": "src/utils",
+            "type": "folder",
+            "file_count": 1,
+            "size": 20,
+        }
+
+    def test_built_once_per_index_state(self, repo):
+        """测试索引不变时复用目录树，索引变化后重建"""
+        repo.get_tree()
+        builds = tree_index_cache.builds
+
+        repo.get_tree("src")
+        assert tree_index_cache.builds == builds
+
+        (repo.repo_path / "new.txt").write_text("new")
+        repo.create_commit("新文件")
+
+        assert "new.txt" in [c["name"] for c in repo.get_tree()["children"]]
+        assert tree_index_cache.builds == builds + 1
+
+    async def test_async(self, repo):
+        """测试异步版本"""
+        tree = await repo.get_tree_async("src", depth=2)
+
+        assert tree["children"][0]["children"][0]["path"] == "src/utils/a.py"
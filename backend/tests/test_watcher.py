@@ -0,0 +1,179 @@
+"""
+仓库文件监听服务单元测试
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from services.repo_state import worktree_monitors
+from services.watcher import RepoWatcher, WatcherManager, _PollingBackend
+
+
+@pytest.fixture
+def repo_commits():
+    """一个提交，.gitignore忽略*.log"""
+    return [{".gitignore": "*.log\n", "a.txt": "a"}]
+
+
+class EventCollector:
+    """收集监听线程推送的事件"""
+
+    def __init__(self):
+        self.events = []
+        self._cond = threading.Condition()
+
+    def __call__(self, event):
+        with self._cond:
+            self.events.append(event)
+            self._cond.notify_all()
+
+    def types(self):
+        return {event["type"] for event in self.events}
+
+    def wait_for(self, event_type, timeout=5):
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while event_type not in self.types():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+
+@pytest.fixture
+def watched(repo):
+    """启动监听的仓库"""
+    collector = EventCollector()
+    watcher = RepoWatcher(repo, collector)
+    watcher.start()
+    yield repo, watcher, collector
+    watcher.stop()
+
+
+class TestClassify:
+    """测试变化路径归类"""
+
+    def test_worktree_and_ignored_files(self, repo):
+        """测试工作区变化过滤忽略文件和系统文件"""
+        watcher = RepoWatcher(repo, lambda event: None)
+        root = repo.repo_path
+
+        events = watcher.classify(
+            [str(root / "b.txt"), str(root / "debug.log"), str(root / ".DS_Store")]
+        )
+
+        assert [e["type"] for e in events] == ["worktree_changed"]
+        assert events[0]["paths"] == ["b.txt"]
+        assert watcher.generation == 1
+        assert watcher.classify([str(root / "debug.log")]) == []
+
+    def test_git_dir_changes(self, repo):
+        """测试HEAD、当前分支和其他分支的变化"""
+        watcher = RepoWatcher(repo, lambda event: None)
+        git_dir = watcher.git_dir
+
+        def types(*paths):
+            return [e["type"] for e in watcher.classify([str(p) for p in paths])]
+
+        assert types(git_dir / "HEAD") == ["head_moved", "branches_changed"]
+        assert types(git_dir / "refs/heads/main") == ["head_moved", "branches_changed"]
+        assert types(git_dir / "refs/heads/feature") == ["branches_changed"]
+        assert types(git_dir / "index") == ["worktree_changed"]
+        assert types(git_dir / "index.lock", git_dir / "objects/ab/cdef") == []
+
+
+class TestRepoWatcher:
+    """测试后台监听"""
+
+    def test_file_change(self, watched):
+        """测试修改文件推送worktree_changed"""
+        repo, watcher, collector = watched
+
+        (repo.repo_path / "debug.log").write_text("ignored")
+        (repo.repo_path / "new.txt").write_text("new")
+
+        assert collector.wait_for("worktree_changed")
+        event = next(e for e in collector.events if e["type"] == "worktree_changed")
+        assert event["paths"] == ["new.txt"]
+
+    def test_new_directory(self, watched):
+        """测试新建目录中的文件也能被发现"""
+        repo, watcher, collector = watched
+
+        nested = repo.repo_path / "dir" / "sub"
+        nested.mkdir(parents=True)
+        (nested / "f.txt").write_text("f")
+
+        assert collector.wait_for("worktree_changed")
+        paths = {p for e in collector.events for p in e["paths"]}
+        assert "dir/sub/f.txt" in paths
+
+    def test_commit_and_branch(self, watched):
+        """测试提交和创建分支"""
+        repo, watcher, collector = watched
+
+        repo.create_branch("feature")
+        assert collector.wait_for("branches_changed")
+        assert "head_moved" not in collector.types()
+
+        (repo.repo_path / "b.txt").write_text("b")
+        repo.create_commit("第二个提交")
+        assert collector.wait_for("head_moved")
+
+    def test_registered_as_monitor(self, watched):
+        """测试事件驱动的监听登记为工作区监听器"""
+        repo, watcher, collector = watched
+
+        assert watcher.backend_name != "polling"
+        assert worktree_monitors.get(repo.repo_path) is watcher
+
+
+class TestPollingBackend:
+    """测试轮询后端"""
+
+    def test_detects_changes(self, repo):
+        """测试检测新增、修改和删除"""
+        root = repo.repo_path
+        backend = _PollingBackend([(root, True)], lambda p: p.name == ".git", 0)
+
+        (root / "a.txt").write_text("changed content")
+        (root / "c.txt").write_text("c")
+        (root / ".gitignore").unlink()
+
+        changed = set(backend.poll(0))
+        assert {str(root / n) for n in ("a.txt", "c.txt", ".gitignore")} <= changed
+        assert not any("/.git/" in p for p in changed)
+        assert backend.poll(0) == []
+
+    def test_not_registered_as_monitor(self, repo, monkeypatch):
+        """测试轮询监听不登记为工作区监听器（状态缓存仍按有效期过期）"""
+        monkeypatch.setattr("services.watcher.WATCHER_BACKEND", "polling")
+        watcher = RepoWatcher(repo, lambda event: None)
+        watcher.start()
+        try:
+            assert watcher.backend_name == "polling"
+            assert worktree_monitors.get(repo.repo_path) is None
+        finally:
+            watcher.stop()
+
+
+class TestWatcherManager:
+    """测试订阅管理"""
+
+    async def test_subscribe_and_unsubscribe(self, repo):
+        """测试事件送达订阅者队列，最后一个订阅者离开后停止监听"""
+        manager = WatcherManager()
+        loop = asyncio.get_running_loop()
+        watcher, subscriber = await asyncio.to_thread(manager.subscribe, repo, loop)
+        try:
+            (repo.repo_path / "x.txt").write_text("x")
+            event = await asyncio.wait_for(subscriber.queue.get(), timeout=5)
+            assert event["type"] == "worktree_changed"
+        finally:
+            await asyncio.to_thread(manager.unsubscribe, repo.repo_path, subscriber)
+
+        assert manager.get(repo.repo_path) is None
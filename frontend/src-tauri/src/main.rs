@@ -1,24 +1,83 @@
 // Prevents additional console window on Windows in release, DO NOT REMOVE!!
 #![cfg_attr(not(debug_assertions), windows_subsystem = "windows")]
 
-use std::process::{Child, Command};
-use std::sync::Mutex;
+use std::io::{BufRead, BufReader};
+use std::process::{Child, Command, Stdio};
+use std::sync::{Arc, Condvar, Mutex};
+use std::time::{Duration, Instant};
 use tauri::Manager;
 
 struct BackendProcess(Mutex<Option<Child>>);
 
+/// 后端输出的就绪行前缀（见 backend/services/startup.py）
+const READY_PREFIX: &str = "CHRONOS_READY";
+
+#[derive(Clone, Copy, PartialEq)]
+enum ReadyState {
+    Starting,
+    Ready,
+    Failed,
+}
+
+/// 后端就绪状态，由读取后端stdout的线程更新
+#[derive(Clone)]
+struct BackendReady(Arc<(Mutex<ReadyState>, Condvar)>);
+
+impl BackendReady {
+    fn new() -> Self {
+        BackendReady(Arc::new((Mutex::new(ReadyState::Starting), Condvar::new())))
+    }
+
+    fn set(&self, state: ReadyState) {
+        let (lock, cvar) = &*self.0;
+        if let Ok(mut current) = lock.lock() {
+            if *current == ReadyState::Starting {
+                *current = state;
+                cvar.notify_all();
+            }
+        }
+    }
+
+    /// 等待后端就绪，超时或后端进程退出时返回false
+    fn wait(&self, timeout: Duration) -> bool {
+        let (lock, cvar) = &*self.0;
+        let Ok(guard) = lock.lock() else {
+            return false;
+        };
+        match cvar.wait_timeout_while(guard, timeout, |state| *state == ReadyState::Starting) {
+            Ok((state, _)) => *state == ReadyState::Ready,
+            Err(_) => false,
+        }
+    }
+}
+
+/// 前端启动时调用：等待后端输出就绪行（代替固定等待）
+#[tauri::command]
+async fn wait_backend_ready(
+    ready: tauri::State<'_, BackendReady>,
+    timeout_ms: u64,
+) -> Result<bool, String> {
+    let ready = ready.inner().clone();
+    tauri::async_runtime::spawn_blocking(move || ready.wait(Duration::from_millis(timeout_ms)))
+        .await
+        .map_err(|e| e.to_string())
+}
+
 fn main() {
     println!("=== Chronos 启动 ===");
     
     tauri::Builder::default()
         .plugin(tauri_plugin_shell::init())
         .plugin(tauri_plugin_dialog::init())
+        .invoke_handler(tauri::generate_handler![wait_backend_ready])
         .setup(|app| {
             println!("✅ 插件已加载");
             
             // Start the Python backend
-            let backend_process = start_backend_server(app);
+            let ready = BackendReady::new();
+            let backend_process = start_backend_server(app, ready.clone());
             app.manage(BackendProcess(Mutex::new(backend_process)));
+            app.manage(ready);
             
             println!("=== Chronos 启动完成 ===");
             Ok(())
@@ -40,7 +99,7 @@ fn main() {
         .expect("error while running tauri application");
 }
 
-fn start_backend_server(app: &tauri::App) -> Option<Child> {
+fn start_backend_server(app: &tauri::App, ready: BackendReady) -> Option<Child> {
     use tauri::path::BaseDirectory;
     
     println!("=== 启动后端服务器 ===");
@@ -54,24 +113,77 @@ fn start_backend_server(app: &tauri::App) -> Option<Child> {
     #[cfg(target_os = "linux")]
     let backend_name = "backend";
 
+    // one-dir构建整体作为资源打包（见 tauri.conf.json 的 bundle.resources）
+    let resource = format!("binaries/backend-dist/{}", backend_name);
     let backend_path = app
         .path()
-        .resolve(format!("binaries/{}", backend_name), BaseDirectory::Resource)
-        .expect("failed to resolve backend binary");
+        .resolve(&resource, BaseDirectory::Resource)
+        .ok()
+        .filter(|path| path.exists());
+
+    let Some(backend_path) = backend_path else {
+        eprintln!("❌ 找不到后端可执行文件");
+        ready.set(ReadyState::Failed);
+        return None;
+    };
+
+    ensure_executable(&backend_path);
 
     println!("后端路径: {:?}", backend_path);
 
     // Start the backend process
-    match Command::new(&backend_path).spawn() {
-        Ok(child) => {
+    let started = Instant::now();
+    match Command::new(&backend_path).stdout(Stdio::piped()).spawn() {
+        Ok(mut child) => {
             println!("✅ 后端服务器启动成功，PID: {}", child.id());
+            if let Some(stdout) = child.stdout.take() {
+                watch_backend_stdout(stdout, ready, started);
+            }
             Some(child)
         }
         Err(e) => {
             eprintln!("❌ 启动后端服务器失败: {}", e);
+            ready.set(ReadyState::Failed);
             None
         }
     }
 }
 
+/// 确保后端可执行文件有执行权限（资源复制时丢失执行位会导致启动失败）
+#[cfg(unix)]
+fn ensure_executable(path: &std::path::Path) {
+    use std::os::unix::fs::PermissionsExt;
 
+    let Ok(metadata) = std::fs::metadata(path) else {
+        return;
+    };
+    let mut permissions = metadata.permissions();
+    if permissions.mode() & 0o100 != 0 {
+        return;
+    }
+    permissions.set_mode(permissions.mode() | 0o755);
+    if let Err(e) = std::fs::set_permissions(path, permissions) {
+        eprintln!("⚠️ 无法设置后端执行权限: {}", e);
+    }
+}
+
+#[cfg(not(unix))]
+fn ensure_executable(_path: &std::path::Path) {}
+
+/// 转发后端stdout，看到就绪行时标记就绪；stdout关闭（进程退出）时标记失败
+fn watch_backend_stdout(stdout: std::process::ChildStdout, ready: BackendReady, started: Instant) {
+    std::thread::spawn(move || {
+        // 读完整个输出，避免管道写满阻塞后端
+        for line in BufReader::new(stdout).lines() {
+            let Ok(line) = line else {
+                break;
+            };
+            println!("[backend] {}", line);
+            if line.starts_with(READY_PREFIX) {
+                println!("✅ 后端已就绪，耗时 {}ms", started.elapsed().as_millis());
+                ready.set(ReadyState::Ready);
+            }
+        }
+        ready.set(ReadyState::Failed);
+    });
+}
@@ -27,6 +27,7 @@ import {
   HomeOutlined,
 } from '@ant-design/icons'
 import { open } from '@tauri-apps/plugin-dialog'
+import { invoke } from '@tauri-apps/api/core'
 import { SnapshotDialog, HistoryViewer, BranchManager, FileTreeView, ReleaseNotes } from './components'
 import { useRepository, useHistory, useBranches } from './hooks'
 import { apiClient } from './api'
@@ -37,6 +38,42 @@ const { Title, Text } = Typography
 // LocalStorage key
 const RECENT_REPOS_KEY = 'chronos_recent_repos'
 
+// 等待后端就绪的最长时间
+const BACKEND_READY_TIMEOUT = 15000
+// 轮询/health的间隔
+const HEALTH_POLL_INTERVAL = 250
+
+/**
+ * 等待后端就绪
+ * Tauri中由主进程等待后端输出就绪行（不再固定等待3秒）；
+ * 浏览器开发模式或后端单独启动时短间隔轮询/health
+ */
+const waitForBackend = async (): Promise<boolean> => {
+  // Tauri 2未开启withGlobalTauri时没有window.__TAURI__，以__TAURI_INTERNALS__判断
+  if ('__TAURI_INTERNALS__' in window) {
+    try {
+      const ready = await invoke<boolean>('wait_backend_ready', {
+        timeoutMs: BACKEND_READY_TIMEOUT,
+      })
+      if (ready) {
+        return true
+      }
+      console.warn('后端进程未就绪，改为轮询/health')
+    } catch (error) {
+      console.warn('等待后端就绪失败，改为轮询/health:', error)
+    }
+  }
+
+  const deadline = Date.now() + BACKEND_READY_TIMEOUT
+  while (Date.now() < deadline) {
+    if (await apiClient.checkHealth()) {
+      return true
+    }
+    await new Promise(resolve => setTimeout(resolve, HEALTH_POLL_INTERVAL))
+  }
+  return false
+}
+
 // 不需要复杂的树结构函数了
 
 /**
@@ -181,29 +218,10 @@ function App() {
     const checkBackendHealth = async () => {
       console.log('=== 检查后端服务器 ===')
 
-      // 给后端3秒的初始启动时间
-      console.log('等待后端启动...')
-      await new Promise(resolve => setTimeout(resolve, 3000))
-
-      let attempts = 0
-      const maxAttempts = 10
-      const delay = 1000 // 1秒
-
-      while (attempts < maxAttempts) {
-        attempts++
-        console.log(`尝试连接后端 (${attempts}/${maxAttempts})...`)
-
-        const isHealthy = await apiClient.checkHealth()
-        if (isHealthy) {
-          console.log('✅ 后端服务器已就绪')
-          message.success('应用已就绪', 2)
-          return
-        }
-
-        if (attempts < maxAttempts) {
-          console.log(`等待 ${delay}ms 后重试...`)
-          await new Promise(resolve => setTimeout(resolve, delay))
-        }
+      if (await waitForBackend()) {
+        console.log('✅ 后端服务器已就绪')
+        message.success('应用已就绪', 2)
+        return
       }
 
       console.error('❌ 后端服务器启动失败')
@@ -4,7 +4,11 @@ import type {
   CommitLog,
   BranchesData,
   MergeResult,
+  MergePreview,
+  ConflictDetails,
   InitRepositoryData,
+  TreeData,
+  OverviewData,
 } from '../types/api'
 
 /**
@@ -162,6 +166,19 @@ class ChronosApiClient {
     return this.get('/repository/status', { path: repoPath })
   }
 
+  /**
+   * 一次获取打开仓库所需的状态、分支、文件和第一页历史
+   */
+  async getOverview(
+    repoPath: string,
+    logLimit: number = 50
+  ): Promise<ApiResponse<OverviewData>> {
+    return this.get('/repository/overview', {
+      path: repoPath,
+      log_limit: String(logLimit),
+    })
+  }
+
   /**
    * 获取所有已追踪的文件
    */
@@ -171,6 +188,21 @@ class ChronosApiClient {
     return this.get('/repository/files', { path: repoPath })
   }
 
+  /**
+   * 获取已追踪文件目录树中一个目录的直接子项（带文件数量和大小）
+   */
+  async getTree(
+    repoPath: string,
+    dir: string = '',
+    depth: number = 1
+  ): Promise<ApiResponse<TreeData>> {
+    return this.get('/repository/tree', {
+      path: repoPath,
+      dir,
+      depth: String(depth),
+    })
+  }
+
   /**
    * 创建快照（提交）
    */
@@ -188,9 +220,17 @@ class ChronosApiClient {
 
   /**
    * 获取提交历史
+   * withStats为true时每条记录附带变更统计（文件数、新增和删除行数）
    */
-  async getLog(repoPath: string): Promise<ApiResponse<{ logs: CommitLog[] }>> {
-    return this.get('/repository/log', { path: repoPath })
+  async getLog(
+    repoPath: string,
+    withStats: boolean = false
+  ): Promise<ApiResponse<{ logs: CommitLog[] }>> {
+    const params: Record<string, string> = { path: repoPath }
+    if (withStats) {
+      params.stats = 'true'
+    }
+    return this.get('/repository/log', params)
   }
 
   /**
@@ -253,6 +293,52 @@ class ChronosApiClient {
       target_branch: targetBranch,
     })
   }
+
+  /**
+   * 预演合并（不修改工作区），返回是否有冲突
+   */
+  async previewMerge(
+    repoPath: string,
+    sourceBranch: string,
+    targetBranch?: string
+  ): Promise<ApiResponse<MergePreview>> {
+    const params: Record<string, string> = {
+      path: repoPath,
+      source_branch: sourceBranch,
+    }
+    if (targetBranch) {
+      params.target_branch = targetBranch
+    }
+    return this.get('/repository/merge/preview', params)
+  }
+
+  /**
+   * 获取所有冲突文件的base/ours/theirs版本
+   * 指定sourceBranch时预演合并得到冲突，否则读取进行中的合并冲突
+   */
+  async getConflictDetails(
+    repoPath: string,
+    sourceBranch?: string,
+    targetBranch?: string
+  ): Promise<ApiResponse<ConflictDetails>> {
+    const params: Record<string, string> = { path: repoPath }
+    if (sourceBranch) {
+      params.source_branch = sourceBranch
+    }
+    if (targetBranch) {
+      params.target_branch = targetBranch
+    }
+    return this.get('/repository/merge/conflicts', params)
+  }
+
+  /**
+   * 快照中文件原始内容的URL（可直接用于img/video等元素）
+   * commit使用完整提交ID时浏览器可以长期缓存响应
+   */
+  getBlobUrl(repoPath: string, commit: string, file: string): string {
+    const params = new URLSearchParams({ path: repoPath, commit, file })
+    return `${this.baseUrl}/repository/blob?${params.toString()}`
+  }
 }
 
 // 导出单例实例
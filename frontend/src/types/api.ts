@@ -16,11 +16,18 @@ export interface StatusData {
   changes: FileChange[]
 }
 
+export interface CommitStats {
+  files: number
+  insertions: number
+  deletions: number
+}
+
 export interface CommitLog {
   id: string
   message: string
   author: string
   date: string
+  stats?: CommitStats | null
 }
 
 export interface BranchesData {
@@ -33,6 +40,42 @@ export interface MergeResult {
   conflicts: string[]
 }
 
+export interface MergePreview {
+  source: string
+  target: string
+  source_commit: string
+  target_commit: string
+  clean: boolean
+  up_to_date: boolean
+  fast_forward: boolean
+  tree: string
+  conflicts: string[]
+  messages: { paths: string[]; type: string; message: string }[]
+}
+
+export interface ConflictStage {
+  oid: string
+  mode: string
+  size: number | null
+  binary: boolean | null
+  truncated: boolean
+  content: string | null
+}
+
+export interface ConflictDetails {
+  origin: 'merge-tree' | 'index'
+  files: {
+    path: string
+    stages: {
+      base: ConflictStage | null
+      ours: ConflictStage | null
+      theirs: ConflictStage | null
+    }
+  }[]
+  max_bytes: number
+  omitted: number
+}
+
 export interface InitRepositoryData {
   already_initialized: boolean
   gitignore?: {
@@ -43,3 +86,28 @@ export interface InitRepositoryData {
   }
   cleaned_files?: string[]
 }
+
+export interface TreeEntry {
+  name: string
+  path: string
+  type: 'folder' | 'file'
+  size: number
+  file_count?: number // 仅文件夹
+  children?: TreeEntry[] // depth > 1 时返回
+}
+
+export interface TreeData {
+  path: string
+  file_count: number
+  size: number
+  children: TreeEntry[]
+}
+
+export interface OverviewData {
+  status: StatusData | null
+  branches: BranchesData | null
+  files: { files: string[]; count: number } | null
+  log: { logs: CommitLog[]; total: number; next_cursor: string | null } | null
+  timings: Record<string, number> // 毫秒
+  errors: Record<string, string>
+}
@@ -30,9 +30,15 @@ BACKEND_PID=$!
 echo "✅ Backend 已启动 (PID: $BACKEND_PID) - http://127.0.0.1:8765"
 cd ..
 
-# 等待Backend启动
+# 等待Backend启动（轮询/health，最多15秒）
 echo "⏳ 等待 Backend 启动..."
-sleep 3
+for _ in $(seq 1 75); do
+    if curl -sf http://127.0.0.1:8765/health > /dev/null; then
+        echo "✅ Backend 已就绪"
+        break
+    fi
+    sleep 0.2
+done
 
 # 启动Tauri开发模式（会自动启动Frontend和打开应用窗口）
 echo "🎨 启动 Tauri 开发模式..."
@@ -7,7 +7,7 @@ echo "=========================================="
 echo ""
 
 # Check if backend binary exists
-if [ ! -f "frontend/src-tauri/binaries/backend-aarch64-apple-darwin" ]; then
+if [ ! -f "frontend/src-tauri/binaries/backend-dist/backend" ]; then
     echo "后端二进制文件不存在，正在构建..."
     bash backend/build_binary.sh
     if [ $? -ne 0 ]; then